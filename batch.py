@@ -0,0 +1,244 @@
+"""Generate interview guides for a directory of resumes without the Streamlit UI.
+
+Every PDF in --resumes is paired with every company/role row of --jobs (a CSV
+with ``company`` and ``role`` columns, plus an optional ``resume`` column to
+target a single file). Resumes are parsed in a process pool, guides are
+generated through a concurrency-limited queue, and each finished guide is
+written immediately, so an interrupted run picks up where it stopped.
+
+    python batch.py --resumes resumes/ --jobs jobs.csv --output guides.jsonl
+    python batch.py --resumes resumes/ --jobs jobs.csv --output guides/ --format markdown
+"""
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import os
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+from dotenv import load_dotenv
+
+from gemini_service import AsyncGeminiService
+from metrics import metrics
+from parsing_service import ParseResult, ParsingService
+from rate_limiter import RateLimiter
+from prompts import PromptGenerator
+from upload_ingest import UploadRejected, ingest_path
+
+
+@dataclass
+class GuideJob:
+    resume_path: str
+    company: str
+    role: str
+
+    @property
+    def job_id(self) -> str:
+        return f"{os.path.basename(self.resume_path)}::{self.company}::{self.role}"
+
+
+@dataclass
+class BatchStats:
+    resumes_parsed: int = 0
+    parse_failures: int = 0
+    guides_written: int = 0
+    guide_failures: int = 0
+    skipped: int = 0
+    started_at: float = field(default_factory=time.perf_counter)
+
+    def report(self) -> str:
+        elapsed = time.perf_counter() - self.started_at
+        return (
+            f"{self.guides_written} guides written, {self.guide_failures} failed, "
+            f"{self.skipped} already done; {self.resumes_parsed} resumes parsed "
+            f"({self.parse_failures} failed) in {elapsed:.1f}s "
+            f"({self.resumes_parsed / elapsed if elapsed else 0:.2f} resumes/s, "
+            f"{self.guides_written / elapsed if elapsed else 0:.2f} guides/s)"
+        )
+
+
+def load_jobs(resume_dir: str, jobs_csv: str) -> List[GuideJob]:
+    resumes = sorted(
+        os.path.join(resume_dir, name)
+        for name in os.listdir(resume_dir)
+        if name.lower().endswith('.pdf')
+    )
+    jobs = []
+    with open(jobs_csv, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            company, role = row['company'].strip(), row['role'].strip()
+            target = (row.get('resume') or '').strip()
+            for resume_path in resumes:
+                if not target or os.path.basename(resume_path) == target:
+                    jobs.append(GuideJob(resume_path, company, role))
+    return jobs
+
+
+def _slug(value: str) -> str:
+    return re.sub(r'[^A-Za-z0-9]+', '-', value).strip('-').lower()
+
+
+class GuideWriter:
+    """Writes finished guides and remembers which jobs are already done"""
+
+    def __init__(self, output: str, output_format: str):
+        self.output = output
+        self.output_format = output_format
+        if output_format == 'markdown':
+            os.makedirs(output, exist_ok=True)
+
+    def _markdown_path(self, job: GuideJob) -> str:
+        stem = os.path.splitext(os.path.basename(job.resume_path))[0]
+        return os.path.join(self.output, f"{_slug(stem)}__{_slug(job.company)}__{_slug(job.role)}.md")
+
+    def completed(self, jobs: List[GuideJob]) -> Set[str]:
+        if self.output_format == 'markdown':
+            return {job.job_id for job in jobs if os.path.exists(self._markdown_path(job))}
+
+        done = set()
+        if os.path.exists(self.output):
+            with open(self.output, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        done.add(json.loads(line)['job_id'])
+                    except (ValueError, KeyError):
+                        # A line cut short by an interrupted run; the job is redone
+                        continue
+        return done
+
+    def write(self, job: GuideJob, guide: str):
+        if self.output_format == 'markdown':
+            with open(self._markdown_path(job), 'w', encoding='utf-8') as f:
+                f.write(f"# Interview guide: {job.role} at {job.company}\n\n{guide}\n")
+            return
+
+        record = {
+            'job_id': job.job_id,
+            'resume': os.path.basename(job.resume_path),
+            'company': job.company,
+            'role': job.role,
+            'guide': guide
+        }
+        with open(self.output, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + '\n')
+
+
+async def run_batch(jobs: List[GuideJob], writer: GuideWriter, llm_service: AsyncGeminiService,
+                    parsing_service: ParsingService) -> BatchStats:
+    stats = BatchStats()
+    done = writer.completed(jobs)
+    pending = [job for job in jobs if job.job_id not in done]
+    stats.skipped = len(jobs) - len(pending)
+
+    jobs_by_resume: Dict[str, List[GuideJob]] = {}
+    for job in pending:
+        jobs_by_resume.setdefault(job.resume_path, []).append(job)
+
+    prompt_generator = PromptGenerator()
+    queue: asyncio.Queue = asyncio.Queue()
+    loop = asyncio.get_running_loop()
+
+    def read_and_parse(resume_path: str):
+        # Mapped rather than read and, with no cache, never hashed; the worker opens the file itself
+        try:
+            with ingest_path(resume_path, max_bytes=None) as upload:
+                return parsing_service.parse(upload)
+        except (OSError, UploadRejected) as e:
+            return ParseResult(error=str(e))
+
+    async def parse_and_enqueue(resume_path: str):
+        # Waiting on the process pool happens in a thread so the event loop stays free
+        result = await loop.run_in_executor(None, read_and_parse, resume_path)
+        if result.error:
+            print(f"Error parsing {resume_path}: {result.error}", file=sys.stderr)
+            stats.parse_failures += 1
+            stats.guide_failures += len(jobs_by_resume[resume_path])
+            return
+        stats.resumes_parsed += 1
+        for job in jobs_by_resume[resume_path]:
+            await queue.put((job, result.structured_data))
+
+    async def generate_guides():
+        while True:
+            job, structured_data = await queue.get()
+            try:
+                with metrics.span("prompt_build"):
+                    prompt = prompt_generator.generate_interview_prompt(structured_data, job.company, job.role)
+                guide = await llm_service.agenerate_response(prompt, job.role)
+                if guide.startswith("Error generating response") or guide == "Failed to generate response.":
+                    print(f"Failed {job.job_id}: {guide}", file=sys.stderr)
+                    stats.guide_failures += 1
+                else:
+                    writer.write(job, guide)
+                    stats.guides_written += 1
+            except Exception as e:
+                print(f"Failed {job.job_id}: {str(e)}", file=sys.stderr)
+                stats.guide_failures += 1
+            finally:
+                queue.task_done()
+
+    # One consumer per allowed in-flight request; the service enforces the limit itself
+    consumers = [asyncio.ensure_future(generate_guides()) for _ in range(llm_service.max_concurrency)]
+    try:
+        await asyncio.gather(*(parse_and_enqueue(path) for path in jobs_by_resume))
+        await queue.join()
+    finally:
+        for consumer in consumers:
+            consumer.cancel()
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate interview guides for many resumes")
+    parser.add_argument('--resumes', required=True, help="directory containing PDF resumes")
+    parser.add_argument('--jobs', required=True, help="CSV with company,role (and optional resume) columns")
+    parser.add_argument('--output', required=True, help="JSONL file, or directory for --format markdown")
+    parser.add_argument('--format', choices=['jsonl', 'markdown'], default='jsonl')
+    parser.add_argument('--parse-workers', type=int, default=None, help="PDF parsing processes (default: CPU count)")
+    parser.add_argument('--concurrency', type=int, default=8, help="maximum in-flight LLM requests")
+    parser.add_argument('--rpm', type=float, default=None, help="client-side limit on LLM requests per minute")
+    parser.add_argument('--tpm', type=float, default=None, help="client-side limit on LLM tokens per minute")
+    parser.add_argument('--timeout', type=float, default=60.0, help="per-request LLM timeout in seconds")
+    parser.add_argument('--parse-timeout', type=float, default=30.0, help="per-PDF parsing timeout in seconds")
+    parser.add_argument('--metrics', help="write stage timings and counters here (.json for OTLP JSON, else Prometheus text)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "WARNING"), format="%(levelname)s %(name)s: %(message)s")
+    load_dotenv()
+    api_key = os.getenv("GOOGLE_API_KEY")
+    if not api_key:
+        print("GOOGLE_API_KEY is not set", file=sys.stderr)
+        return 2
+
+    jobs = load_jobs(args.resumes, args.jobs)
+    writer = GuideWriter(args.output, args.format)
+    # Failed guides are reported (and redone on the next run) rather than replaced by templates
+    rate_limiter = None
+    if args.rpm or args.tpm:
+        rate_limiter = RateLimiter(requests_per_minute=args.rpm, tokens_per_minute=args.tpm, max_wait=None)
+    llm_service = AsyncGeminiService(api_key, max_concurrency=args.concurrency, timeout=args.timeout,
+                                     fallback_on_failure=False, rate_limiter=rate_limiter)
+
+    parsing_service = ParsingService(max_workers=args.parse_workers, timeout=args.parse_timeout)
+
+    try:
+        stats = asyncio.run(run_batch(jobs, writer, llm_service, parsing_service))
+    finally:
+        parsing_service.shutdown()
+    print(stats.report())
+    if args.metrics:
+        with open(args.metrics, "w", encoding="utf-8") as f:
+            if args.metrics.endswith(".json"):
+                json.dump(metrics.to_otlp_json(), f, indent=2)
+            else:
+                f.write(metrics.to_prometheus())
+    return 0 if stats.guide_failures == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
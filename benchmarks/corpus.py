@@ -0,0 +1,131 @@
+"""Synthetic resume corpus for the benchmarks.
+
+Resumes are generated deterministically from a seed with a chosen number of
+pages, skill density and layout, and can be rendered to real PDF bytes (a
+minimal single-font PDF writer, no extra dependencies) so the PyPDF2 decode
+stage is measured too.
+"""
+import random
+from dataclasses import dataclass
+from typing import List
+
+FILLER_WORDS = [
+    "designed", "implemented", "service", "latency", "team", "customers",
+    "pipeline", "reduced", "migrated", "platform", "reporting", "automated",
+    "dashboard", "integration", "deployment", "scalable", "analytics", "owned"
+]
+
+SKILLS = [
+    "Python", "JavaScript", "TypeScript", "React Native", "Node.js", "Docker", "Kubernetes",
+    "PostgreSQL", "C++", "C#", "AWS", "GitHub", "TensorFlow", "Ruby on Rails", "Django",
+    "FastAPI", "Redis", "MongoDB", "Jenkins", "Figma", "Go", "Rust", "Kotlin", "Flutter"
+]
+
+HEADERS = ["EDUCATION", "WORK EXPERIENCE", "PROJECTS", "TECHNICAL SKILLS", "CERTIFICATIONS"]
+
+LAYOUTS = ("single", "two_column")
+
+
+@dataclass(frozen=True)
+class ResumeSpec:
+    pages: int
+    skill_density: float = 0.3   # probability that a line mentions a skill
+    layout: str = "single"
+    lines_per_page: int = 45
+    seed: int = 0
+
+    @property
+    def name(self) -> str:
+        return f"{self.pages}p-{self.layout}-d{self.skill_density:g}"
+
+
+def synthetic_pages(spec: ResumeSpec) -> List[List[str]]:
+    """Lines of text for each page of a resume"""
+    rng = random.Random(spec.seed)
+    pages = []
+    line_number = 0
+    for page_number in range(spec.pages):
+        lines = []
+        if page_number == 0:
+            lines += ["Jane Doe", "jane.doe@example.com", "TECHNICAL SKILLS Languages: Python, Go, SQL"]
+        while len(lines) < spec.lines_per_page:
+            if line_number % 30 == 0:
+                lines.append(rng.choice(HEADERS))
+            words = rng.choices(FILLER_WORDS, k=10)
+            if rng.random() < spec.skill_density:
+                words.insert(rng.randrange(len(words)), rng.choice(SKILLS))
+            lines.append("- " + " ".join(words))
+            line_number += 1
+        pages.append(lines)
+    return pages
+
+
+def synthetic_text(spec: ResumeSpec) -> str:
+    """Plain resume text, one newline-terminated block per page"""
+    return "".join("\n".join(lines) + "\n" for lines in synthetic_pages(spec))
+
+
+def _pdf_string(text: str) -> str:
+    escaped = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return f"({escaped.encode('latin-1', 'replace').decode('latin-1')})"
+
+
+def _content_stream(lines: List[str], layout: str) -> bytes:
+    commands = ["BT", "/F1 9 Tf", "11 TL"]
+    if layout == "two_column":
+        # Left and right halves as separate text blocks, like two-column templates
+        half = (len(lines) + 1) // 2
+        for x, block in ((40, lines[:half]), (316, lines[half:])):
+            commands.append(f"1 0 0 1 {x} 760 Tm")
+            for line in block:
+                commands.append(f"{_pdf_string(line)} Tj T*")
+    else:
+        commands.append("1 0 0 1 40 760 Tm")
+        for line in lines:
+            commands.append(f"{_pdf_string(line)} Tj T*")
+    commands.append("ET")
+    return "\n".join(commands).encode("latin-1")
+
+
+def build_pdf(spec: ResumeSpec) -> bytes:
+    """Render a synthetic resume as a minimal PDF document"""
+    pages = synthetic_pages(spec)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once page object numbers are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    page_refs = []
+    for lines in pages:
+        stream = _content_stream(lines, spec.layout)
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_number = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_number
+        )
+        page_refs.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(page_refs), len(page_refs))
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref_offset = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        output += b"%010d 00000 n \n" % offset
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    return bytes(output)
+
+
+def default_corpus(quick: bool = False) -> List[ResumeSpec]:
+    """Specs covering small to large resumes, both layouts and two skill densities"""
+    sizes = (1, 5) if quick else (1, 5, 20, 50)
+    return [
+        ResumeSpec(pages=pages, skill_density=density, layout=layout, seed=pages)
+        for pages in sizes
+        for layout in LAYOUTS
+        for density in (0.1, 0.6)
+    ]
@@ -0,0 +1,146 @@
+"""Latency of GeminiService while the upstream misbehaves.
+
+A fault-injecting fake model stands in for Gemini: it can add latency, a slow
+tail, transient errors or outright hangs. The scenarios show how the retry
+policy, hedging and circuit breaker shape the latency users see, e.g. that
+during an outage guides come back from the fallback templates in
+milliseconds once the breaker has opened.
+
+    python -m benchmarks.fault_injection
+"""
+import argparse
+import logging
+import random
+import statistics
+import threading
+import time
+import types
+from typing import Iterator, List, Optional
+
+from gemini_service import GeminiService
+from resilience import CircuitBreaker, ResilientCaller, RetryPolicy
+
+
+class UpstreamError(Exception):
+    """Transient API failure, shaped like google.api_core's ServiceUnavailable"""
+    code = 503
+
+
+class _Chunk:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FaultInjectingModel:
+    """Stand-in for genai.GenerativeModel with configurable faults
+
+    Every request first waits ``latency`` seconds (``tail_latency`` instead,
+    with probability ``tail_rate``), then fails with UpstreamError with
+    probability ``error_rate`` or hangs for ``hang_seconds`` with probability
+    ``hang_rate``. Faults can be switched at runtime with ``set_faults``.
+    """
+
+    def __init__(self, latency: float = 0.05, tail_latency: float = 0.0, tail_rate: float = 0.0,
+                 error_rate: float = 0.0, hang_rate: float = 0.0, hang_seconds: float = 30.0,
+                 text: str = "Generated guide", seed: int = 0):
+        self.latency = latency
+        self.tail_latency = tail_latency
+        self.tail_rate = tail_rate
+        self.error_rate = error_rate
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.text = text
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def set_faults(self, **faults):
+        for name, value in faults.items():
+            setattr(self, name, value)
+
+    def _respond(self) -> str:
+        with self._lock:
+            self.calls += 1
+            roll_tail, roll_error, roll_hang = self._rng.random(), self._rng.random(), self._rng.random()
+        time.sleep(self.tail_latency if roll_tail < self.tail_rate else self.latency)
+        if roll_error < self.error_rate:
+            raise UpstreamError("503 Service Unavailable (injected)")
+        if roll_hang < self.hang_rate:
+            time.sleep(self.hang_seconds)
+        return self.text
+
+    def generate_content(self, contents, generation_config=None, stream: bool = False):
+        text = self._respond()
+        if stream:
+            return iter([_Chunk(word + " ") for word in text.split()])
+        return types.SimpleNamespace(text=text)
+
+    def start_chat(self, history=None):
+        model = self
+
+        class _Chat:
+            def send_message(self, question, stream: bool = False):
+                return model.generate_content(question, stream=stream)
+
+        return _Chat()
+
+
+def _service(model: FaultInjectingModel, policy: RetryPolicy, breaker: CircuitBreaker) -> GeminiService:
+    return GeminiService("unused", model=model, resilience=ResilientCaller(policy, breaker))
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+def run_requests(service: GeminiService, count: int, role: str = "Backend Developer") -> Iterator[tuple]:
+    """Yield (seconds, degraded) for ``count`` sequential guide requests"""
+    fallback = service.llm_utils.get_fallback_response(role)
+    for i in range(count):
+        started = time.perf_counter()
+        response = service.generate_response(f"resume {i}", role)
+        yield time.perf_counter() - started, response == fallback
+
+
+def report(name: str, results: List[tuple]):
+    seconds = [elapsed for elapsed, _ in results]
+    degraded = sum(1 for _, is_fallback in results if is_fallback)
+    print(f"{name:<28} p50 {statistics.median(seconds) * 1000:8.1f} ms   "
+          f"p99 {_percentile(seconds, 0.99) * 1000:8.1f} ms   fallback {degraded}/{len(results)}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="GeminiService latency under injected upstream faults")
+    parser.add_argument('--requests', type=int, default=40)
+    args = parser.parse_args(argv)
+    n = args.requests
+    # Fallback and retry warnings would drown the report
+    logging.basicConfig(level=logging.ERROR)
+
+    policy = RetryPolicy(max_attempts=3, base_delay=0.05, max_delay=0.2, deadline=2.0)
+
+    model = FaultInjectingModel(latency=0.02)
+    report("healthy", list(run_requests(_service(model, policy, CircuitBreaker()), n)))
+
+    model = FaultInjectingModel(latency=0.02, error_rate=0.3)
+    report("30% transient errors", list(run_requests(_service(model, policy, CircuitBreaker()), n)))
+
+    # Slow tail: 10% of requests take 1s; hedging after 100ms cuts it off
+    model = FaultInjectingModel(latency=0.02, tail_latency=1.0, tail_rate=0.1)
+    report("slow tail, no hedging", list(run_requests(_service(model, policy, CircuitBreaker()), n)))
+    model = FaultInjectingModel(latency=0.02, tail_latency=1.0, tail_rate=0.1)
+    hedged = RetryPolicy(max_attempts=3, base_delay=0.05, max_delay=0.2, deadline=2.0, hedge_after=0.1)
+    report("slow tail, hedged at 100ms", list(run_requests(_service(model, hedged, CircuitBreaker()), n)))
+
+    # Outage: every request hangs; the breaker opens after 3 deadline misses
+    model = FaultInjectingModel(latency=0.02, hang_rate=1.0, hang_seconds=30.0)
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60.0)
+    outage_policy = RetryPolicy(max_attempts=2, base_delay=0.05, max_delay=0.2, deadline=0.5)
+    report("outage (hanging upstream)", list(run_requests(_service(model, outage_policy, breaker), n)))
+    print(f"breaker state after outage: {breaker.state}, upstream calls made: {model.calls}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,98 @@
+"""Check that the PDF backends agree, and compare their decode throughput.
+
+Every installed backend (pypdfium2, PyPDF2, pdfminer) parses the synthetic
+corpus; the resulting sections and skills must match PyPDF2's, and each
+backend's per-page decode rate is reported. Exits with status 1 on any
+mismatch (pdfminer's layout analysis may reorder two-column pages; those
+differences are only reported). tests/test_pdf_backends.py runs the same
+check for pypdfium2 under pytest. Run from the repository root:
+
+    python -m benchmarks.pdf_backends
+    python -m benchmarks.pdf_backends --quick --repeat 3
+"""
+import argparse
+import io
+from typing import Dict, List, Optional
+
+from benchmarks.corpus import build_pdf, default_corpus
+from benchmarks.skill_matching import best_of
+from pdf_backends import BACKENDS
+from pdf_processor import PDFProcessor
+
+REFERENCE_BACKEND = "pypdf2"
+
+# Layout analysis regroups text by position, so multi-column pages may read in
+# a different order; differences there are reported but do not fail the run
+LAYOUT_ANALYSIS_BACKENDS = {"pdfminer"}
+
+
+def parse(processor: PDFProcessor, pdf_bytes: bytes) -> Dict:
+    return processor.get_structured_data(processor.extract_text(io.BytesIO(pdf_bytes)))
+
+
+def _normalized(skills: List[str]) -> set:
+    # Listed skills can run over several lines; backends differ only in blank lines between pages
+    return {" ".join(skill.lower().split()) for skill in skills}
+
+
+def _preview(skills: set) -> List[str]:
+    return sorted(skill[:40] for skill in skills)
+
+
+def compare(reference: Dict, candidate: Dict) -> List[str]:
+    """Differences in sections and skills between two parses"""
+    differences = []
+    for section in sorted(set(reference['sections']) | set(candidate['sections'])):
+        expected = reference['sections'].get(section)
+        actual = candidate['sections'].get(section)
+        if expected != actual:
+            differences.append(f"section {section}: {len(expected or [])} vs {len(actual or [])} lines differ")
+    for category in reference['skills']:
+        expected = _normalized(reference['skills'][category])
+        actual = _normalized(candidate['skills'].get(category, []))
+        if expected != actual:
+            differences.append(f"skills {category}: missing {_preview(expected - actual)}, "
+                               f"extra {_preview(actual - expected)}")
+    return differences
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="only the 1 and 5 page resumes")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    installed = [name for name, backend in BACKENDS.items() if backend.available()]
+    if REFERENCE_BACKEND not in installed:
+        print(f"{REFERENCE_BACKEND} is required as the reference backend")
+        return 2
+    processors = {name: PDFProcessor(backend=name) for name in installed}
+    print(f"backends: {', '.join(installed)} (reference: {REFERENCE_BACKEND})")
+
+    header = f"{'resume':<22}" + "".join(f"{name + ' pages/s':>18}" for name in installed)
+    print(header)
+    mismatches = 0
+    for spec in default_corpus(quick=args.quick):
+        pdf_bytes = build_pdf(spec)
+        reference = parse(processors[REFERENCE_BACKEND], pdf_bytes)
+        row = f"{spec.name:<22}"
+        for name in installed:
+            processor = processors[name]
+            for difference in compare(reference, parse(processor, pdf_bytes)) if name != REFERENCE_BACKEND else []:
+                if name in LAYOUT_ANALYSIS_BACKENDS and spec.layout != "single":
+                    print(f"  layout difference {spec.name} {name}: {difference}")
+                else:
+                    print(f"  MISMATCH {spec.name} {name}: {difference}")
+                    mismatches += 1
+            seconds = best_of(lambda: processor.extract_text(io.BytesIO(pdf_bytes)), args.repeat)
+            row += f"{spec.pages / seconds:>18.0f}"
+        print(row)
+
+    if mismatches:
+        print(f"FAIL: {mismatches} difference(s) from {REFERENCE_BACKEND}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,153 @@
+"""Benchmark the resume parsing pipeline stage by stage.
+
+Times PDF decode, structured-data extraction, section split, skill matching
+and prompt building over the synthetic corpus, with tracemalloc peaks and
+throughput, and writes machine-readable JSON so runs can be compared across
+commits:
+
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --compare bench.json      # exit 1 on regressions
+"""
+import argparse
+import io
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List
+
+from benchmarks.corpus import ResumeSpec, build_pdf, default_corpus
+from benchmarks.section_split import section_split_seconds
+from pdf_processor import PDFProcessor
+from prompts import PromptGenerator
+
+
+def measure(func: Callable[[], Any], repeat: int, self_timed: bool = False) -> Dict[str, float]:
+    """Wall-clock timings over ``repeat`` runs plus the peak allocation of one run
+
+    A ``self_timed`` func returns the seconds to record itself, for a stage
+    that production code times inside a larger call.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(result if self_timed else time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "seconds_median": statistics.median(timings),
+        "seconds_min": min(timings),
+        "peak_kib": peak / 1024
+    }
+
+
+def benchmark_spec(spec: ResumeSpec, processor: PDFProcessor, prompt_generator: PromptGenerator,
+                   repeat: int) -> List[Dict[str, Any]]:
+    pdf_bytes = build_pdf(spec)
+    text = processor.extract_text(io.BytesIO(pdf_bytes))
+    structured_data = processor.get_structured_data(text)
+
+    stages = {
+        "pdf_decode": lambda: processor.extract_text(io.BytesIO(pdf_bytes)),
+        "structured_data": lambda: processor.get_structured_data(text),
+        # Timed by get_structured_data's builder, interleaved with skill matching
+        "section_split": lambda: section_split_seconds(processor, text),
+        "skill_match": lambda: processor.extract_skills(text),
+        "prompt_build": lambda: prompt_generator.generate_interview_prompt(
+            structured_data, "Acme Corp", "Backend Developer"),
+    }
+
+    results = []
+    for stage, func in stages.items():
+        timing = measure(func, repeat, self_timed=stage == "section_split")
+        results.append({
+            "case": spec.name,
+            "stage": stage,
+            "pages": spec.pages,
+            "pdf_bytes": len(pdf_bytes),
+            "text_chars": len(text),
+            **timing,
+            "pages_per_second": spec.pages / timing["seconds_median"] if timing["seconds_median"] else None
+        })
+    return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def compare(current: List[Dict[str, Any]], baseline_path: str, threshold: float) -> int:
+    """Print median-time ratios against a previous run; return how many regressed"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(row["case"], row["stage"]): row for row in json.load(f)["results"]}
+
+    regressions = 0
+    print(f"\n{'case':<24} {'stage':<16} {'baseline ms':>12} {'current ms':>11} {'ratio':>6}")
+    for row in current:
+        old = baseline.get((row["case"], row["stage"]))
+        if not old:
+            continue
+        ratio = row["seconds_median"] / old["seconds_median"] if old["seconds_median"] else 1.0
+        flag = "  REGRESSION" if ratio > threshold else ""
+        regressions += bool(flag)
+        print(f"{row['case']:<24} {row['stage']:<16} {old['seconds_median'] * 1000:>12.3f} "
+              f"{row['seconds_median'] * 1000:>11.3f} {ratio:>6.2f}{flag}")
+    return regressions
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--quick", action="store_true", help="only the 1 and 5 page documents")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="median-time ratio above which a stage counts as regressed")
+    args = parser.parse_args(argv)
+
+    processor = PDFProcessor()
+    prompt_generator = PromptGenerator()
+    results = []
+    print(f"{'case':<24} {'stage':<16} {'median ms':>10} {'peak KiB':>9} {'pages/s':>9}")
+    for spec in default_corpus(quick=args.quick):
+        for row in benchmark_spec(spec, processor, prompt_generator, args.repeat):
+            results.append(row)
+            print(f"{row['case']:<24} {row['stage']:<16} {row['seconds_median'] * 1000:>10.3f} "
+                  f"{row['peak_kib']:>9.1f} {row['pages_per_second'] or 0:>9.1f}")
+
+    if args.output:
+        report = {
+            "meta": {
+                "commit": git_commit(),
+                "python": sys.version.split()[0],
+                "platform": platform.platform(),
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "repeat": args.repeat
+            },
+            "results": results
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        return 1 if compare(results, args.compare, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
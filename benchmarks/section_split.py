@@ -0,0 +1,90 @@
+"""Compare the indexed section split against the old nested marker scan.
+
+The indexed side is get_structured_data's own section split, timed by its
+builder; the sections it finds must equal the old scan's.
+Run from the repository root:
+
+    python -m benchmarks.section_split --pages 10 50
+"""
+import argparse
+import re
+from typing import Dict, List
+
+from benchmarks.corpus import ResumeSpec, synthetic_text
+from benchmarks.skill_matching import best_of
+from pdf_processor import PDFProcessor, _StructuredDataBuilder
+
+def legacy_clean_content(sections: Dict[str, List[str]], content: List[str]) -> List[str]:
+    cleaned = []
+    for line in content:
+        line = line.strip()
+        if line and not any(marker.upper() in line.upper()
+                            for markers in sections.values()
+                            for marker in markers):
+            line = re.sub(r'^[-•●■◆○*]+\s*', '', line)
+            if line:
+                cleaned.append(line)
+    return cleaned
+
+
+def legacy_split(sections: Dict[str, List[str]], text: str) -> Dict[str, List[str]]:
+    """The original O(lines x markers) header scan from get_structured_data"""
+    sections_dict = {}
+    current_section = None
+    current_content = []
+    for line in text.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        section_match = None
+        for section_name, markers in sections.items():
+            for marker in markers:
+                if marker.upper() in line.upper():
+                    section_match = section_name
+                    break
+            if section_match:
+                break
+        if section_match:
+            if current_section and current_content:
+                sections_dict[current_section] = legacy_clean_content(sections, current_content)
+            current_section = section_match
+            current_content = []
+        elif current_section:
+            current_content.append(line)
+    if current_section and current_content:
+        sections_dict[current_section] = legacy_clean_content(sections, current_content)
+    return sections_dict
+
+
+def section_split_seconds(processor: PDFProcessor, text: str) -> float:
+    """Time get_structured_data spends splitting sections, as its own builder records it
+
+    Sections and skills are extracted in one pass over the lines, so the
+    production builder is run as is and its ``split_seconds`` reported.
+    """
+    builder = _StructuredDataBuilder(processor)
+    for line in text.split('\n'):
+        builder.feed(line)
+    builder.snapshot()
+    return builder.split_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 50])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    processor = PDFProcessor()
+    print(f"{'pages':>6} {'lines':>7} {'legacy ms':>10} {'indexed ms':>11} {'speedup':>8}")
+    for pages in args.pages:
+        text = synthetic_text(ResumeSpec(pages=pages))
+        assert legacy_split(processor.sections, text) == processor.get_structured_data(text)['sections']
+        legacy = best_of(lambda: legacy_split(processor.sections, text), args.repeat)
+        indexed = min(section_split_seconds(processor, text) for _ in range(args.repeat))
+        print(f"{pages:>6} {text.count(chr(10)) + 1:>7} {legacy * 1000:>10.2f} "
+              f"{indexed * 1000:>11.2f} {legacy / indexed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
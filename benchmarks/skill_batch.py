@@ -0,0 +1,66 @@
+"""Compare batch skill matching against calling extract_skills once per resume.
+
+Cohorts of 1-2 page synthetic resumes are matched both ways; every resume's
+vocabulary skills must agree, and the batch must beat the loop by
+--min-speedup. SciPy is only needed for the matrix check.
+Run from the repository root:
+
+    python -m benchmarks.skill_batch --cohorts 100 1000 5000
+"""
+import argparse
+import importlib.util
+from typing import List
+
+from benchmarks.corpus import ResumeSpec, synthetic_text
+from benchmarks.skill_matching import best_of
+from pdf_processor import PDFProcessor
+
+
+def cohort(size: int) -> List[str]:
+    return [synthetic_text(ResumeSpec(pages=1 + seed % 2, seed=seed)) for seed in range(size)]
+
+
+def check(processor: PDFProcessor, texts: List[str]):
+    """Each resume's batch skills equal the vocabulary part of extract_skills"""
+    batch = processor.extract_skills_batch(texts)
+    for index, text in enumerate(texts):
+        expected = {
+            skill.casefold()
+            for skills in processor.extract_skills(text).values()
+            for skill in skills
+            if skill.casefold() in processor._skill_categories
+        }
+        actual = {skill.casefold() for skills in batch.skills(index).values() for skill in skills}
+        assert expected == actual, f"resume {index}: {sorted(expected ^ actual)}"
+    if importlib.util.find_spec("scipy"):
+        assert batch.matrix().sum() == batch.counts.sum()
+        assert batch.tokens.matrix().sum() == batch.tokens.counts.sum()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cohorts", type=int, nargs="+", default=[100, 1000, 5000], help="resumes per cohort")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--min-speedup", type=float, default=4.0,
+                        help="fail if the batch is not at least this much faster on any cohort")
+    args = parser.parse_args()
+
+    processor = PDFProcessor()
+    print(f"{'resumes':>8} {'per-resume ms':>14} {'batch ms':>9} {'speedup':>8}")
+    for size in args.cohorts:
+        texts = cohort(size)
+        check(processor, texts)
+        looped = best_of(lambda: [processor.extract_skills(text) for text in texts], args.repeat)
+        batched = best_of(lambda: processor.extract_skills_batch(texts), args.repeat)
+        print(f"{size:>8} {looped * 1000:>14.1f} {batched * 1000:>9.1f} {looped / batched:>7.1f}x")
+        assert looped / batched >= args.min_speedup, (
+            f"batch matching is only {looped / batched:.1f}x faster on {size} resumes "
+            f"(expected at least {args.min_speedup:.1f}x)"
+        )
+
+    top = list(processor.extract_skills_batch(texts).document_frequency().items())[:5]
+    print("most common skills in the last cohort:", ", ".join(f"{skill} ({count})" for skill, count in top))
+
+
+if __name__ == "__main__":
+    main()
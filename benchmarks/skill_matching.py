@@ -0,0 +1,52 @@
+"""Compare PDFProcessor.extract_skills against the old per-pattern scan.
+
+extract_skills is timed end to end: the single-pass trie regex plus the
+line-by-line collector for skills listed under "Languages:" and the like.
+Run from the repository root:
+
+    python -m benchmarks.skill_matching --pages 1 5 20 50
+"""
+import argparse
+import re
+import time
+from typing import Dict, List
+
+from benchmarks.corpus import ResumeSpec, synthetic_text
+from pdf_processor import PDFProcessor
+
+def legacy_scan(tech_patterns: Dict[str, List[str]], text: str) -> Dict[str, set]:
+    """The original approach: one re.finditer pass per pattern"""
+    skills = {category: set() for category in tech_patterns}
+    for category, patterns in tech_patterns.items():
+        for pattern in patterns:
+            for match in re.finditer(pattern, text, re.IGNORECASE):
+                skills[category].add(match.group())
+    return skills
+
+
+def best_of(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 5, 20, 50])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    processor = PDFProcessor()
+    print(f"{'pages':>6} {'chars':>9} {'legacy ms':>10} {'extract ms':>10} {'speedup':>8}")
+    for pages in args.pages:
+        text = synthetic_text(ResumeSpec(pages=pages, skill_density=1.0))
+        legacy = best_of(lambda: legacy_scan(processor.tech_patterns, text), args.repeat)
+        extract = best_of(lambda: processor.extract_skills(text), args.repeat)
+        print(f"{pages:>6} {len(text):>9} {legacy * 1000:>10.2f} {extract * 1000:>10.2f} {legacy / extract:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Cold-start import time of the app, summarized from ``python -X importtime``.
+
+Imports the app module in a fresh interpreter, prints the slowest imports
+and exits with status 1 when the total exceeds the budget or a module that
+should load lazily (the Gemini SDK, the PDF libraries) was imported at startup.
+Run from the repository root:
+
+    python -m benchmarks.startup --budget-ms 1500
+    python -m benchmarks.startup --module batch --top 20
+"""
+import argparse
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import List, Optional
+
+# Loaded on first use; importing any of these at startup is a regression
+DEFERRED_MODULES = ["google.generativeai", "PyPDF2", "pypdfium2", "pdfminer"]
+
+
+@dataclass
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(stderr: str) -> List[ImportTiming]:
+    """Entries of ``-X importtime`` output, e.g. ``import time:  362 |  100442 |   PyPDF2``"""
+    timings = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the header line
+        name = fields[2].rstrip()
+        module = name.lstrip()
+        # One leading space after the separator, then two per nesting level
+        depth = (len(name) - len(module) - 1) // 2
+        timings.append(ImportTiming(module, int(fields[0]), int(fields[1]), depth))
+    return timings
+
+
+def measure(module: str, cwd: str) -> List[ImportTiming]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        tail = result.stderr.strip().splitlines()[-1:] or ["no output"]
+        raise RuntimeError(f"import {module} failed: {tail[0]}")
+    return parse_importtime(result.stderr)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="main", help="module to import (default: the Streamlit app)")
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("STARTUP_BUDGET_MS", "2000")),
+                        help="fail above this total import time (default $STARTUP_BUDGET_MS or 2000)")
+    parser.add_argument("--runs", type=int, default=3, help="fresh interpreters to try; the fastest counts")
+    parser.add_argument("--top", type=int, default=15, help="slowest top-level imports to list")
+    parser.add_argument("--allow", nargs="*", default=[], help="deferred modules allowed at startup")
+    args = parser.parse_args(argv)
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        # The first run also pays for writing bytecode caches; a warm container would not
+        runs = [measure(args.module, root) for _ in range(args.runs)]
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 2
+    timings = min(runs, key=lambda run: sum(t.cumulative_us for t in run if t.depth == 0))
+
+    top_level = [t for t in timings if t.depth == 0]
+    total_ms = sum(t.cumulative_us for t in top_level) / 1000
+    print(f"{'cumulative ms':>14} {'self ms':>8}  module")
+    for t in sorted(top_level, key=lambda t: -t.cumulative_us)[:args.top]:
+        print(f"{t.cumulative_us / 1000:>14.1f} {t.self_us / 1000:>8.1f}  {t.module}")
+    print(f"total import time for {args.module}: {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    failed = False
+    imported = {t.module for t in timings}
+    for module in DEFERRED_MODULES:
+        if module in imported and module not in args.allow:
+            print(f"FAIL: {module} is imported at startup; it should load on first use")
+            failed = True
+    if total_ms > args.budget_ms:
+        print(f"FAIL: startup imports take {total_ms:.1f} ms, over the {args.budget_ms:.0f} ms budget")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,98 @@
+"""Compare the shared text normalizers against the old per-call LLMUtils cleanup.
+
+Responses are synthetic markdown guides from 2KB to 200KB. Run from the
+repository root:
+
+    python -m benchmarks.text_normalization --sizes 2 20 200
+"""
+import argparse
+import random
+import re
+from typing import Dict, List
+
+from benchmarks.skill_matching import best_of
+from text_normalization import normalize_response, split_sections, strip_bullet
+
+SECTION_TITLES = ["Technical Questions", "Coding Challenges", "System Design Questions",
+                  "Key Concepts", "Preparation Steps"]
+WORDS = ["latency", "cache", "index", "service", "queue", "trade-off", "consistency", "shard",
+         "retry", "throughput", "schema", "replica", "partition", "deadline", "bottleneck"]
+
+
+def synthetic_response(size_kb: int, seed: int = 0) -> str:
+    """Markdown guide of about ``size_kb`` KB with headers, bullets and ragged whitespace"""
+    rng = random.Random(seed)
+    parts = []
+    length = 0
+    while length < size_kb * 1024:
+        title = SECTION_TITLES[len(parts) % len(SECTION_TITLES)]
+        lines = [f"## {title}", ""]
+        for _ in range(rng.randint(5, 15)):
+            words = " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 20)))
+            lines.append(rng.choice(["- ", "* ", "  ", "1. "]) + words + rng.choice(["", "  ", "\t"]))
+        block = "\n".join(lines) + rng.choice(["\n\n", "\n\n\n\n"])
+        parts.append(block)
+        length += len(block)
+    return "".join(parts)
+
+
+def legacy_clean_response(generated_text: str, prompt: str) -> str:
+    """The original LLMUtils.clean_response"""
+    if prompt in generated_text:
+        response = generated_text[len(prompt):].strip()
+    else:
+        response = generated_text.strip()
+    response = re.sub(r'\n{3,}', '\n\n', response)
+    response = re.sub(r'\s{2,}', ' ', response)
+    return response
+
+
+def legacy_extract_sections(response: str) -> Dict[str, List[str]]:
+    """The original LLMUtils.extract_sections"""
+    sections = {}
+    current_section = None
+    current_content = []
+    for line in response.split('\n'):
+        line = line.strip()
+        if line.startswith('#'):
+            if current_section:
+                sections[current_section] = current_content
+            current_section = line.lstrip('#').strip()
+            current_content = []
+        elif current_section and line:
+            current_content.append(line)
+    if current_section:
+        sections[current_section] = current_content
+    return sections
+
+
+def legacy_strip_bullets(lines: List[str]) -> List[str]:
+    return [re.sub(r'^[-•●■◆○*]+\s*', '', line) for line in lines]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2, 20, 200], help="response sizes in KB")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    prompt = "Create an interview guide."
+    print(f"{'KB':>5} {'function':<18} {'legacy ms':>10} {'new ms':>8} {'speedup':>8}")
+    for size_kb in args.sizes:
+        text = synthetic_response(size_kb)
+        lines = [line.strip() for line in text.split('\n') if line.strip()]
+        cases = [
+            ("clean_response", lambda: legacy_clean_response(text, prompt), lambda: normalize_response(text, prompt)),
+            ("extract_sections", lambda: legacy_extract_sections(text), lambda: split_sections(text)),
+            ("strip_bullets", lambda: legacy_strip_bullets(lines), lambda: [strip_bullet(line) for line in lines]),
+        ]
+        for name, legacy, new in cases:
+            assert legacy() == new(), name
+            legacy_seconds = best_of(legacy, args.repeat)
+            new_seconds = best_of(new, args.repeat)
+            print(f"{size_kb:>5} {name:<18} {legacy_seconds * 1000:>10.3f} {new_seconds * 1000:>8.3f} "
+                  f"{legacy_seconds / new_seconds:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from llm_utils import LLMUtils
+
+_WORD = re.compile(r"[a-z0-9+#.]{3,}")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_STOPWORDS = {
+    "the", "and", "for", "with", "what", "how", "can", "you", "your", "this", "that",
+    "are", "about", "more", "from", "does", "should", "would", "could", "any", "give",
+    "tell", "explain", "please", "which", "when", "why", "have", "into", "some"
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English text)"""
+    return len(text) // 4 + 1
+
+
+def _text_of(message: dict) -> str:
+    return "".join(part.get("text", "") for part in message.get("parts", []))
+
+
+def _keywords(text: str) -> set:
+    return {word for word in _WORD.findall(text.lower()) if word not in _STOPWORDS}
+
+
+def _extractive_summary(text: str, max_chars: int) -> str:
+    """Leading sentences of a message, cut to ``max_chars``"""
+    summary = ""
+    for sentence in _SENTENCE_END.split(" ".join(text.split())):
+        if len(summary) + len(sentence) + 1 > max_chars:
+            break
+        summary = f"{summary} {sentence}".strip()
+    return summary or text[:max_chars].rstrip() + "..."
+
+
+class ChatContextManager:
+    """Builds a bounded Gemini chat history from a session's full transcript
+
+    The transcript holds the generated guide, marked ``"guide": True`` (or
+    simply its first message, if that is the assistant's), followed by
+    follow-up turns; a guide regenerated mid-conversation replaces the
+    earlier one. Instead of resending all of it, each request gets:
+
+    - the latest guide's section outline plus only the sections relevant to
+      the new question, pinned outside the turn window,
+    - a summary of older turns (each turn summarized once, then cached),
+    - the most recent turns verbatim,
+
+    all trimmed to ``token_budget``, so the cost per turn stays roughly flat.
+    """
+
+    def __init__(self, token_budget: int = 3000, recent_messages: int = 4, summary_chars: int = 300,
+                 max_guide_sections: int = 2, summarizer: Optional[Callable[[str], str]] = None,
+                 max_cached_summaries: int = 2048):
+        self.token_budget = token_budget
+        self.recent_messages = recent_messages
+        self.summary_chars = summary_chars
+        self.max_guide_sections = max_guide_sections
+        self.summarizer = summarizer or (lambda text: _extractive_summary(text, self.summary_chars))
+        self.max_cached_summaries = max_cached_summaries
+        self.llm_utils = LLMUtils()
+        self._summaries: "OrderedDict[str, str]" = OrderedDict()
+        self._guide_sections: "OrderedDict[str, Dict[str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def summarize(self, message: dict) -> str:
+        """Summary of one message, computed once per distinct text"""
+        text = _text_of(message)
+        key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        with self._lock:
+            if key in self._summaries:
+                self._summaries.move_to_end(key)
+                return self._summaries[key]
+        summary = self.summarizer(text)
+        with self._lock:
+            self._summaries[key] = summary
+            while len(self._summaries) > self.max_cached_summaries:
+                self._summaries.popitem(last=False)
+        return summary
+
+    def _sections_of(self, guide: str) -> Dict[str, str]:
+        """Guide split into section title -> text, cached per guide"""
+        key = hashlib.sha256(guide.encode("utf-8")).hexdigest()
+        with self._lock:
+            if key in self._guide_sections:
+                return self._guide_sections[key]
+        sections = {
+            title: "\n".join(lines)
+            for title, lines in self.llm_utils.extract_sections(guide).items()
+        }
+        with self._lock:
+            self._guide_sections[key] = sections
+            while len(self._guide_sections) > 64:
+                self._guide_sections.popitem(last=False)
+        return sections
+
+    def _pinned_guide(self, guide: str, question: str) -> List[str]:
+        """Outline of the guide followed by the sections most relevant to the question"""
+        sections = self._sections_of(guide)
+        if not sections:
+            return [f"Interview guide:\n{_extractive_summary(guide, self.summary_chars * 2)}"]
+
+        question_words = _keywords(question)
+        scored = sorted(
+            ((len(question_words & _keywords(f"{title} {body}")), title) for title, body in sections.items()),
+            key=lambda item: -item[0]
+        )
+        relevant = [title for score, title in scored[:self.max_guide_sections] if score > 0]
+
+        parts = ["Interview guide sections: " + "; ".join(sections)]
+        parts.extend(f"# {title}\n{sections[title]}" for title in relevant)
+        return parts
+
+    def build_history(self, transcript: List[dict], question: str) -> List[dict]:
+        """Gemini ``start_chat`` history for answering ``question``
+
+        ``transcript`` holds the session's messages in the app's format
+        ({"role": "user" | "assistant", "parts": [{"text": ...}]}), without the
+        new question. The history alternates user and model turns, as
+        ``start_chat`` requires, and ends with a model turn.
+        """
+        guide, messages = self._split_transcript(transcript)
+
+        # Recent turns stay verbatim and must open with a user message
+        split = max(len(messages) - self.recent_messages, 0)
+        while split < len(messages) and messages[split]["role"] != "user":
+            split += 1
+        older, recent = messages[:split], messages[split:]
+
+        context_parts = self._pinned_guide(guide, question) if guide else []
+        summaries = [
+            f"{'User' if message['role'] == 'user' else 'Assistant'}: {self.summarize(message)}"
+            for message in older
+        ]
+
+        # Trim to the budget: oldest summaries, then extra guide sections, then oldest recent turns
+        def total_tokens() -> int:
+            return (sum(estimate_tokens(part) for part in context_parts + summaries)
+                    + sum(estimate_tokens(_text_of(message)) for message in recent))
+
+        while total_tokens() > self.token_budget and summaries:
+            summaries.pop(0)
+        while total_tokens() > self.token_budget and len(context_parts) > 1:
+            context_parts.pop()
+        while total_tokens() > self.token_budget and len(recent) > 2:
+            recent = recent[2:] if recent[1]["role"] != "user" else recent[1:]
+
+        if summaries:
+            context_parts.append("Earlier in this conversation:\n" + "\n".join(summaries))
+
+        history = []
+        if context_parts:
+            # Context goes in as a user turn acknowledged by the model to keep roles alternating
+            history.append({"role": "user", "parts": [{"text": "\n\n".join(context_parts)}]})
+            history.append({"role": "model", "parts": [{"text": "Understood. I'll use this context."}]})
+        history.extend(recent)
+        return history
+
+    @staticmethod
+    def _split_transcript(transcript: List[dict]):
+        """The latest guide's text, and the other messages as alternating Gemini turns"""
+        guide = None
+        turns: List[dict] = []
+        for index, message in enumerate(transcript):
+            if message.get("guide") or (index == 0 and message["role"] != "user"):
+                guide = _text_of(message)
+                continue
+            role = "user" if message["role"] == "user" else "model"
+            text = _text_of(message)
+            if turns and turns[-1]["role"] == role:
+                # Two in a row, e.g. either side of a regenerated guide: send them as one turn
+                text = f"{_text_of(turns.pop())}\n\n{text}"
+            turns.append({"role": role, "parts": [{"text": text}]})
+        # The new question follows the history, so an unanswered question would make two user turns
+        if turns and turns[-1]["role"] == "user":
+            turns.pop()
+        return guide, turns
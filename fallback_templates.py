@@ -1,3 +1,7 @@
+import re
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
 ROLE_TEMPLATES = {
     "Backend Developer": """# 💻 Technical Questions for Backend Developer
 1. Explain your experience with database design and optimization
@@ -237,17 +241,14 @@ function ItemCreator() {
         Scaling patterns"""
 }
 
-def generate_dynamic_template(role: str) -> str:
-    """Generate a template for roles not in predefined templates"""
-
-    # Common skills and concepts for different role types
-    role_patterns = {
-        "Data Scientist": {
-            "skills": ["Python", "R", "SQL", "Machine Learning", "Statistical Analysis"],
-            "tools": ["Pandas", "Scikit-learn", "TensorFlow", "PyTorch", "Jupyter"],
-            "concepts": ["Machine Learning", "Statistical Modeling", "Data Visualization", "Feature Engineering"],
-            "challenges": ["Model Implementation", "Data Pipeline Design", "Feature Selection"],
-            "code_example": """```python
+# Common skills and concepts for different role types
+ROLE_PATTERNS = {
+    "Data Scientist": {
+        "skills": ["Python", "R", "SQL", "Machine Learning", "Statistical Analysis"],
+        "tools": ["Pandas", "Scikit-learn", "TensorFlow", "PyTorch", "Jupyter"],
+        "concepts": ["Machine Learning", "Statistical Modeling", "Data Visualization", "Feature Engineering"],
+        "challenges": ["Model Implementation", "Data Pipeline Design", "Feature Selection"],
+        "code_example": """```python
 class ModelPipeline:
     def __init__(self):
         self.model = None
@@ -261,13 +262,13 @@ class ModelPipeline:
         self.model = RandomForestClassifier()
         self.model.fit(X_scaled, y)
 ```""",
-        },
-        "DevOps Engineer": {
-            "skills": ["CI/CD", "Docker", "Kubernetes", "Cloud Platforms", "Infrastructure as Code"],
-            "tools": ["Jenkins", "AWS/Azure/GCP", "Terraform", "Ansible", "Git"],
-            "concepts": ["Container Orchestration", "Infrastructure Automation", "Monitoring", "Security"],
-            "challenges": ["Pipeline Implementation", "Infrastructure Setup", "Monitoring System"],
-            "code_example": """```yaml
+    },
+    "DevOps Engineer": {
+        "skills": ["CI/CD", "Docker", "Kubernetes", "Cloud Platforms", "Infrastructure as Code"],
+        "tools": ["Jenkins", "AWS/Azure/GCP", "Terraform", "Ansible", "Git"],
+        "concepts": ["Container Orchestration", "Infrastructure Automation", "Monitoring", "Security"],
+        "challenges": ["Pipeline Implementation", "Infrastructure Setup", "Monitoring System"],
+        "code_example": """```yaml
 version: '3'
 services:
   app:
@@ -283,13 +284,13 @@ services:
     volumes:
       - db_data:/var/lib/postgresql/data
 ```""",
-        },
-        "QA Engineer": {
-            "skills": ["Test Automation", "API Testing", "Performance Testing", "Test Planning"],
-            "tools": ["Selenium", "JUnit/PyTest", "Postman", "JMeter"],
-            "concepts": ["Test Methodologies", "CI/CD Integration", "Test Coverage", "Bug Tracking"],
-            "challenges": ["Test Framework Design", "Automation Script", "Test Strategy"],
-            "code_example": """```python
+    },
+    "QA Engineer": {
+        "skills": ["Test Automation", "API Testing", "Performance Testing", "Test Planning"],
+        "tools": ["Selenium", "JUnit/PyTest", "Postman", "JMeter"],
+        "concepts": ["Test Methodologies", "CI/CD Integration", "Test Coverage", "Bug Tracking"],
+        "challenges": ["Test Framework Design", "Automation Script", "Test Strategy"],
+        "code_example": """```python
 class TestLoginFeature(unittest.TestCase):
     def setUp(self):
         self.driver = webdriver.Chrome()
@@ -300,13 +301,13 @@ class TestLoginFeature(unittest.TestCase):
         dashboard = login_page.login("user", "pass")
         self.assertTrue(dashboard.is_loaded())
 ```""",
-        },
-        "Mobile Developer": {
-            "skills": ["iOS/Android Development", "Cross-platform Development", "Mobile UI/UX", "API Integration"],
-            "tools": ["Swift/Kotlin", "React Native/Flutter", "Xcode/Android Studio", "Firebase"],
-            "concepts": ["Mobile Architecture", "State Management", "Native Features", "Performance"],
-            "challenges": ["UI Implementation", "State Management", "Native Integration"],
-            "code_example": """```swift
+    },
+    "Mobile Developer": {
+        "skills": ["iOS/Android Development", "Cross-platform Development", "Mobile UI/UX", "API Integration"],
+        "tools": ["Swift/Kotlin", "React Native/Flutter", "Xcode/Android Studio", "Firebase"],
+        "concepts": ["Mobile Architecture", "State Management", "Native Features", "Performance"],
+        "challenges": ["UI Implementation", "State Management", "Native Integration"],
+        "code_example": """```swift
 class HomeViewController: UIViewController {
     private let viewModel: HomeViewModel
 
@@ -324,16 +325,52 @@ class HomeViewController: UIViewController {
     }
 }
 ```""",
-        }
+    },
+    "Software Engineer": {
+        "skills": ["Data Structures", "Algorithms", "Object-Oriented Design", "SQL", "Testing"],
+        "tools": ["Git", "Docker", "CI/CD Pipelines", "Linux", "Debuggers and Profilers"],
+        "concepts": ["Clean Code", "Code Review", "Scalability", "Concurrency"],
+        "challenges": ["URL Shortener", "LRU Cache", "Task Scheduler"],
+        "code_example": """```python
+class LRUCache:
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.items = OrderedDict()
+
+    def get(self, key):
+        if key not in self.items:
+            return None
+        self.items.move_to_end(key)
+        return self.items[key]
+
+    def put(self, key, value):
+        self.items[key] = value
+        self.items.move_to_end(key)
+        if len(self.items) > self.capacity:
+            self.items.popitem(last=False)
+```""",
+    },
+    "Security Engineer": {
+        "skills": ["Threat Modeling", "Network Security", "Secure Code Review", "Python", "Cryptography"],
+        "tools": ["Burp Suite", "Wireshark", "Nmap", "Splunk/SIEM", "OWASP ZAP"],
+        "concepts": ["Defense in Depth", "Identity and Access Management", "Incident Response", "OWASP Top 10"],
+        "challenges": ["Vulnerability Assessment", "Intrusion Detection Rule", "Secrets Management"],
+        "code_example": """```python
+def verify_password(password: str, stored_hash: bytes, salt: bytes) -> bool:
+    candidate = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, 600_000)
+    # Constant-time comparison, so timing does not leak how much matched
+    return hmac.compare_digest(candidate, stored_hash)
+```""",
     }
+}
 
-    # Default pattern for unknown roles
-    default_pattern = {
-        "skills": ["Software Development", "Problem Solving", "System Design", "Testing"],
-        "tools": ["Relevant IDEs", "Version Control", "Project Management Tools"],
-        "concepts": ["Software Architecture", "Best Practices", "Design Patterns"],
-        "challenges": ["Implementation", "System Design", "Problem Solving"],
-        "code_example": """```python
+# Default pattern for unknown roles
+DEFAULT_PATTERN = {
+    "skills": ["Software Development", "Problem Solving", "System Design", "Testing"],
+    "tools": ["Relevant IDEs", "Version Control", "Project Management Tools"],
+    "concepts": ["Software Architecture", "Best Practices", "Design Patterns"],
+    "challenges": ["Implementation", "System Design", "Problem Solving"],
+    "code_example": """```python
 class Solution:
     def implement_feature(self):
         # Feature implementation
@@ -343,12 +380,11 @@ class Solution:
         # Edge case handling
         pass
 ```""",
-    }
+}
 
-    # Get the appropriate pattern or use default
-    pattern = role_patterns.get(role, default_pattern)
 
-    # Generate the template
+def _render_dynamic_template(role: str, pattern: dict) -> str:
+    """Fill the shared guide layout with a role's skills, tools and concepts"""
     return f"""# 💻 Technical Questions for {role}
 
 1. Explain your experience with {', '.join(pattern['skills'][:3])}
@@ -406,8 +442,129 @@ class Solution:
    - Best practices
    - Performance optimization"""
 
+
+@lru_cache(maxsize=1024)
+def generate_dynamic_template(role: str) -> str:
+    """Generate a template for roles not in predefined templates (rendered once per role)"""
+    return _render_dynamic_template(role, ROLE_PATTERNS.get(role, DEFAULT_PATTERN))
+
+
+# Extra phrasings that should resolve to a template role. A role matches an
+# alias only if it contains the alias's (normalized) words next to each other
+# and in order, so one-word aliases must be specific to their role: "sre" is,
+# "platform" and "ai" are not
+ROLE_ALIASES = {
+    "Backend Developer": ["server side", "api developer", "java", "spring boot", "golang"],
+    "Frontend Developer": ["ui developer", "web developer", "react developer", "javascript", "typescript"],
+    "Full Stack Developer": ["full stack web"],
+    "Data Scientist": ["data science", "machine learning", "ml", "data analyst", "ai research"],
+    "DevOps Engineer": ["sre", "site reliability", "infrastructure", "cloud infrastructure", "platform reliability"],
+    "QA Engineer": ["quality assurance", "test", "testing", "sdet", "test automation"],
+    "Mobile Developer": ["ios", "android", "react native", "flutter", "app developer"],
+    "Software Engineer": ["software", "swe"],
+    "Security Engineer": ["security", "application security", "appsec", "cybersecurity", "infosec",
+                          "penetration tester"]
+}
+
+# Words that say nothing about which template fits
+_ROLE_NOISE = {
+    "sr", "senior", "jr", "junior", "lead", "staff", "principal", "head", "chief", "associate",
+    "intern", "i", "ii", "iii", "iv", "engineer", "developer", "programmer", "specialist",
+    "of", "and", "the"
+}
+_NON_WORD = re.compile(r"[^a-z0-9+#]+")
+_ROLE_COMPOUNDS = re.compile(r"\b(?:front end|back end|full stack|dev ops)\b")
+
+# Share of words a role and its best match must have in common (Jaccard of the
+# word sets); below this the generic template is used
+ROLE_MATCH_THRESHOLD = 0.5
+# Words this long may differ by one typo (an edit or a swap of neighbours)
+_TYPO_MIN_LENGTH = 5
+
+
+def normalize_role(role: str) -> str:
+    """Lowercased role with punctuation, seniority and generic job words removed"""
+    # "Front-End", "front end" and "frontend" all become "frontend"
+    text = _NON_WORD.sub(" ", role.lower().replace("-", ""))
+    words = _ROLE_COMPOUNDS.sub(lambda match: match.group().replace(" ", ""), " ".join(text.split())).split()
+    meaningful = [word for word in words if word not in _ROLE_NOISE]
+    return " ".join(meaningful or words)
+
+
+def _one_edit_apart(a: str, b: str) -> bool:
+    """True if one insertion, deletion, substitution or swap of neighbours turns ``a`` into ``b``"""
+    if abs(len(a) - len(b)) > 1:
+        return False
+    prefix = next((i for i, (x, y) in enumerate(zip(a, b)) if x != y), min(len(a), len(b)))
+    if len(a) == len(b):
+        return a[prefix + 1:] == b[prefix + 1:] or (a[prefix:prefix + 2] == b[prefix:prefix + 2][::-1]
+                                                     and a[prefix + 2:] == b[prefix + 2:])
+    shorter, longer = (a, b) if len(a) < len(b) else (b, a)
+    return shorter[prefix:] == longer[prefix + 1:]
+
+
+def _same_word(word: str, candidate: str) -> bool:
+    if word == candidate:
+        return True
+    return min(len(word), len(candidate)) >= _TYPO_MIN_LENGTH and _one_edit_apart(word, candidate)
+
+
+def _jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+def _build_template_store() -> Tuple[Dict[str, str], List[Tuple[Tuple[str, ...], str]]]:
+    """Render every known role's template once and index its normalized names"""
+    templates = dict(ROLE_TEMPLATES)
+    for role in ROLE_PATTERNS:
+        templates.setdefault(role, _render_dynamic_template(role, ROLE_PATTERNS[role]))
+
+    index = []
+    for role in templates:
+        for name in [role] + ROLE_ALIASES.get(role, []):
+            index.append((tuple(normalize_role(name).split()), role))
+    return templates, index
+
+
+_TEMPLATES, _ROLE_INDEX = _build_template_store()
+
+
+@lru_cache(maxsize=4096)
+def match_role(role: str) -> Optional[str]:
+    """Known role whose template best fits ``role``, or None if nothing is close
+
+    A known name or alias is a candidate only if ``role`` contains its
+    normalized words in a row (allowing one typo in longer words), and the
+    candidates are scored by word overlap: "Senior Data Scientist" and "Data
+    Scienist" match Data Scientist, while "Data Engineer" (no "science"),
+    "Data Security Analyst" ("data" and "analyst" are apart) and "Web3
+    Developer" ("web3" is not "web") match nothing.
+    """
+    sequence = normalize_role(role).split()
+    words = frozenset(sequence)
+    best_role, best_score = None, 0.0
+    for candidate_words, candidate in _ROLE_INDEX:
+        # The role's own spelling of the candidate's words, so typos count as overlap
+        spelled = next(
+            (frozenset(sequence[start:start + len(candidate_words)])
+             for start in range(len(sequence) - len(candidate_words) + 1)
+             if all(map(_same_word, sequence[start:start + len(candidate_words)], candidate_words))),
+            None
+        )
+        if spelled is None:
+            continue
+        score = _jaccard(words, spelled)
+        if score > best_score:
+            best_role, best_score = candidate, score
+    return best_role if best_score >= ROLE_MATCH_THRESHOLD else None
+
+
 def get_role_template(role: str) -> str:
-    """Get the template for a specific role"""
-    if role in ROLE_TEMPLATES:
-        return ROLE_TEMPLATES[role]
-    return generate_dynamic_template(role)
\ No newline at end of file
+    """Get the template for a specific role, or for the closest known role"""
+    template = _TEMPLATES.get(role)
+    if template is not None:
+        return template
+    matched = match_role(role)
+    if matched is not None:
+        return _TEMPLATES[matched]
+    return generate_dynamic_template(role)
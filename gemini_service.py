@@ -1,22 +1,90 @@
-import google.generativeai as genai
-from typing import Optional
+import asyncio
+import logging
+import threading
+from typing import Iterator, Optional
 import time
 
+from chat_context import estimate_tokens
+from llm_utils import LLMUtils
+from metrics import metrics
+from rate_limiter import RateLimiter, RateLimitExceeded, SingleFlight
+from resilience import CircuitOpenError, DeadlineExceeded, ResilientCaller
+from response_cache import ResponseCache
+
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = 'gemini-2.0-flash'
+
+# Default for per-call ``timeout`` arguments: use the service's own timeout.
+# A sentinel rather than None, because a None timeout leaves only the retry policy's deadline
+_SERVICE_TIMEOUT = object()
+
+
+def _genai():
+    """google.generativeai, imported on first use
+
+    The SDK (with grpc and protobuf) is the largest import in the app, and
+    sessions that never generate a guide should not pay for it at cold start.
+    """
+    import google.generativeai as genai
+    return genai
+
+
 class GeminiService:
-    def __init__(self, api_key: str):
-        genai.configure(api_key=api_key)
+    def __init__(self, api_key: str, cache: Optional[ResponseCache] = None, model=None,
+                 resilience: Optional[ResilientCaller] = None, fallback_on_failure: bool = True,
+                 rate_limiter: Optional[RateLimiter] = None, coalesce: bool = True):
+        self._api_key = api_key
+        self.cache = cache
+        # Requests wait for RPM/TPM quota before going upstream, and identical
+        # guide requests in flight at the same time share one upstream call
+        self.rate_limiter = rate_limiter
+        self.single_flight = SingleFlight() if coalesce else None
+        # Retries, deadline, hedging and circuit breaker around every API call.
+        # With fallback_on_failure, guides degrade to the role templates when
+        # the circuit is open or the deadline runs out instead of returning an error
+        self.resilience = resilience or ResilientCaller()
+        self.fallback_on_failure = fallback_on_failure
+        self.llm_utils = LLMUtils()
+        self.generation_config = {
+            'temperature': 0.7,
+            'top_p': 0.95,
+            'top_k': 40,
+            'max_output_tokens': 2048,
+            'candidate_count': 1
+        }
 
-        # Initialize with Gemini 2.0 Flash model
-        try:
-            self.model = genai.GenerativeModel('gemini-2.0-flash')
-        except Exception as e:
-            print(f"Error initializing Gemini model: {str(e)}")
-            raise
+        # Gemini 2.0 Flash is set up on first use, unless a model object is injected.
+        # The warm-up thread and the first request may both get there first
+        self._model = model
+        self._injected_model = model is not None
+        self._model_lock = threading.Lock()
+        self.model_error: Optional[Exception] = None
 
-    def generate_response(self, prompt: str, role: str) -> str:
-        try:
-            # Enhanced prompt for better structure
-            structured_prompt = f"""As an expert technical interviewer, create a detailed interview guide for a {role} position.
+    @property
+    def model(self):
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    try:
+                        genai = _genai()
+                        genai.configure(api_key=self._api_key)
+                        self._model = genai.GenerativeModel(MODEL_NAME)
+                    except Exception as e:
+                        logger.error("Error initializing Gemini model: %s", e)
+                        self.model_error = e
+                        raise
+        return self._model
+
+    def _generation_config(self, config: dict):
+        """The SDK's GenerationConfig; an injected model (e.g. a test fake) gets the plain dict"""
+        if self._injected_model:
+            return config
+        return _genai().types.GenerationConfig(**config)
+
+    def build_structured_prompt(self, prompt: str, role: str) -> str:
+        """Wrap the resume prompt in the interview-guide instructions"""
+        return f"""As an expert technical interviewer, create a detailed interview guide for a {role} position.
 
 Context:
 {prompt}
@@ -30,25 +98,119 @@ Please provide a structured response with the following sections:
 
 Focus on practical, real-world scenarios and provide specific examples."""
 
-            # Generate response with Gemini 2.0 Flash
-            response = self.model.generate_content(
-                contents=structured_prompt,
-                generation_config=genai.types.GenerationConfig(
-                    temperature=0.7,
-                    top_p=0.95,
-                    top_k=40,
-                    max_output_tokens=2048,
-                    candidate_count=1
+    def generate_response(self, prompt: str, role: str) -> str:
+        try:
+            # Enhanced prompt for better structure
+            structured_prompt = self.build_structured_prompt(prompt, role)
+            return self._complete(structured_prompt) or "Failed to generate response."
+
+        except (CircuitOpenError, DeadlineExceeded, RateLimitExceeded) as e:
+            if self.fallback_on_failure:
+                return self._fallback_response(role, e)
+            logger.error("Error in Gemini API call: %s", e)
+            return f"Error generating response: {str(e)}"
+        except Exception as e:
+            logger.error("Error in Gemini API call: %s", e)
+            return f"Error generating response: {str(e)}"
+
+    def generate_section(self, section_prompt: str, max_output_tokens: Optional[int] = None) -> str:
+        """Generate one guide section from a complete prompt
+
+        Unlike generate_response this raises on failure (including an empty
+        response), so callers that memoize sections never keep an error.
+        ``max_output_tokens`` caps the section below the full-guide budget,
+        which also keeps its rate-limit reservation small.
+        """
+        text = self._complete(section_prompt, self._section_config(max_output_tokens))
+        if not text:
+            raise ValueError("Empty response for guide section")
+        return text
+
+    def stream_section(self, section_prompt: str, max_output_tokens: Optional[int] = None) -> Iterator[str]:
+        """Streaming variant of generate_section; raises on failure, possibly after some chunks"""
+        generation_config = self._section_config(max_output_tokens)
+        # Shares generate_section's cache entries, so either call serves the other
+        cache_key = self._cache_key(section_prompt, generation_config)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+
+        chunks = []
+        with metrics.span("llm_call", mode="section_stream"):
+            for chunk in self._stream(section_prompt, generation_config):
+                chunks.append(chunk)
+                yield chunk
+        if not chunks:
+            raise ValueError("Empty response for guide section")
+        self._cache_put(cache_key, "".join(chunks))
+
+    def _section_config(self, max_output_tokens: Optional[int]) -> Optional[dict]:
+        if max_output_tokens is None:
+            return None
+        return dict(self.generation_config, max_output_tokens=max_output_tokens)
+
+    def _complete(self, structured_prompt: str, generation_config: Optional[dict] = None) -> str:
+        """Cached, coalesced, rate-limited and retried completion; raises on failure"""
+        generation_config = generation_config or self.generation_config
+        # Identical prompt and settings served recently: skip the API call
+        cache_key = self._cache_key(structured_prompt, generation_config)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
+        # Generate response with Gemini 2.0 Flash
+        def attempt():
+            with metrics.span("llm_call", mode="generate"):
+                return self.model.generate_content(
+                    contents=structured_prompt,
+                    generation_config=self._generation_config(generation_config)
                 )
-            )
 
-            if response.text:
-                return response.text
-            return "Failed to generate response."
+        def upstream():
+            reserved = self._reserve_quota(structured_prompt, max_output_tokens=generation_config['max_output_tokens'])
+            response = self.resilience.call(attempt)
+            self._settle_quota(reserved, response)
+            return response
+
+        response = self._coalesced(self._request_key(structured_prompt, generation_config), upstream)
+
+        if response.text:
+            self._cache_put(cache_key, response.text)
+        return response.text
+
+    def stream_response(self, prompt: str, role: str) -> Iterator[str]:
+        """Streaming variant of generate_response that yields text chunks as they arrive"""
+        try:
+            structured_prompt = self.build_structured_prompt(prompt, role)
 
+            cache_key = self._cache_key(structured_prompt)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+
+            chunks = []
+            with metrics.span("llm_call", mode="stream"):
+                for chunk in self._stream(structured_prompt):
+                    chunks.append(chunk)
+                    yield chunk
+
+            if chunks:
+                # Only complete responses are cached
+                self._cache_put(cache_key, "".join(chunks))
+            else:
+                yield "Failed to generate response."
+
+        except (CircuitOpenError, DeadlineExceeded, RateLimitExceeded) as e:
+            if self.fallback_on_failure:
+                yield self._fallback_response(role, e)
+            else:
+                logger.error("Error in Gemini streaming API call: %s", e)
+                yield f"Error generating response: {str(e)}"
         except Exception as e:
-            print(f"Error in Gemini API call: {str(e)}")
-            return f"Error generating response: {str(e)}"
+            logger.error("Error in Gemini streaming API call: %s", e)
+            yield f"Error generating response: {str(e)}"
 
     def chat_with_history(self, history: list, new_question: str) -> str:
         """
@@ -62,13 +224,282 @@ Focus on practical, real-world scenarios and provide specific examples."""
             The generated response as a string, or an error message.
         """
         try:
-            chat = self.model.start_chat(history=history)
-            response = chat.send_message(new_question)
+            # A fresh chat per attempt, so retries and hedges never share session state
+            def attempt():
+                with metrics.span("llm_call", mode="chat"):
+                    return self.model.start_chat(history=history).send_message(new_question)
+
+            reserved = self._reserve_quota(new_question, history)
+            response = self.resilience.call(attempt)
+            self._settle_quota(reserved, response)
+
+            if response.text:
+                return response.text
+            return "Failed to generate response."
+
+        except Exception as e:
+            logger.error("Error in Gemini API call with history: %s", e)
+            return f"Error generating response with history: {str(e)}"
+
+    def stream_chat_with_history(self, history: list, new_question: str) -> Iterator[str]:
+        """Streaming variant of chat_with_history that yields text chunks as they arrive"""
+        try:
+            def open_stream():
+                response = self.model.start_chat(history=history).send_message(new_question, stream=True)
+                return self._first_chunk(self._iter_chunk_text(response, mode="chat_stream"), response)
+
+            reserved = self._reserve_quota(new_question, history)
+            received = False
+            with metrics.span("llm_call", mode="chat_stream"):
+                for chunk in self._settled_stream(open_stream, reserved,
+                                                  self.generation_config['max_output_tokens']):
+                    received = True
+                    yield chunk
+
+            if not received:
+                yield "Failed to generate response."
+
+        except Exception as e:
+            logger.error("Error in Gemini streaming API call with history: %s", e)
+            yield f"Error generating response with history: {str(e)}"
+
+    def _stream(self, structured_prompt: str, generation_config: Optional[dict] = None) -> Iterator[str]:
+        """Coalesced, rate-limited and retried completion stream; raises on failure"""
+        generation_config = generation_config or self.generation_config
+
+        def open_stream():
+            response = self.model.generate_content(
+                contents=structured_prompt,
+                generation_config=self._generation_config(generation_config),
+                stream=True
+            )
+            return self._first_chunk(self._iter_chunk_text(response, mode="stream"), response)
+
+        def upstream():
+            max_output_tokens = generation_config['max_output_tokens']
+            reserved = self._reserve_quota(structured_prompt, max_output_tokens=max_output_tokens)
+            yield from self._settled_stream(open_stream, reserved, max_output_tokens)
+
+        if self.single_flight is None:
+            return upstream()
+        return self.single_flight.stream(self._request_key(structured_prompt, generation_config), upstream)
+
+    def _iter_chunk_text(self, response, mode: str = "stream") -> Iterator[str]:
+        """Yield the non-empty text of each streamed chunk, recording time to first chunk"""
+        started = time.perf_counter()
+        first = True
+        for chunk in response:
+            try:
+                text = chunk.text
+            except ValueError:
+                # Chunks without text parts (e.g. only safety metadata) raise on .text
+                continue
+            if text:
+                if first:
+                    metrics.observe("stage_seconds", time.perf_counter() - started, stage="llm_first_chunk", mode=mode)
+                    first = False
+                yield text
+
+    @staticmethod
+    def _first_chunk(chunks: Iterator[str], response):
+        """Pull the first chunk so errors and slowness before any output surface in the retried call"""
+        return next(chunks, None), chunks, response
+
+    @staticmethod
+    def _close_stream(opened):
+        """Close a stream that lost a hedge or was abandoned, releasing its response iterator"""
+        _, chunks, _ = opened
+        chunks.close()
+
+    def _settled_stream(self, open_stream, reserved: int, max_output_tokens: int) -> Iterator[str]:
+        """Chunks of a retried stream, settling its quota reservation once it ends or fails
+
+        Retries and hedging cover the wait for the first chunk; once text has
+        been shown the stream cannot be restarted.
+        """
+        response, received = None, []
+        try:
+            first, chunks, response = self.resilience.call(open_stream, discard=self._close_stream)
+            for chunk in self._resume_stream(first, chunks):
+                received.append(chunk)
+                yield chunk
+        finally:
+            # Without reported usage (e.g. after an error), charge the input plus what was received
+            estimated = reserved - max_output_tokens + estimate_tokens("".join(received))
+            self._settle_quota(reserved, response, estimated)
+
+    @staticmethod
+    def _resume_stream(first: Optional[str], chunks: Iterator[str]) -> Iterator[str]:
+        if first is not None:
+            yield first
+            yield from chunks
+
+    def _fallback_response(self, role: str, error: Exception) -> str:
+        """Role template served instead of a generated guide while the API is unavailable"""
+        logger.warning("Serving fallback template for %s: %s", role, error)
+        metrics.increment("fallback_responses_total", reason=type(error).__name__)
+        return self.llm_utils.get_fallback_response(role)
+
+    def _request_key(self, structured_prompt: str, generation_config: Optional[dict] = None) -> str:
+        return ResponseCache.make_key(structured_prompt, generation_config or self.generation_config, MODEL_NAME)
+
+    def _cache_key(self, structured_prompt: str, generation_config: Optional[dict] = None) -> Optional[str]:
+        if self.cache is None:
+            return None
+        return self._request_key(structured_prompt, generation_config)
+
+    def _request_tokens(self, text: str, history: Optional[list] = None,
+                        max_output_tokens: Optional[int] = None) -> int:
+        """Quota to reserve: estimated input tokens plus the maximum output"""
+        history_text = "".join(
+            part.get("text", "") if isinstance(part, dict) else str(part)
+            for message in history or [] for part in message.get("parts", [])
+        )
+        if max_output_tokens is None:
+            max_output_tokens = self.generation_config['max_output_tokens']
+        return estimate_tokens(text + history_text) + max_output_tokens
+
+    def _reserve_quota(self, text: str, history: Optional[list] = None,
+                       max_output_tokens: Optional[int] = None) -> int:
+        """Wait for rate-limit quota for one request, returning the tokens reserved"""
+        if self.rate_limiter is None:
+            return 0
+        tokens = self._request_tokens(text, history, max_output_tokens)
+        self.rate_limiter.acquire(tokens)
+        return tokens
+
+    def _settle_quota(self, reserved: int, response, estimated: Optional[int] = None):
+        # Hand back the unused part of the reservation when the API reports usage,
+        # or when the caller can estimate it
+        usage = getattr(response, "usage_metadata", None)
+        used = getattr(usage, "total_token_count", None)
+        if not isinstance(used, int):
+            used = estimated
+        if self.rate_limiter is not None and reserved and isinstance(used, int):
+            self.rate_limiter.settle(reserved, used)
+
+    def _coalesced(self, key: str, fn):
+        if self.single_flight is None:
+            return fn()
+        return self.single_flight.do(key, fn)
+
+    def _cache_get(self, cache_key: Optional[str]) -> Optional[str]:
+        if cache_key is None:
+            return None
+        return self.cache.get(cache_key)
+
+    def _cache_put(self, cache_key: Optional[str], text: str):
+        if cache_key is not None:
+            self.cache.put(cache_key, text)
+
+
+class AsyncGeminiService(GeminiService):
+    """asyncio variant of GeminiService with a bounded number of in-flight requests
+
+    Many sessions or batch jobs can await calls concurrently on one event loop;
+    at most ``max_concurrency`` of them reach the API at a time and each call,
+    retries included, is cancelled after ``timeout`` seconds (None falls back
+    to the retry policy's deadline). Calls can override ``timeout``, None
+    included.
+    """
+
+    def __init__(self, api_key: str, cache: Optional[ResponseCache] = None, model=None,
+                 max_concurrency: int = 8, timeout: Optional[float] = 60.0,
+                 resilience: Optional[ResilientCaller] = None, fallback_on_failure: bool = True,
+                 rate_limiter: Optional[RateLimiter] = None, coalesce: bool = True):
+        super().__init__(api_key, cache=cache, model=model, resilience=resilience,
+                         fallback_on_failure=fallback_on_failure, rate_limiter=rate_limiter, coalesce=coalesce)
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._semaphore = None
+        self._semaphore_loop = None
+
+    def _limiter(self) -> asyncio.Semaphore:
+        # Semaphores must be created on the loop that uses them (Python < 3.10)
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def _areserve_quota(self, text: str, history: Optional[list] = None) -> int:
+        if self.rate_limiter is None:
+            return 0
+        tokens = self._request_tokens(text, history)
+        await self.rate_limiter.aacquire(tokens)
+        return tokens
+
+    def _deadline(self, timeout) -> Optional[float]:
+        return self.timeout if timeout is _SERVICE_TIMEOUT else timeout
+
+    async def agenerate_response(self, prompt: str, role: str, timeout=_SERVICE_TIMEOUT) -> str:
+        """Async generate_response; cancelling the awaiting task cancels the API call"""
+        try:
+            structured_prompt = self.build_structured_prompt(prompt, role)
+
+            cache_key = self._cache_key(structured_prompt)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                return cached
+
+            # Only attempts hold a concurrency slot, not backoff sleeps between them
+            async def attempt():
+                async with self._limiter():
+                    with metrics.span("llm_call", mode="async_generate"):
+                        return await self.model.generate_content_async(
+                            contents=structured_prompt,
+                            generation_config=self._generation_config(self.generation_config)
+                        )
+
+            async def upstream():
+                reserved = await self._areserve_quota(structured_prompt)
+                response = await self.resilience.acall(attempt, deadline=self._deadline(timeout))
+                self._settle_quota(reserved, response)
+                return response
+
+            if self.single_flight is not None:
+                response = await self.single_flight.ado(self._request_key(structured_prompt), upstream)
+            else:
+                response = await upstream()
+
+            if response.text:
+                self._cache_put(cache_key, response.text)
+                return response.text
+            return "Failed to generate response."
+
+        except DeadlineExceeded as e:
+            if self.fallback_on_failure:
+                return self._fallback_response(role, e)
+            logger.warning("Gemini API call timed out")
+            return "Error generating response: request timed out"
+        except (CircuitOpenError, RateLimitExceeded) as e:
+            if self.fallback_on_failure:
+                return self._fallback_response(role, e)
+            logger.warning("Gemini API call rejected: %s", e)
+            return f"Error generating response: {str(e)}"
+        except Exception as e:
+            logger.error("Error in async Gemini API call: %s", e)
+            return f"Error generating response: {str(e)}"
+
+    async def achat_with_history(self, history: list, new_question: str, timeout=_SERVICE_TIMEOUT) -> str:
+        """Async chat_with_history"""
+        try:
+            async def attempt():
+                async with self._limiter():
+                    with metrics.span("llm_call", mode="async_chat"):
+                        return await self.model.start_chat(history=history).send_message_async(new_question)
+
+            reserved = await self._areserve_quota(new_question, history)
+            response = await self.resilience.acall(attempt, deadline=self._deadline(timeout))
+            self._settle_quota(reserved, response)
 
             if response.text:
                 return response.text
             return "Failed to generate response."
 
+        except DeadlineExceeded:
+            logger.warning("Gemini API call with history timed out")
+            return "Error generating response with history: request timed out"
         except Exception as e:
-            print(f"Error in Gemini API call with history: {str(e)}")
+            logger.error("Error in async Gemini API call with history: %s", e)
             return f"Error generating response with history: {str(e)}"
@@ -1,12 +1,152 @@
 import streamlit as st
 from gemini_service import GeminiService
-from pdf_processor import PDFProcessor
+from parsing_service import ParsingService
 from prompts import PromptGenerator
-from dotenv import load_dotenv
+from resume_cache import ResumeCache
+from response_cache import MemoryResponseCache, ResponseCache, SQLiteResponseCache
+from service_registry import registry
+from chat_context import ChatContextManager
+from metrics import metrics
+from pipeline import Pipeline, build_guide_pipeline, merge_sections, section_stage
+from prefetch import GuidePrefetcher
+from prompts import GUIDE_SECTIONS
+from rate_limiter import RateLimiter
+from resilience import ResilientCaller, RetryPolicy
+from upload_ingest import UploadRejected, ingest_stream, max_upload_bytes
+from collections import Counter
+from contextlib import nullcontext
+import json
+import logging
 import os
+import threading
+import time
+import uuid
 
-# Load environment variables
-load_dotenv()
+def load_environment() -> bool:
+    """Load .env from the working or app directory; python-dotenv is only imported when one exists"""
+    app_dir = os.path.dirname(os.path.abspath(__file__))
+    for directory in (os.getcwd(), app_dir):
+        path = os.path.join(directory, ".env")
+        if os.path.isfile(path):
+            from dotenv import load_dotenv
+            return load_dotenv(path)
+    return False
+
+# Load environment variables (once per process; Streamlit re-executes this file on every rerun)
+registry.get("environment", load_environment)
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"), format="%(levelname)s %(name)s: %(message)s")
+logger = logging.getLogger(__name__)
+
+# Role buttons offered while no role is entered
+SUGGESTED_ROLES = [
+    "Frontend Developer",
+    "Backend Developer",
+    "Full Stack Developer",
+    "Data Scientist",
+    "DevOps Engineer",
+    "Software Engineer"
+]
+
+def get_resume_cache() -> ResumeCache:
+    """Parsed-resume cache shared by every session in this process"""
+    return registry.get("resume_cache", lambda: ResumeCache(cache_dir=os.getenv("RESUME_CACHE_DIR")))
+
+def get_parsing_service() -> ParsingService:
+    """Process pool that parses uploads for every session in this process"""
+    return registry.get(
+        "parsing_service",
+        lambda: ParsingService(timeout=float(os.getenv("PDF_PARSE_TIMEOUT", "30")))
+    )
+
+def build_response_cache() -> ResponseCache:
+    """LLM response cache; SQLite-backed when RESPONSE_CACHE_PATH is set so workers share hits"""
+    ttl_seconds = float(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+    cache_path = os.getenv("RESPONSE_CACHE_PATH")
+    if cache_path:
+        return SQLiteResponseCache(cache_path, ttl_seconds=ttl_seconds)
+    return MemoryResponseCache(ttl_seconds=ttl_seconds)
+
+def get_response_cache() -> ResponseCache:
+    return registry.get("response_cache", build_response_cache)
+
+def get_rate_limiter() -> RateLimiter:
+    """Gemini quota shared by every session; GEMINI_RPM and GEMINI_TPM set the limits"""
+    return registry.get("rate_limiter", lambda: RateLimiter(
+        requests_per_minute=float(os.getenv("GEMINI_RPM", "60")),
+        tokens_per_minute=float(os.getenv("GEMINI_TPM", "1000000"))
+    ))
+
+def build_llm_resilience() -> ResilientCaller:
+    """Retry policy and circuit breaker for LLM calls; LLM_DEADLINE and LLM_HEDGE_AFTER tune it"""
+    hedge_after = os.getenv("LLM_HEDGE_AFTER")
+    return ResilientCaller(RetryPolicy(
+        deadline=float(os.getenv("LLM_DEADLINE", "45")),
+        hedge_after=float(hedge_after) if hedge_after else None
+    ))
+
+def get_guide_pipeline(llm_service, prompt_generator) -> Pipeline:
+    """Memoized resume -> skills -> per-section guide stages, shared by every session"""
+    return registry.get(
+        "guide_pipeline",
+        lambda: build_guide_pipeline(llm_service, prompt_generator, parsing_service=get_parsing_service(),
+                                     resume_cache=get_resume_cache()),
+        key=id(llm_service)
+    )
+
+def warm_up_llm(llm_service):
+    """Import the Gemini SDK in the background once the first page is out
+
+    The SDK is loaded lazily to keep cold start short; this moves the import
+    off the first guide request without delaying the first render.
+    """
+    def load():
+        try:
+            llm_service.model
+        except Exception:
+            pass  # Logged by the service; the request path will report it
+
+    def start():
+        thread = threading.Thread(target=load, name="llm-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    registry.get("llm_warm_up", start, key=id(llm_service))
+
+def ingest_uploads(uploaded_files) -> dict:
+    """Ingest new uploads into this session and release ones that were removed
+
+    Uploads are keyed by Streamlit's file_id, so reruns reuse the existing
+    buffer and digest instead of re-reading and rehashing every file.
+    """
+    ingested = st.session_state.setdefault('uploads', {})
+    current = {uploaded.file_id: uploaded for uploaded in uploaded_files}
+    for file_id in list(ingested):
+        if file_id not in current:
+            ingested.pop(file_id).close()
+    for file_id, uploaded in current.items():
+        if file_id in ingested:
+            continue
+        try:
+            ingested[file_id] = ingest_stream(uploaded, uploaded.name, max_bytes=max_upload_bytes())
+        except UploadRejected as e:
+            st.error(str(e))
+    return {file_id: ingested[file_id] for file_id in current if file_id in ingested}
+
+def render_debug_panel():
+    """Sidebar view of stage latencies and counters collected in this process"""
+    with st.sidebar.expander("🔧 Performance debug"):
+        rows = metrics.summary()
+        if rows:
+            st.dataframe(rows, use_container_width=True, hide_index=True)
+        else:
+            st.caption("No timings recorded yet.")
+        counters = {**metrics.counters(), **metrics.gauges()}
+        if counters:
+            st.json(counters)
+        st.download_button("Prometheus metrics", metrics.to_prometheus(),
+                           file_name="metrics.prom", mime="text/plain")
+        st.download_button("OpenTelemetry JSON", json.dumps(metrics.to_otlp_json(), indent=2),
+                           file_name="metrics.json", mime="application/json")
 
 def main():
     st.set_page_config(
@@ -24,6 +164,8 @@ def main():
         st.session_state['role_name'] = ""
     if 'chat_history' not in st.session_state:
         st.session_state['chat_history'] = []
+    if 'session_id' not in st.session_state:
+        st.session_state['session_id'] = uuid.uuid4().hex
 
     # Initialize services
     api_key = None
@@ -38,9 +180,34 @@ def main():
         st.error("Google API key not found. Please set the GOOGLE_API_KEY in a secrets.toml file or as an environment variable.")
         st.stop()
     
-    llm_service = GeminiService(api_key)
-    pdf_processor = PDFProcessor()
-    prompt_generator = PromptGenerator()
+    # Services are built once per process and reused on every rerun; the LLM
+    # client is rebuilt only if the API key changes or it becomes unusable
+    setup_started = time.perf_counter()
+    llm_service = registry.get(
+        "llm_service",
+        lambda: GeminiService(api_key, cache=get_response_cache(), resilience=build_llm_resilience(),
+                              rate_limiter=get_rate_limiter()),
+        key=api_key,
+        health_check=lambda service: service.model_error is None
+    )
+    prompt_generator = registry.get("prompt_generator", PromptGenerator)
+    guide_pipeline = get_guide_pipeline(llm_service, prompt_generator)
+    # Optional speculative generation of guides for the suggested roles (spends API quota)
+    prefetcher = None
+    if os.getenv("PREFETCH_GUIDES", "").lower() in ("1", "true", "yes"):
+        prefetcher = registry.get(
+            "prefetcher",
+            lambda: GuidePrefetcher(
+                llm_service,
+                prompt_generator,
+                roles_per_resume=int(os.getenv("PREFETCH_ROLES", "2")),
+                max_per_hour=int(os.getenv("PREFETCH_MAX_PER_HOUR", "30")),
+                pipeline=guide_pipeline
+            ),
+            key=id(llm_service)
+        )
+    interactive = prefetcher.interactive if prefetcher else nullcontext
+    setup_seconds = time.perf_counter() - setup_started
 
     # Sidebar
     with st.sidebar:
@@ -59,14 +226,49 @@ def main():
         3. Get interview preparation guide
         """)
 
+        st.caption(
+            f"Service setup this rerun: {setup_seconds * 1000:.1f} ms "
+            f"(rebuilding would take {registry.rebuild_cost_seconds() * 1000:.0f} ms; "
+            f"{registry.saved_seconds() * 1000:.0f} ms saved in this process so far)"
+        )
+
     # Main layout
     col1, col2 = st.columns([1, 1])
 
     with col1:
         st.header("Upload Resume")
-        uploaded_file = st.file_uploader("Upload your resume (PDF)", type="pdf")
-        if uploaded_file:
-            st.success("Resume uploaded successfully!")
+        uploaded_files = st.file_uploader("Upload your resume (PDF)", type="pdf", accept_multiple_files=True)
+
+        # Each upload is checked and hashed once per session; the parser, the
+        # resume cache and the guide pipeline all share that one buffer and digest
+        uploads = ingest_uploads(uploaded_files or [])
+
+        # Parse every upload in the worker pool; re-uploads come from the cache.
+        # Results are keyed by content digest, so same-named files stay apart
+        parsed_resumes = {}
+        resume_uploads = {}
+        if uploads:
+            with st.spinner("Reading resumes..."):
+                results = get_parsing_service().parse_many(list(uploads.values()), cache=get_resume_cache())
+            for upload, result in zip(uploads.values(), results):
+                if result.error:
+                    st.error(f"Could not read {upload.name}: {result.error}")
+                else:
+                    parsed_resumes[upload.digest] = result
+                    resume_uploads[upload.digest] = upload
+        name_counts = Counter(upload.name for upload in resume_uploads.values())
+
+        def resume_label(digest: str) -> str:
+            name = resume_uploads[digest].name
+            return name if name_counts[name] == 1 else f"{name} ({digest[:8]})"
+
+        selected_resume = None
+        if len(parsed_resumes) > 1:
+            selected_resume = st.selectbox("Resume to analyze", list(parsed_resumes), format_func=resume_label)
+        elif parsed_resumes:
+            selected_resume = next(iter(parsed_resumes))
+        if selected_resume:
+            st.success(f"{len(parsed_resumes)} resume(s) uploaded successfully!")
 
     with col2:
         st.header("Position Details")
@@ -82,50 +284,35 @@ def main():
         if not role_name:
             st.caption("Common roles:")
             role_cols = st.columns(3)
-            roles = [
-                "Frontend Developer",
-                "Backend Developer",
-                "Full Stack Developer",
-                "Data Scientist",
-                "DevOps Engineer",
-                "Software Engineer"
-            ]
-            for i, role in enumerate(roles):
+            for i, role in enumerate(SUGGESTED_ROLES):
                 if role_cols[i % 3].button(role, key=f"role_{i}", use_container_width=True):
                     st.session_state['role_name'] = role
                     role_name = role
 
-    if uploaded_file and company_name and role_name:
+    # Start generating guides for the likeliest roles while the user decides
+    if prefetcher and selected_resume and company_name and not role_name:
+        prefetcher.prefetch(
+            st.session_state['session_id'],
+            parsed_resumes[selected_resume].structured_data,
+            company_name,
+            SUGGESTED_ROLES
+        )
+
+    if selected_resume and company_name and role_name:
         if st.button("Generate Interview Preparation", use_container_width=True):
             try:
-                with st.spinner(f"Analyzing resume for {role_name} position at {company_name}..."):
-                    # Process PDF and extract structured data
-                    resume_text = pdf_processor.extract_text(uploaded_file)
-                    structured_data = pdf_processor.get_structured_data(resume_text)
+                with st.spinner(f"Analyzing resume for {role_name} position at {company_name}..."), interactive():
+                    structured_data = parsed_resumes[selected_resume].structured_data
                     
                     # Store the inputs
                     st.session_state['company_name'] = company_name
                     st.session_state['role_name'] = role_name
-                    
-                    # Generate and process response
-                    prompt = prompt_generator.generate_interview_prompt(
-                        structured_data, 
-                        company_name,
-                        role_name
-                    )
-                    response = llm_service.generate_response(prompt, role_name)
-
-                    # Format the initial response and add it to chat history
-                    if response:
-                        formatted_initial_response = {"role": "assistant", "parts": [{"text": response.text if hasattr(response, 'text') else str(response)}]}
-                        st.session_state.chat_history.append(formatted_initial_response)
-                    
-                    # Display results
-                    st.success(f"Analysis Complete for {role_name} position! 🎉")
-                    
+
+                    # Display results; guide sections appear in their tab as they are generated
+                    status = st.empty()
                     tabs = st.tabs(["📊 Skills", "🎯 Interview Guide", "📝 Details"])
                     
-                    with tabs[0]:
+                    with tabs[0], metrics.span("render", view="skills"):
                         st.subheader("Technical Skills")
                         skills_dict = structured_data.get('skills', {})
                         
@@ -143,9 +330,73 @@ def main():
                     
                     with tabs[1]:
                         st.subheader(f"AI Generated Interview Guide for {role_name}")
-                        st.markdown(response)
+                        # Only stages whose inputs changed are recomputed: a new company
+                        # regenerates the company-specific sections, a new role all of them
+                        inputs = dict(pdf=resume_uploads[selected_resume], company=company_name, role=role_name)
+                        # Sections are requested concurrently and each streams into its own
+                        # slot, so the guide takes as long as the slowest section
+                        titles = {section_stage(section.title): section.title for section in GUIDE_SECTIONS}
+                        placeholders = {}
+                        for stage, title in titles.items():
+                            placeholders[stage] = st.empty()
+                            placeholders[stage].info(f"⏳ Writing {title}...")
+                        guide_sections = {}
+                        partial = {}
+                        failed = False
+                        try:
+                            # Chunks arrive here from the section workers as they are generated; a
+                            # failed section is yielded with its exception, so the others still render
+                            for stage, done, text in guide_pipeline.iter_progress(titles, return_exceptions=True,
+                                                                                  **inputs):
+                                if not done:
+                                    partial[stage] = partial.get(stage, "") + text
+                                    with placeholders[stage].container():
+                                        st.markdown(f"### {titles[stage]}")
+                                        st.markdown(partial[stage] + "▌")
+                                    continue
+                                if isinstance(text, Exception):
+                                    logger.warning("Guide section %s failed for %s: %s", titles[stage], role_name, text)
+                                    placeholders[stage].warning(
+                                        f"⚠️ {titles[stage]} could not be generated; the standard guide below covers it."
+                                    )
+                                    failed = True
+                                    continue
+                                with placeholders[stage].container():
+                                    st.markdown(f"### {titles[stage]}")
+                                    st.markdown(text)
+                                guide_sections[stage] = text
+                        except Exception as e:
+                            # Failed before any section started, e.g. the skills could not be extracted
+                            logger.warning("Guide generation failed for %s: %s", role_name, e)
+                            failed = True
+
+                        response = merge_sections(
+                            [(title, guide_sections[stage]) for stage, title in titles.items() if stage in guide_sections]
+                        )
+                        if failed:
+                            fallback = llm_service.llm_utils.get_fallback_response(role_name)
+                            if guide_sections:
+                                with st.expander(f"📋 Standard {role_name} guide", expanded=True):
+                                    st.markdown(fallback)
+                                response = f"{response}\n\n{fallback}"
+                            else:
+                                for placeholder in placeholders.values():
+                                    placeholder.empty()
+                                st.markdown(fallback)
+                                response = fallback
+                            st.warning("The AI service could not write every section right now, so the standard "
+                                       f"{role_name} guide fills the gaps. Try again in a minute for a personalized one.")
+
+                    # Format the initial response and add it to chat history; the chat keeps
+                    # the latest guide as context rather than as an ordinary turn
+                    if response:
+                        formatted_initial_response = {"role": "assistant", "parts": [{"text": response}],
+                                                      "guide": True}
+                        st.session_state.chat_history.append(formatted_initial_response)
+
+                    status.success(f"Analysis Complete for {role_name} position! 🎉")
                     
-                    with tabs[2]:
+                    with tabs[2], metrics.span("render", view="sections"):
                         st.subheader("Resume Sections")
                         sections = structured_data.get('sections', {})
                         if sections:
@@ -184,14 +435,14 @@ def main():
         st.info("Generate an interview preparation guide first to start the chat.")
 
     # Display chat messages
-    for message in st.session_state.chat_history:
-        # Format the role for display
-        display_role = "User" if message["role"] == "user" else "Assistant"
-        with st.chat_message(display_role):
-            # Extract content from the parts list for display
-            content_text = ""
-            for part in message.get("parts", []):
-                st.markdown(part.get("text", ""))
+    with metrics.span("render", view="chat"):
+        for message in st.session_state.chat_history:
+            # Format the role for display
+            display_role = "User" if message["role"] == "user" else "Assistant"
+            with st.chat_message(display_role):
+                # Extract content from the parts list for display
+                for part in message.get("parts", []):
+                    st.markdown(part.get("text", ""))
 
     # Chat input
     if prompt := st.chat_input("Ask a question about the interview preparation or your resume..."):
@@ -199,11 +450,15 @@ def main():
             st.session_state.chat_history.append({"role": "user", "parts": [{"text": prompt}]})
             st.markdown(prompt)
 
-            # Pass the correctly formatted history to the chat function
-        # Add a print statement here to inspect chat_history before the call
-            print("Chat History before API call:", st.session_state.chat_history)
-            response = llm_service.chat_with_history(st.session_state.chat_history, prompt) 
-            st.markdown(response)
+            # Send a bounded history: relevant guide sections, summarized older
+            # turns and the latest turns verbatim, not the whole transcript
+            chat_context = registry.get("chat_context", ChatContextManager)
+            with metrics.span("chat_context"):
+                history = chat_context.build_history(st.session_state.chat_history[:-1], prompt)
+            logger.debug("Sending chat request with %d history messages", len(history))
+
+        with st.chat_message("Assistant"), interactive():
+            response = st.write_stream(llm_service.stream_chat_with_history(history, prompt))
 
             # Format the assistant's response for the chat history
             formatted_assistant_response = {"role": "assistant", "parts": [{"text": response}]}
@@ -220,5 +475,9 @@ def main():
         unsafe_allow_html=True
     )
 
+    # Drawn last so it includes the timings recorded during this rerun
+    render_debug_panel()
+    warm_up_llm(llm_service)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
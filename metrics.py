@@ -0,0 +1,250 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Latency buckets in seconds, from sub-millisecond parsing stages up to slow LLM calls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+SeriesKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _series_key(name: str, labels: Dict[str, Any]) -> SeriesKey:
+    return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class _Histogram:
+    def __init__(self, buckets: Tuple[float, ...], recent: int):
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.recent = deque(maxlen=recent)
+
+    def observe(self, value: float):
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        self.bucket_counts[index] += 1
+        self.count += 1
+        self.total += value
+        self.recent.append(value)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Percentile over the most recent observations"""
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+class Metrics:
+    """Process-wide counters and latency histograms
+
+    Code records stage latencies with ``span`` and events with ``increment``.
+    The collected series export as Prometheus text or as OpenTelemetry
+    (OTLP/JSON) metrics, and worker processes ship theirs back with
+    ``export_state``/``merge_state``.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, recent_samples: int = 1024):
+        self.buckets = buckets
+        self.recent_samples = recent_samples
+        self.started_at = time.time()
+        self._counters: Dict[SeriesKey, float] = {}
+        self._gauges: Dict[SeriesKey, float] = {}
+        self._histograms: Dict[SeriesKey, _Histogram] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, amount: float = 1, **labels):
+        key = _series_key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def set_gauge(self, name: str, value: float, **labels):
+        key = _series_key(name, labels)
+        with self._lock:
+            self._gauges[key] = value
+
+    def add_gauge(self, name: str, delta: float, **labels):
+        key = _series_key(name, labels)
+        with self._lock:
+            self._gauges[key] = self._gauges.get(key, 0) + delta
+
+    def observe(self, name: str, seconds: float, **labels):
+        key = _series_key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram(self.buckets, self.recent_samples)
+            histogram.observe(seconds)
+
+    @contextmanager
+    def span(self, stage: str, **labels) -> Iterator[None]:
+        """Time a pipeline stage; failures also count towards errors_total"""
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.increment("errors_total", stage=stage, **labels)
+            raise
+        finally:
+            self.observe("stage_seconds", time.perf_counter() - started, stage=stage, **labels)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+    def export_state(self) -> Dict[str, Any]:
+        """Picklable copy of every series, for sending to another process"""
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "histograms": {
+                    key: (list(h.bucket_counts), h.count, h.total, list(h.recent))
+                    for key, h in self._histograms.items()
+                }
+            }
+
+    def merge_state(self, state: Dict[str, Any]):
+        """Add series exported by another process (e.g. a parsing worker)"""
+        with self._lock:
+            for key, value in state["counters"].items():
+                self._counters[key] = self._counters.get(key, 0) + value
+            for key, (bucket_counts, count, total, recent) in state["histograms"].items():
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = _Histogram(self.buckets, self.recent_samples)
+                histogram.bucket_counts = [a + b for a, b in zip(histogram.bucket_counts, bucket_counts)]
+                histogram.count += count
+                histogram.total += total
+                histogram.recent.extend(recent)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """One row per histogram series with count and recent p50/p95, for display"""
+        with self._lock:
+            return [
+                {
+                    "metric": name,
+                    **dict(labels),
+                    "count": h.count,
+                    "p50_ms": round(h.percentile(0.5) * 1000, 2) if h.recent else None,
+                    "p95_ms": round(h.percentile(0.95) * 1000, 2) if h.recent else None,
+                    "total_s": round(h.total, 3)
+                }
+                for (name, labels), h in sorted(self._histograms.items())
+            ]
+
+    @staticmethod
+    def _flat(series: Dict[SeriesKey, float]) -> Dict[str, float]:
+        return {
+            name + ("{" + ",".join(f"{k}={v}" for k, v in labels) + "}" if labels else ""): value
+            for (name, labels), value in sorted(series.items())
+        }
+
+    def counters(self) -> Dict[str, float]:
+        with self._lock:
+            return self._flat(self._counters)
+
+    def gauges(self) -> Dict[str, float]:
+        with self._lock:
+            return self._flat(self._gauges)
+
+    def to_prometheus(self, prefix: str = "resume_assistant_") -> str:
+        """Prometheus text exposition format"""
+        def label_text(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ""
+            escaped = (
+                f'{k}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+                for k, v in pairs
+            )
+            return "{" + ",".join(escaped) + "}"
+
+        lines = []
+        with self._lock:
+            typed = set()
+            for (name, labels), value in sorted(self._counters.items()):
+                if name not in typed:
+                    lines.append(f"# TYPE {prefix}{name} counter")
+                    typed.add(name)
+                lines.append(f"{prefix}{name}{label_text(labels)} {value}")
+
+            for (name, labels), value in sorted(self._gauges.items()):
+                if name not in typed:
+                    lines.append(f"# TYPE {prefix}{name} gauge")
+                    typed.add(name)
+                lines.append(f"{prefix}{name}{label_text(labels)} {value}")
+
+            for (name, labels), h in sorted(self._histograms.items()):
+                if name not in typed:
+                    lines.append(f"# TYPE {prefix}{name} histogram")
+                    typed.add(name)
+                cumulative = 0
+                for bound, count in zip(list(h.buckets) + ["+Inf"], h.bucket_counts):
+                    cumulative += count
+                    lines.append(f"{prefix}{name}_bucket{label_text(labels, [('le', bound)])} {cumulative}")
+                lines.append(f"{prefix}{name}_sum{label_text(labels)} {h.total}")
+                lines.append(f"{prefix}{name}_count{label_text(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def to_otlp_json(self, service_name: str = "resume-interview-assistant") -> Dict[str, Any]:
+        """Metrics in the OpenTelemetry OTLP/JSON layout"""
+        now = str(int(time.time() * 1e9))
+        start = str(int(self.started_at * 1e9))
+
+        def attributes(labels):
+            return [{"key": k, "value": {"stringValue": v}} for k, v in labels]
+
+        metrics = {}
+        with self._lock:
+            for (name, labels), value in sorted(self._counters.items()):
+                metric = metrics.setdefault(name, {
+                    "name": name,
+                    "sum": {"dataPoints": [], "aggregationTemporality": 2, "isMonotonic": True}
+                })
+                metric["sum"]["dataPoints"].append({
+                    "attributes": attributes(labels),
+                    "startTimeUnixNano": start,
+                    "timeUnixNano": now,
+                    "asDouble": value
+                })
+            for (name, labels), value in sorted(self._gauges.items()):
+                metric = metrics.setdefault(name, {"name": name, "gauge": {"dataPoints": []}})
+                metric["gauge"]["dataPoints"].append({
+                    "attributes": attributes(labels),
+                    "timeUnixNano": now,
+                    "asDouble": value
+                })
+            for (name, labels), h in sorted(self._histograms.items()):
+                metric = metrics.setdefault(name, {
+                    "name": name,
+                    "unit": "s",
+                    "histogram": {"dataPoints": [], "aggregationTemporality": 2}
+                })
+                metric["histogram"]["dataPoints"].append({
+                    "attributes": attributes(labels),
+                    "startTimeUnixNano": start,
+                    "timeUnixNano": now,
+                    "count": str(h.count),
+                    "sum": h.total,
+                    "bucketCounts": [str(count) for count in h.bucket_counts],
+                    "explicitBounds": list(h.buckets)
+                })
+
+        return {
+            "resourceMetrics": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]},
+                "scopeMetrics": [{"scope": {"name": "resume_assistant"}, "metrics": list(metrics.values())}]
+            }]
+        }
+
+
+# One metrics registry per process
+metrics = Metrics()
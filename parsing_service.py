@@ -0,0 +1,222 @@
+import atexit
+import io
+import multiprocessing
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import List, Optional, Union
+
+from metrics import metrics
+from pdf_backends import backend_names
+from pdf_processor import PDFProcessor
+from resume_cache import ResumeCache
+from resume_profile import ResumeProfile
+from upload_ingest import IngestedUpload
+
+# Warm processor held by each worker process
+_worker_processor = None
+
+
+class ParseTimeout(BaseException):
+    """Raised inside a worker when a parse overruns; a BaseException so the
+    per-page error handling in PDFProcessor cannot swallow it"""
+
+
+def _init_worker():
+    global _worker_processor
+    _worker_processor = PDFProcessor()
+
+
+def _raise_parse_timeout(signum, frame):
+    raise ParseTimeout("PDF parsing timed out")
+
+
+def _stream_parse(pdf_file):
+    """Decode and analyse a PDF page by page
+
+    Sections and skills are built incrementally as each page is decoded, so
+    the document is never held as one string or split into one big list of
+    lines; only the page texts are kept, for the returned (cached) text.
+    """
+    pages = []
+    opened_with = []
+
+    def recorded_pages():
+        for page_text in _worker_processor.iter_pages(pdf_file, opened=opened_with.append):
+            pages.append(page_text)
+            yield page_text
+
+    structured_data = None
+    for structured_data in _worker_processor.iter_structured_data_from_pages(recorded_pages()):
+        pass
+    return "".join(page_text + "\n" for page_text in pages), structured_data, opened_with[0]
+
+
+def _parse_in_worker(payload: Union[bytes, str], timeout: Optional[float]):
+    """Parse one PDF, given as bytes or a file path, inside a worker process
+
+    Returns (text, structured_data, backend_name, metrics_state); the worker's
+    stage timings are shipped back so the parent process can report them.
+    """
+    # A worker runs one task at a time, so its metrics only ever hold this parse
+    metrics.reset()
+    # An alarm interrupts runaway pure-Python parses (PyPDF2, pdfminer) without killing the
+    # worker; a hang inside PDFium's native code is caught by the hard timeout in _run instead
+    use_alarm = bool(timeout) and hasattr(signal, "SIGALRM")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_parse_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        if isinstance(payload, str):
+            # Large uploads are passed by path so their bytes are not pickled across
+            with open(payload, "rb") as pdf_file:
+                text, structured_data, backend_name = _stream_parse(pdf_file)
+        else:
+            text, structured_data, backend_name = _stream_parse(io.BytesIO(payload))
+        return text, structured_data, backend_name, metrics.export_state()
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+@dataclass
+class ParseResult:
+    text: str = ""
+    structured_data: Optional[ResumeProfile] = None
+    error: Optional[str] = None
+    # PDF backend that decoded the text
+    backend: str = ""
+
+
+class ParsingService:
+    """Parses PDFs in a pool of worker processes, each holding a warm PDFProcessor
+
+    Parsing runs off the caller's thread and scales with cores. A PDF that
+    crashes its worker or overruns ``timeout`` only fails itself: the shared
+    pool is rebuilt and every document caught in the breakage is retried in
+    its own throwaway process, where only the culprit fails again.
+    """
+
+    # Extra time the worker-side alarm gets before the parent gives up on a worker
+    HARD_TIMEOUT_GRACE = 5.0
+
+    def __init__(self, max_workers: Optional[int] = None, timeout: float = 30.0):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._executor = None
+        atexit.register(self.shutdown)
+
+    def _new_executor(self, max_workers: Optional[int]) -> ProcessPoolExecutor:
+        # spawn avoids forking a process that is running server threads
+        return ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker
+        )
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._new_executor(self.max_workers)
+            return self._executor
+
+    def _terminate(self, executor: ProcessPoolExecutor):
+        # Hung workers ignore shutdown, so they are terminated directly
+        for process in list((getattr(executor, "_processes", None) or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False)
+
+    def _recycle(self, broken: ProcessPoolExecutor):
+        """Replace a broken or hung shared pool, unless another caller already did"""
+        with self._lock:
+            if self._executor is not broken:
+                return
+            self._executor = None
+        self._terminate(broken)
+
+    def _run(self, executor: ProcessPoolExecutor, payload: Union[bytes, str]) -> ParseResult:
+        """Parse on ``executor``; raises BrokenProcessPool if a worker died"""
+        timeout_error = f"Parsing took longer than {self.timeout:.0f}s"
+        try:
+            future = executor.submit(_parse_in_worker, payload, self.timeout)
+            text, structured_data, backend_name, worker_metrics = future.result(
+                timeout=self.timeout + self.HARD_TIMEOUT_GRACE
+            )
+        except BrokenProcessPool:
+            raise
+        except FutureTimeoutError:
+            # The worker did not respond to its alarm, so it has to be killed
+            if executor is self._executor:
+                self._recycle(executor)
+            else:
+                self._terminate(executor)
+            return ParseResult(error=timeout_error)
+        except ParseTimeout:
+            return ParseResult(error=timeout_error)
+        except Exception as e:
+            return ParseResult(error=str(e))
+        metrics.merge_state(worker_metrics)
+        # Built here rather than in the worker: skill IDs belong to this process's vocabulary
+        return ParseResult(text, ResumeProfile.from_dict(structured_data), backend=backend_name)
+
+    def parse(self, pdf: Union[bytes, IngestedUpload], cache: Optional[ResumeCache] = None) -> ParseResult:
+        """Parse one PDF, consulting and filling ``cache`` when given
+
+        Pass an IngestedUpload to reuse its digest for the cache key and send
+        workers its bytes, or its file path, without another copy.
+        """
+        started = time.perf_counter()
+        result = self._parse(pdf, cache)
+        metrics.observe("stage_seconds", time.perf_counter() - started, stage="parse")
+        if result.error is not None:
+            metrics.increment("errors_total", stage="parse")
+        return result
+
+    def _parse(self, pdf: Union[bytes, IngestedUpload], cache: Optional[ResumeCache]) -> ParseResult:
+        payload = pdf.payload() if isinstance(pdf, IngestedUpload) else pdf
+        digest = None
+        if cache is not None:
+            # Only hashed when there is a cache to look in
+            digest = pdf.digest if isinstance(pdf, IngestedUpload) else cache.digest_of(payload)
+            cached = cache.find(digest, backend_names())
+            if cached is not None:
+                backend, (text, structured_data) = cached
+                return ParseResult(text, structured_data, backend=backend)
+
+        executor = self._pool()
+        try:
+            result = self._run(executor, payload)
+        except BrokenProcessPool:
+            # Either this PDF crashed its worker or it shared the pool with one
+            # that did; retry it alone in a throwaway process to find out which
+            self._recycle(executor)
+            isolated = self._new_executor(max_workers=1)
+            try:
+                result = self._run(isolated, payload)
+            except BrokenProcessPool:
+                return ParseResult(error="The PDF crashed the parser")
+            finally:
+                self._terminate(isolated)
+
+        if digest is not None and result.error is None:
+            cache.put(cache.make_key(digest, result.backend), result.text, result.structured_data)
+        return result
+
+    def parse_many(self, files: List[Union[bytes, IngestedUpload]],
+                   cache: Optional[ResumeCache] = None) -> List[ParseResult]:
+        """Parse several PDFs concurrently, returning results in input order"""
+        if len(files) <= 1:
+            return [self.parse(pdf, cache) for pdf in files]
+        with ThreadPoolExecutor(max_workers=len(files)) as waiters:
+            return list(waiters.map(lambda pdf: self.parse(pdf, cache), files))
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
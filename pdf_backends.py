@@ -0,0 +1,178 @@
+import importlib.util
+import logging
+import os
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# The trailer (with startxref, %%EOF and any /Encrypt entry) sits in a PDF's last bytes
+TRAILER_SEARCH_BYTES = 1024
+
+
+class PDFBackend:
+    """Text extraction through one PDF library
+
+    ``open`` returns the document's pages and ``page_text`` decodes one of
+    them, so PDFProcessor can time pages and skip unreadable ones the same
+    way whichever library is used. Libraries are imported on first use.
+    """
+
+    name = ""
+    module = ""
+    # Opens files with a broken or missing trailer and encrypted files without a password
+    tolerant = False
+
+    def available(self) -> bool:
+        try:
+            return importlib.util.find_spec(self.module) is not None
+        except (ImportError, ValueError):
+            return False
+
+    def open(self, pdf_file) -> Iterable[Any]:
+        raise NotImplementedError
+
+    def page_text(self, page: Any) -> str:
+        raise NotImplementedError
+
+
+class PyPDF2Backend(PDFBackend):
+    """Pure Python; the original extractor and the reference for the others"""
+
+    name = "pypdf2"
+    module = "PyPDF2"
+
+    def open(self, pdf_file) -> Iterable[Any]:
+        import PyPDF2
+        return PyPDF2.PdfReader(pdf_file).pages
+
+    def page_text(self, page: Any) -> str:
+        return page.extract_text()
+
+
+class PdfiumBackend(PDFBackend):
+    """Google's PDFium through pypdfium2: native code and the fastest of the three"""
+
+    name = "pypdfium2"
+    module = "pypdfium2"
+    tolerant = True
+
+    def open(self, pdf_file) -> Iterable[Any]:
+        import pypdfium2
+        document = pypdfium2.PdfDocument(pdf_file)
+
+        def pages() -> Iterator[Any]:
+            try:
+                for index in range(len(document)):
+                    yield document[index]
+            finally:
+                document.close()
+
+        return pages()
+
+    def page_text(self, page: Any) -> str:
+        textpage = page.get_textpage()
+        try:
+            # PDFium separates lines with CRLF
+            return textpage.get_text_range().replace("\r\n", "\n").replace("\r", "\n")
+        finally:
+            textpage.close()
+            page.close()
+
+
+class PDFMinerBackend(PDFBackend):
+    """pdfminer.six with layout analysis, which regroups text into blocks by position
+
+    Much slower than the others, and its reading order can differ from the
+    content-stream order PyPDF2 and PDFium use, so it is only chosen
+    automatically as a last resort.
+    """
+
+    name = "pdfminer"
+    module = "pdfminer"
+
+    def open(self, pdf_file) -> Iterable[Any]:
+        from pdfminer.high_level import extract_pages
+        from pdfminer.layout import LAParams
+        return extract_pages(pdf_file, laparams=LAParams())
+
+    def page_text(self, page: Any) -> str:
+        from pdfminer.layout import LTTextContainer
+        return "".join(element.get_text() for element in page if isinstance(element, LTTextContainer))
+
+
+# Automatic selection order: fastest first
+BACKENDS = {backend.name: backend for backend in (PdfiumBackend(), PyPDF2Backend(), PDFMinerBackend())}
+
+
+@lru_cache(maxsize=None)
+def select_backends(preferred: Optional[str] = None) -> Tuple[PDFBackend, ...]:
+    """Installed backends in the order to try them, ``preferred`` (e.g. $PDF_BACKEND) first"""
+    available = [backend for backend in BACKENDS.values() if backend.available()]
+    if preferred:
+        backend = BACKENDS.get(preferred.lower())
+        if backend is None:
+            raise ValueError(f"Unknown PDF backend {preferred!r}; choose from {', '.join(BACKENDS)}")
+        if backend in available:
+            available.remove(backend)
+            available.insert(0, backend)
+        else:
+            logger.warning("PDF backend %s is not installed; selecting automatically", backend.name)
+    if not available:
+        raise RuntimeError("No PDF backend installed; install PyPDF2 or pypdfium2")
+    return tuple(available)
+
+
+def backend_names() -> Tuple[str, ...]:
+    """Backends documents may be parsed with in this environment, in the order they are tried"""
+    return tuple(backend.name for backend in select_backends(os.getenv("PDF_BACKEND") or None))
+
+
+def document_traits(pdf_file) -> Dict[str, bool]:
+    """What the trailer says about a document, read from its last bytes without parsing it"""
+    pdf_file.seek(0, os.SEEK_END)
+    pdf_file.seek(max(pdf_file.tell() - TRAILER_SEARCH_BYTES, 0))
+    tail = pdf_file.read()
+    pdf_file.seek(0)
+    return {
+        "damaged": b"startxref" not in tail or b"%%EOF" not in tail,
+        "encrypted": b"/Encrypt" in tail,
+    }
+
+
+def route_backends(pdf_file, backends: Iterable[PDFBackend]) -> Tuple[PDFBackend, ...]:
+    """``backends`` reordered for this document: tolerant ones first for damaged or encrypted files
+
+    Other documents keep the configured order, so $PDF_BACKEND still decides
+    for them.
+    """
+    backends = tuple(backends)
+    traits = [trait for trait, present in document_traits(pdf_file).items() if present]
+    if not traits:
+        return backends
+    for trait in traits:
+        metrics.increment("pdf_routed_total", trait=trait)
+    # Stable, so the configured order holds among tolerant and among strict backends
+    return tuple(sorted(backends, key=lambda backend: not backend.tolerant))
+
+
+def open_document(pdf_file, backends: Iterable[PDFBackend]) -> Tuple[PDFBackend, Iterable[Any]]:
+    """Open ``pdf_file`` with the first backend that accepts it
+
+    Libraries differ in how much damage they tolerate (PDFium repairs broken
+    cross-reference tables that PyPDF2 rejects), so damaged and encrypted
+    documents go to the tolerant backends first (see ``route_backends``),
+    and a document one backend cannot open is retried with the next.
+    """
+    errors: List[str] = []
+    for backend in route_backends(pdf_file, backends):
+        try:
+            pdf_file.seek(0)
+            return backend, backend.open(pdf_file)
+        except Exception as e:
+            logger.warning("%s could not open PDF: %s", backend.name, e)
+            metrics.increment("errors_total", stage="pdf_open", backend=backend.name)
+            errors.append(f"{backend.name}: {e}")
+    raise ValueError("; ".join(errors) or "No PDF backend available")
@@ -1,9 +1,517 @@
-import PyPDF2
+import logging
+import os
 import re
-from typing import Dict, List, Any
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Iterator, List, Any, Optional, Tuple
+
+from metrics import metrics
+from pdf_backends import PDFBackend, open_document, select_backends
+from text_normalization import strip_bullet
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever a change alters the text or structured data produced for a PDF,
+# so cached parse results from older versions are not reused
+PARSER_VERSION = "3"
+
+# Skills only count as whole words; \b is not enough for names like C++ or C#
+_SKILL_BOUNDARY_START = r'(?<!\w)'
+_SKILL_BOUNDARY_END = r'(?!\w)'
+
+
+def skill_sort_key(skill: str) -> Tuple[str, str]:
+    """Case-insensitive order with a case-sensitive tie-break, so "Go" and "go" never swap between runs"""
+    return skill.lower(), skill
+
+
+def _expand_skill_pattern(pattern: str) -> List[str]:
+    """Expand a skill pattern into every literal spelling it can match
+
+    Only the regex subset used by ``tech_patterns`` is supported: escaped
+    characters, ``(?:...)`` groups and ``[...]`` sets, each optionally
+    followed by ``?``.
+    """
+    variants = ['']
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\':
+            atoms, i = [pattern[i + 1]], i + 2
+        elif pattern.startswith('(?:', i):
+            depth, end = 1, i + 3
+            while depth:
+                depth += {'(': 1, ')': -1}.get(pattern[end], 0)
+                end += 1
+            atoms, i = _expand_skill_pattern(pattern[i + 3:end - 1]), end
+        elif char == '[':
+            end = pattern.index(']', i)
+            atoms, i = list(pattern[i + 1:end]), end + 1
+        elif char in '.^$*+?{}()|':
+            raise ValueError(f"Unsupported syntax in skill pattern: {pattern}")
+        else:
+            atoms, i = [char], i + 1
+
+        if i < len(pattern) and pattern[i] == '?':
+            atoms, i = [''] + atoms, i + 1
+        variants = [variant + atom for variant in variants for atom in atoms]
+    return variants
+
+
+def _trie_pattern(node: Dict) -> str:
+    """Render a character trie as a regex that shares common prefixes"""
+    branches = [re.escape(char) + _trie_pattern(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ''
+    pattern = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    if '' in node:
+        # A skill ends here, so longer continuations are optional (and greedy)
+        pattern = '(?:' + pattern + ')?'
+    return pattern
+
+
+@lru_cache(maxsize=None)
+def _compile_skill_matcher(tech_patterns: Tuple[Tuple[str, Tuple[str, ...]], ...]):
+    """Compile all skill patterns into one trie-shaped regex, once per process
+
+    Returns the regex together with a map from each casefolded spelling to its
+    category. Because the regex is a prefix trie, the engine only follows the
+    branches that match the text so far instead of trying ~130 alternatives
+    at every position, and the longest spelling wins ("React Native" over
+    "React", "Ruby on Rails" over "Ruby").
+    """
+    categories = {}
+    for category, patterns in tech_patterns:
+        for pattern in patterns:
+            for literal in _expand_skill_pattern(pattern):
+                categories.setdefault(literal.casefold(), category)
+
+    trie = {}
+    for literal in categories:
+        node = trie
+        for char in literal:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    regex = re.compile(
+        _SKILL_BOUNDARY_START + '(?:' + _trie_pattern(trie) + ')' + _SKILL_BOUNDARY_END,
+        re.IGNORECASE
+    )
+    return regex, categories
+
+
+@lru_cache(maxsize=None)
+def _skill_terms(tech_patterns: Tuple[Tuple[str, Tuple[str, ...]], ...]) -> Tuple[Tuple[str, str], ...]:
+    """(spelling, category) of every literal skill, one per casefolded spelling
+
+    These are the columns of ``extract_skills_batch``'s matrix, in the order
+    the patterns are declared; the category is the one the matcher assigns.
+    """
+    terms = {}
+    for category, patterns in tech_patterns:
+        for pattern in patterns:
+            for literal in _expand_skill_pattern(pattern):
+                terms.setdefault(literal.casefold(), (literal, category))
+    return tuple(terms.values())
+
+
+# Resume text as tokens: runs of word characters, runs of whitespace, and single other characters
+_TOKEN = re.compile(r'\w+|\s+|[^\w\s]')
+_WORD_CHAR = re.compile(r'\w')
+
+
+@dataclass
+class TermMatrix:
+    """Sparse document x term counts in NumPy CSR arrays
+
+    Document ``i`` contains the terms ``terms[j]`` for ``j`` in
+    ``indices[indptr[i]:indptr[i + 1]]``, each ``counts`` times.
+    """
+    terms: List[str]
+    indptr: Any
+    indices: Any
+    counts: Any
+
+    @classmethod
+    def from_pairs(cls, terms: List[str], rows, columns, documents: int, **fields) -> "TermMatrix":
+        """Count (document, term) occurrences into CSR form; ``fields`` go to subclasses"""
+        import numpy as np
+        # One key per (document, term) pair; np.unique sorts them into CSR order and counts repeats
+        keys, counts = np.unique(rows * len(terms) + columns, return_counts=True)
+        rows, indices = np.divmod(keys, len(terms))
+        indptr = np.zeros(documents + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=documents), out=indptr[1:])
+        return cls(terms, indptr, indices, counts, **fields)
+
+    def __len__(self) -> int:
+        return len(self.indptr) - 1
+
+    def document_frequency(self) -> Dict[str, int]:
+        """Number of documents containing each term, most common first"""
+        return self._ranked(None)
+
+    def mention_counts(self) -> Dict[str, int]:
+        """Total occurrences of each term across the documents, most common first"""
+        return self._ranked(self.counts)
+
+    def _ranked(self, weights) -> Dict[str, int]:
+        import numpy as np
+        totals = np.bincount(self.indices, weights=weights, minlength=len(self.terms)).astype(np.int64)
+        order = np.argsort(-totals, kind="stable")
+        return {self.terms[column]: int(totals[column]) for column in order[:np.count_nonzero(totals)].tolist()}
+
+    def matrix(self):
+        """The counts as a ``scipy.sparse.csr_matrix`` (needs SciPy)"""
+        from scipy.sparse import csr_matrix
+        return csr_matrix((self.counts, self.indices, self.indptr), shape=(len(self), len(self.terms)))
+
+
+@dataclass
+class SkillBatch(TermMatrix):
+    """Vocabulary skills found in a batch of resumes, as a sparse resume x skill matrix
+
+    ``tokens`` is the resume x word matrix the skills were read from.
+    """
+    categories: List[str]
+    tokens: TermMatrix
+
+    def skills(self, index: int) -> Dict[str, List[str]]:
+        """One resume's skills by category, shaped like ``extract_skills`` output"""
+        skills = {category: [] for category in dict.fromkeys(self.categories)}
+        for column in self.indices[self.indptr[index]:self.indptr[index + 1]].tolist():
+            skills[self.categories[column]].append(self.terms[column])
+        return {category: sorted(names, key=skill_sort_key) for category, names in skills.items()}
+
+
+def _tokenize_corpus(corpus: str, vocabulary: Dict[str, int]):
+    """``_TOKEN`` IDs of a NUL-separated corpus as a NumPy array, adding new tokens to ``vocabulary``
+
+    ``vocabulary`` must map NUL to 0, a space to 1 and two spaces to 2. The
+    corpus is split at single spaces and each distinct piece is tokenized
+    once, since resumes repeat most of their words; NumPy then lays the
+    pieces' tokens out in corpus order, joined by the spaces. Where that
+    puts whitespace tokens next to each other (double spaces, a space
+    before a newline) they are one run in the real tokenization, so the run
+    is kept as a single token with ID 2: only words and the single space
+    between words of a skill are ever looked up by spelling.
+    """
+    import numpy as np
+
+    pieces = corpus.split(' ')
+    piece_index = {piece: index for index, piece in enumerate(dict.fromkeys(pieces))}
+    piece_ids = np.fromiter(map(piece_index.__getitem__, pieces), dtype=np.int64, count=len(pieces))
+
+    # Token IDs of every distinct piece, back to back, each followed by the space after it
+    flat, lengths = [], []
+    for piece in piece_index:
+        tokens = _TOKEN.findall(piece)
+        flat.extend(vocabulary.setdefault(token, len(vocabulary)) for token in tokens)
+        flat.append(1)
+        lengths.append(len(tokens) + 1)
+    flat = np.array(flat, dtype=np.int64)
+    lengths = np.array(lengths, dtype=np.int64)
+    offsets = np.cumsum(lengths) - lengths
+
+    # Gather each piece's slice of ``flat``; the corpus ends without a space
+    counts = lengths[piece_ids]
+    starts = np.cumsum(counts) - counts
+    token_ids = flat[np.repeat(offsets[piece_ids] - starts, counts) + np.arange(counts.sum())][:-1]
+
+    space = np.zeros(len(vocabulary), dtype=bool)
+    space[[token_id for token, token_id in vocabulary.items() if token.isspace()]] = True
+    in_space = space[token_ids]
+    continues_run = np.zeros(len(token_ids), dtype=bool)
+    continues_run[1:] = in_space[1:] & in_space[:-1]
+    token_ids[in_space & ~continues_run & np.append(continues_run[1:], False)] = 2
+    return token_ids[~continues_run]
+
+
+def _skill_positions(token_ids, skill_tokens: List[List[int]], is_word) -> Tuple[Any, Any]:
+    """Token positions where skills start, and which skill, as the skill matcher would find them
+
+    Single-token skills are a table lookup per token. Multi-token ones ("C++",
+    "Ruby on Rails") start from the positions of their first token, found in
+    one pass for all of them, and keep those whose following tokens match;
+    where matches overlap the leftmost, then longest, wins as with the regex,
+    so "React Native" is not also counted as "React".
+    """
+    import numpy as np
+
+    single = np.full(len(is_word), -1, dtype=np.int64)
+    opens_multi = np.zeros(len(is_word), dtype=bool)
+    for column, sequence in enumerate(skill_tokens):
+        if len(sequence) == 1:
+            single[sequence[0]] = column
+        else:
+            opens_multi[sequence[0]] = True
+    candidates = np.flatnonzero(opens_multi[token_ids])
+
+    multi = []
+    for column, sequence in enumerate(skill_tokens):
+        if len(sequence) == 1:
+            continue
+        found = candidates[candidates <= len(token_ids) - len(sequence)]
+        for offset, token in enumerate(sequence):
+            found = found[token_ids[found + offset] == token]
+        if not is_word[sequence[-1]]:
+            # Skills ending in a symbol ("C++", "C#") must not run into a word
+            following = found + len(sequence)
+            inside = following < len(token_ids)
+            found = found[~inside | ~is_word[token_ids[np.minimum(following, len(token_ids) - 1)]]]
+        multi.extend((start, len(sequence), column) for start in found.tolist())
+
+    # Multi-token matches are few, so overlaps between them are resolved in a plain loop
+    starts, columns, end = [], [], 0
+    covered = np.zeros(len(token_ids) + 1, dtype=np.int64)
+    for start, length, column in sorted(multi, key=lambda match: (match[0], -match[1])):
+        if start >= end:
+            starts.append(start)
+            columns.append(column)
+            end = start + length
+            covered[start] += 1
+            covered[end] -= 1
+
+    singles = np.flatnonzero((single[token_ids] >= 0) & (np.cumsum(covered[:-1]) == 0))
+    return (np.concatenate([singles, np.array(starts, dtype=np.int64)]),
+            np.concatenate([single[token_ids[singles]], np.array(columns, dtype=np.int64)]))
+
+
+# Matches a "Header:" line, which ends the listed-skills part of a skills section
+_LABEL_LINE = re.compile(r'\w+:')
+
+# Listed skills are looked up in at most this many lines after a skills marker
+_MAX_SKILLS_SECTION_LINES = 200
+
+_SKILL_LIST_HEADERS = {
+    'Languages:': 'languages',
+    'Programming Languages:': 'languages',
+    'Frameworks:': 'frameworks',
+    'Libraries:': 'frameworks',
+    'Tools:': 'tools',
+    'Technologies:': 'tools'
+}
+
+
+@lru_cache(maxsize=None)
+def _compile_section_index(sections: Tuple[Tuple[str, Tuple[str, ...]], ...]):
+    """One regex over every uppercased section marker, built once per process
+
+    Most resume lines contain no marker at all, so a single search over the
+    uppercased line rules them out instead of testing each marker in turn.
+    """
+    trie = {}
+    for _, section_markers in sections:
+        for marker in section_markers:
+            node = trie
+            for char in marker.upper():
+                node = node.setdefault(char, {})
+            node[''] = {}
+    return re.compile(_trie_pattern(trie))
+
+
+class _SkillCollector:
+    """Incremental skill extraction, fed one raw line at a time"""
+
+    def __init__(self, processor: 'PDFProcessor'):
+        self.processor = processor
+        self.skills = {
+            'languages': set(),
+            'frameworks': set(),
+            'tools': set()
+        }
+        # Text captured after the first occurrence of each Technical Skills marker
+        self.markers = {
+            marker: re.compile(re.escape(marker), re.IGNORECASE)
+            for marker in processor.sections["Technical Skills"]
+        }
+        self.captures = {}
+        self.open_captures = set()
+        # Listed skills of captures that have closed; those can no longer change
+        self.listed = {}
+
+    def feed(self, line: str):
+        # A capture runs from its marker up to the next "Header:" line
+        for marker in list(self.open_captures):
+            capture = self.captures[marker]
+            if _LABEL_LINE.match(line) or len(capture) >= _MAX_SKILLS_SECTION_LINES:
+                self.open_captures.discard(marker)
+                self.listed[marker] = self._listed_skills(capture)
+            else:
+                capture.append(line)
+
+        for marker, marker_regex in self.markers.items():
+            if marker not in self.captures:
+                match = marker_regex.search(line)
+                if match:
+                    self.captures[marker] = [line[match.start():]]
+                    self.open_captures.add(marker)
+
+        for match in self.processor._skill_matcher.finditer(line):
+            category = self.processor._skill_categories.get(match.group().casefold())
+            if category:
+                self.skills[category].add(match.group())
+
+    @staticmethod
+    def _listed_skills(capture: List[str]) -> List[Tuple[str, List[str]]]:
+        """(category, items) of the "Languages: ..." style lists in a capture"""
+        skills_section = "\n".join(capture)
+        listed = []
+        if skills_section:
+            for header, category in _SKILL_LIST_HEADERS.items():
+                match = re.search(f"{header}(.*?)(?=\n\\w+:|$)", skills_section, re.DOTALL | re.IGNORECASE)
+                if match:
+                    items = match.group(1).strip().split(',')
+                    listed.append((category, [item.strip() for item in items if item.strip()]))
+        return listed
+
+    def result(self) -> Dict[str, List[str]]:
+        skills = {category: set(skill_set) for category, skill_set in self.skills.items()}
+
+        # First marker (in priority order) that was seen holds the listed skills;
+        # only a capture that is still open (at most _MAX_SKILLS_SECTION_LINES) is parsed again
+        marker = next((marker for marker in self.markers if marker in self.captures), None)
+        if marker is not None:
+            listed = self.listed.get(marker)
+            if listed is None:
+                listed = self._listed_skills(self.captures[marker])
+            for category, items in listed:
+                skills[category].update(items)
+
+        # Convert sets to sorted lists
+        return {
+            category: sorted(skill_set, key=skill_sort_key)
+            for category, skill_set in skills.items()
+        }
+
+
+class _StructuredDataBuilder:
+    """Incremental section split and skill extraction over a stream of lines
+
+    The two stages are interleaved per line, so their time is accumulated
+    here and reported once per document by ``record_timings``. Lines are
+    cleaned as they arrive, so a snapshot costs the same on the last page
+    as on the first instead of re-cleaning the open section.
+    """
+
+    def __init__(self, processor: 'PDFProcessor'):
+        self.processor = processor
+        self.skills = _SkillCollector(processor)
+        self.sections = {}
+        self.current_section = None
+        # Cleaned lines of the open section, and whether it had any lines at all
+        self.current_content = []
+        self.current_has_lines = False
+        self.skill_seconds = 0.0
+        self.split_seconds = 0.0
+
+    def feed(self, raw_line: str):
+        started = time.perf_counter()
+        self.skills.feed(raw_line)
+        split_started = time.perf_counter()
+        self.skill_seconds += split_started - started
+
+        line = raw_line.strip()
+        if line:
+            # Check for section headers
+            section_match = self.processor._classify_line(line)
+
+            if section_match:
+                # Save previous section
+                if self.current_section and self.current_has_lines:
+                    self.sections[self.current_section] = self.current_content
+                # Start new section
+                self.current_section = section_match
+                self.current_content = []
+                self.current_has_lines = False
+            elif self.current_section:
+                self.current_has_lines = True
+                # Already stripped and known to hold no section marker
+                cleaned = self.processor._strip_content_line(line)
+                if cleaned:
+                    self.current_content.append(cleaned)
+
+        self.split_seconds += time.perf_counter() - split_started
+
+    def record_timings(self):
+        metrics.observe("stage_seconds", self.skill_seconds, stage="skill_match")
+        metrics.observe("stage_seconds", self.split_seconds, stage="section_split")
+        self.skill_seconds = self.split_seconds = 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Validated structured data for everything fed so far"""
+        sections = dict(self.sections)
+        if self.current_section and self.current_has_lines:
+            sections[self.current_section] = list(self.current_content)
+
+        return self.processor._validate_structured_data({
+            'sections': sections,
+            'skills': self.skills.result()
+        })
+
+
+# Comprehensive skill patterns, by category; also the fixed vocabulary ResumeProfile assigns IDs from
+TECH_PATTERNS = {
+    'languages': [
+        # Programming Languages
+        r'Python', r'Java(?:Script)?', r'TypeScript', r'C\+\+', r'C#', r'Ruby', r'PHP',
+        r'Go(?:lang)?', r'Rust', r'Swift', r'Kotlin', r'R', r'MATLAB', r'Scala',
+        r'Perl', r'Haskell', r'Lua', r'Dart', r'Julia',
+        # Web Technologies
+        r'HTML[5]?', r'CSS[3]?', r'SQL', r'NoSQL', r'GraphQL',
+        # Shell Scripting
+        r'Bash', r'Shell', r'PowerShell',
+        # Game Development
+        r'GDScript', r'Unity'
+    ],
+    'frameworks': [
+        # Frontend Frameworks
+        r'React(?:\.js)?', r'Angular(?:JS)?', r'Vue(?:\.js)?', r'Svelte', r'Next\.js',
+        r'jQuery', r'Bootstrap', r'Tailwind', r'Material-UI', r'Ember',
+        # Backend Frameworks
+        r'Django', r'Flask', r'FastAPI', r'Spring(?:Boot)?', r'Express(?:\.js)?',
+        r'Laravel', r'Ruby on Rails', r'ASP\.NET', r'Node\.js',
+        # Mobile Frameworks
+        r'React Native', r'Flutter', r'Xamarin', r'SwiftUI', r'Kotlin Multiplatform',
+        # Data Science
+        r'TensorFlow', r'PyTorch', r'Keras', r'Scikit-learn', r'Pandas',
+        r'NumPy', r'SciPy', r'Matplotlib', r'Seaborn', r'Plotly',
+        # Testing Frameworks
+        r'Jest', r'Mocha', r'Pytest', r'JUnit', r'Selenium'
+    ],
+    'tools': [
+        # Version Control
+        r'Git', r'GitHub', r'GitLab', r'Bitbucket', r'SVN',
+        # DevOps & Cloud
+        r'Docker', r'Kubernetes', r'Jenkins', r'Travis CI', r'CircleCI',
+        r'AWS', r'Azure', r'GCP', r'Heroku', r'DigitalOcean',
+        # Databases
+        r'MySQL', r'PostgreSQL', r'MongoDB', r'Redis', r'Cassandra',
+        r'Oracle', r'SQLite', r'Firebase',
+        # IDEs & Editors
+        r'VS Code', r'Visual Studio', r'IntelliJ', r'PyCharm', r'Eclipse',
+        r'Sublime', r'Atom', r'Vim', r'Emacs',
+        # Design Tools
+        r'Figma', r'Sketch', r'Adobe XD', r'Photoshop', r'Illustrator',
+        # Other Tools
+        r'Jira', r'Confluence', r'Trello', r'Slack', r'Postman'
+    ]
+}
+
+
+def skill_spellings() -> Tuple[Tuple[str, str], ...]:
+    """(spelling, category) of every skill spelling TECH_PATTERNS can match"""
+    return _skill_terms(tuple((category, tuple(patterns)) for category, patterns in TECH_PATTERNS.items()))
+
 
 class PDFProcessor:
-    def __init__(self):
+    def __init__(self, backend: Optional[str] = None):
+        # ``backend`` (or $PDF_BACKEND) puts one of pypdfium2, pypdf2 or
+        # pdfminer in front; the installed ones are looked up on first use,
+        # so the text-only methods work without any PDF library
+        self.preferred_backend = backend or os.getenv("PDF_BACKEND") or None
+        self._backends: Optional[Tuple[PDFBackend, ...]] = None
+
         # Define section markers
         self.sections = {
             "Education": ["EDUCATION", "ACADEMIC BACKGROUND", "ACADEMIC QUALIFICATIONS"],
@@ -13,174 +521,177 @@ class PDFProcessor:
             "Certificates": ["CERTIFICATES", "CERTIFICATIONS", "COURSES", "ACHIEVEMENTS"]
         }
         
-        # Comprehensive skill patterns
-        self.tech_patterns = {
-            'languages': [
-                # Programming Languages
-                r'Python', r'Java(?:Script)?', r'TypeScript', r'C\+\+', r'C#', r'Ruby', r'PHP',
-                r'Go(?:lang)?', r'Rust', r'Swift', r'Kotlin', r'R', r'MATLAB', r'Scala',
-                r'Perl', r'Haskell', r'Lua', r'Dart', r'Julia',
-                # Web Technologies
-                r'HTML[5]?', r'CSS[3]?', r'SQL', r'NoSQL', r'GraphQL',
-                # Shell Scripting
-                r'Bash', r'Shell', r'PowerShell',
-                # Game Development
-                r'GDScript', r'Unity'
-            ],
-            'frameworks': [
-                # Frontend Frameworks
-                r'React(?:\.js)?', r'Angular(?:JS)?', r'Vue(?:\.js)?', r'Svelte', r'Next\.js',
-                r'jQuery', r'Bootstrap', r'Tailwind', r'Material-UI', r'Ember',
-                # Backend Frameworks
-                r'Django', r'Flask', r'FastAPI', r'Spring(?:Boot)?', r'Express(?:\.js)?',
-                r'Laravel', r'Ruby on Rails', r'ASP\.NET', r'Node\.js',
-                # Mobile Frameworks
-                r'React Native', r'Flutter', r'Xamarin', r'SwiftUI', r'Kotlin Multiplatform',
-                # Data Science
-                r'TensorFlow', r'PyTorch', r'Keras', r'Scikit-learn', r'Pandas',
-                r'NumPy', r'SciPy', r'Matplotlib', r'Seaborn', r'Plotly',
-                # Testing Frameworks
-                r'Jest', r'Mocha', r'Pytest', r'JUnit', r'Selenium'
-            ],
-            'tools': [
-                # Version Control
-                r'Git', r'GitHub', r'GitLab', r'Bitbucket', r'SVN',
-                # DevOps & Cloud
-                r'Docker', r'Kubernetes', r'Jenkins', r'Travis CI', r'CircleCI',
-                r'AWS', r'Azure', r'GCP', r'Heroku', r'DigitalOcean',
-                # Databases
-                r'MySQL', r'PostgreSQL', r'MongoDB', r'Redis', r'Cassandra',
-                r'Oracle', r'SQLite', r'Firebase',
-                # IDEs & Editors
-                r'VS Code', r'Visual Studio', r'IntelliJ', r'PyCharm', r'Eclipse',
-                r'Sublime', r'Atom', r'Vim', r'Emacs',
-                # Design Tools
-                r'Figma', r'Sketch', r'Adobe XD', r'Photoshop', r'Illustrator',
-                # Other Tools
-                r'Jira', r'Confluence', r'Trello', r'Slack', r'Postman'
-            ]
-        }
+        # Comprehensive skill patterns (a copy, so per-instance edits stay local)
+        self.tech_patterns = {category: list(patterns) for category, patterns in TECH_PATTERNS.items()}
 
-    def extract_text(self, pdf_file) -> str:
-        """Extract text from PDF file with error handling"""
+        # Section header index: one regex rejects ordinary lines, and the rare
+        # header line is resolved in the declaration order of self.sections
+        section_items = tuple(
+            (section_name, tuple(marker.upper() for marker in markers))
+            for section_name, markers in self.sections.items()
+        )
+        self._section_regex = _compile_section_index(section_items)
+        self._section_markers = section_items
+
+        # Single-pass matcher over all of the patterns above
+        pattern_items = tuple((category, tuple(patterns)) for category, patterns in self.tech_patterns.items())
+        self._skill_matcher, self._skill_categories = _compile_skill_matcher(pattern_items)
+        self._skill_terms = _skill_terms(pattern_items)
+
+    @property
+    def backends(self) -> Tuple[PDFBackend, ...]:
+        """PDF libraries to decode with, fastest installed first"""
+        if self._backends is None:
+            self._backends = select_backends(self.preferred_backend)
+        return self._backends
+
+    def iter_pages(self, pdf_file, opened: Optional[Callable[[str], None]] = None) -> Iterator[str]:
+        """Yield the text of each page as the PDF backend decodes it
+
+        ``opened`` is called with the name of the backend that accepted the
+        document, which is not always the first one (see ``open_document``).
+        """
+        # Only time spent inside the backend counts, not the consumer's work between pages
+        decode_seconds = 0.0
+        backend_name = self.backends[0].name
         try:
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            text = ""
-            for page in pdf_reader.pages:
+            started = time.perf_counter()
+            backend, pages = open_document(pdf_file, self.backends)
+            backend_name = backend.name
+            if opened is not None:
+                opened(backend_name)
+            pages = iter(pages)
+            decode_seconds += time.perf_counter() - started
+            while True:
+                # Some backends (pdfminer) only parse a page when it is iterated to
+                started = time.perf_counter()
                 try:
-                    text += page.extract_text() + "\n"
-                except Exception as e:
-                    print(f"Error extracting text from page: {str(e)}")
-                    continue
-            return text
+                    page = next(pages, None)
+                    if page is None:
+                        break
+                    try:
+                        # Backends disagree on trailing line breaks; dropping them keeps
+                        # the line structure (and so the parse) the same for all of them
+                        page_text = backend.page_text(page).rstrip("\n")
+                    except Exception as e:
+                        logger.warning("Error extracting text from page: %s", e)
+                        metrics.increment("errors_total", stage="pdf_decode_page")
+                        continue
+                finally:
+                    decode_seconds += time.perf_counter() - started
+                yield page_text
         except Exception as e:
-            print(f"Error processing PDF: {str(e)}")
+            logger.error("Error processing PDF: %s", e)
+            metrics.increment("errors_total", stage="pdf_decode")
             raise Exception(f"Error processing PDF: {str(e)}")
+        finally:
+            metrics.observe("stage_seconds", decode_seconds, stage="pdf_decode", backend=backend_name)
+
+    def iter_lines(self, pdf_file) -> Iterator[str]:
+        """Yield the raw text lines of a PDF, page by page"""
+        for page_text in self.iter_pages(pdf_file):
+            yield from page_text.split('\n')
+
+    def extract_text(self, pdf_file) -> str:
+        """Extract text from PDF file with error handling"""
+        return "".join(page_text + "\n" for page_text in self.iter_pages(pdf_file))
 
     def extract_skills(self, text: str) -> Dict[str, List[str]]:
         """Extract and categorize skills from text"""
-        skills = {
-            'languages': set(),
-            'frameworks': set(),
-            'tools': set()
-        }
-        
         try:
-            # First, try to extract from Technical Skills section
-            skills_section = None
-            for marker in self.sections["Technical Skills"]:
-                match = re.search(f"{marker}.*?(?=\n\w+:|$)", text, re.DOTALL | re.IGNORECASE)
-                if match:
-                    skills_section = match.group(0)
-                    break
-
-            if skills_section:
-                # Process structured skills section
-                categories = {
-                    'Languages:': 'languages',
-                    'Programming Languages:': 'languages',
-                    'Frameworks:': 'frameworks',
-                    'Libraries:': 'frameworks',
-                    'Tools:': 'tools',
-                    'Technologies:': 'tools'
-                }
-
-                for header, category in categories.items():
-                    match = re.search(f"{header}(.*?)(?=\n\w+:|$)", skills_section, re.DOTALL | re.IGNORECASE)
-                    if match:
-                        items = match.group(1).strip().split(',')
-                        skills[category].update(item.strip() for item in items if item.strip())
-
-            # Then scan entire text for additional technologies
-            for category, patterns in self.tech_patterns.items():
-                for pattern in patterns:
-                    matches = re.finditer(pattern, text, re.IGNORECASE)
-                    for match in matches:
-                        skills[category].add(match.group())
-
-            # Convert sets to sorted lists and remove duplicates
-            return {
-                category: sorted(list(set(skill_set)), key=str.lower)
-                for category, skill_set in skills.items()
-            }
+            with metrics.span("skill_match"):
+                collector = _SkillCollector(self)
+                for line in text.split('\n'):
+                    collector.feed(line)
+                return collector.result()
 
         except Exception as e:
-            print(f"Error in skill extraction: {str(e)}")
+            logger.error("Error in skill extraction: %s", e)
             return {
                 'languages': ['Python'],  # Default fallback
                 'frameworks': ['React'],
                 'tools': ['Git']
             }
 
+    def extract_skills_batch(self, texts: Iterable[str]) -> SkillBatch:
+        """Count the skill vocabulary across many resumes at once, for cohort statistics
+
+        The resumes are joined, lowercased and tokenized in one pass into a
+        resume x word count matrix (``SkillBatch.tokens``); skills are then
+        read off the token IDs with NumPy, a table lookup for one-word skills and array
+        comparisons for the rest, instead of running the line-by-line
+        collector once per resume. Only skills from ``tech_patterns`` are
+        counted, under their declared spelling; unlike ``extract_skills``,
+        free-form entries of a "Languages: ..." list are not included.
+        """
+        import numpy as np
+
+        with metrics.span("skill_match", mode="batch"):
+            # NUL separates resumes, so no multi-token skill can run from one into the next
+            vocabulary = {'\0': 0, ' ': 1, '  ': 2}
+            spellings = [spelling for spelling, _ in self._skill_terms]
+            skill_tokens = [
+                [vocabulary.setdefault(token, len(vocabulary)) for token in _TOKEN.findall(spelling.lower())]
+                for spelling in spellings
+            ]
+            texts = list(texts)
+            documents = len(texts)
+            # A NUL inside a resume becomes another symbol that no skill contains
+            corpus = "\0".join(text.replace("\0", "\x01") for text in texts).lower()
+            token_ids = _tokenize_corpus(corpus, vocabulary)
+            rows = np.cumsum(token_ids == 0) - (token_ids == 0)
+            terms = list(vocabulary)
+            is_word = np.array([_WORD_CHAR.match(term) is not None for term in terms], dtype=bool)
+
+            words = np.flatnonzero(is_word)
+            word_columns = np.full(len(terms), -1, dtype=np.int64)
+            word_columns[words] = np.arange(len(words))
+            in_words = is_word[token_ids]
+            token_matrix = TermMatrix.from_pairs([terms[i] for i in words.tolist()], rows[in_words],
+                                                 word_columns[token_ids[in_words]], documents)
+
+            positions, columns = _skill_positions(token_ids, skill_tokens, is_word)
+            return SkillBatch.from_pairs(spellings, rows[positions], columns, documents,
+                                         categories=[category for _, category in self._skill_terms],
+                                         tokens=token_matrix)
+
+    def iter_structured_data(self, pdf_file) -> Iterator[Dict[str, Any]]:
+        """Parse a PDF incrementally, yielding the structured data found so far after each page
+
+        Only the section content and skills are kept in memory, never the full
+        document text. The last snapshot yielded is the complete result.
+        """
+        return self.iter_structured_data_from_pages(self.iter_pages(pdf_file))
+
+    def iter_structured_data_from_pages(self, pages: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """Same as iter_structured_data, over already decoded page texts"""
+        builder = _StructuredDataBuilder(self)
+        yielded = False
+        try:
+            for page_text in pages:
+                for line in page_text.split('\n'):
+                    builder.feed(line)
+                yielded = True
+                yield builder.snapshot()
+
+            if not yielded:
+                yield builder.snapshot()
+        finally:
+            builder.record_timings()
+
     def get_structured_data(self, text: str) -> Dict[str, Any]:
         """Extract structured data from resume text"""
         try:
-            sections_dict = {}
-            current_section = None
-            current_content = []
-            
-            # Split text into lines and process
-            lines = text.split('\n')
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-                
-                # Check for section headers
-                section_match = None
-                for section_name, markers in self.sections.items():
-                    for marker in markers:
-                        if marker.upper() in line.upper():
-                            section_match = section_name
-                            break
-                    if section_match:
-                        break
-
-                if section_match:
-                    # Save previous section
-                    if current_section and current_content:
-                        sections_dict[current_section] = self._clean_content(current_content)
-                    # Start new section
-                    current_section = section_match
-                    current_content = []
-                elif current_section:
-                    current_content.append(line)
-
-            # Add last section
-            if current_section and current_content:
-                sections_dict[current_section] = self._clean_content(current_content)
-
-            # Extract skills
-            skills_dict = self.extract_skills(text)
-
-            # Validate and return structured data
-            return self._validate_structured_data({
-                'sections': sections_dict,
-                'skills': skills_dict
-            })
+            builder = _StructuredDataBuilder(self)
+            for line in text.split('\n'):
+                builder.feed(line)
+            structured_data = builder.snapshot()
+            builder.record_timings()
+            return structured_data
 
         except Exception as e:
-            print(f"Error in structured data extraction: {str(e)}")
+            logger.error("Error in structured data extraction: %s", e)
+            metrics.increment("errors_total", stage="structured_data")
             return {
                 'sections': {
                     'Education': ['Education information not found'],
@@ -194,19 +705,32 @@ class PDFProcessor:
                 }
             }
 
+    def _classify_line(self, line: str) -> Optional[str]:
+        """Return the section a header line starts, or None for ordinary lines"""
+        upper_line = line.upper()
+        if not self._section_regex.search(upper_line):
+            return None
+        for section_name, markers in self._section_markers:
+            for marker in markers:
+                if marker in upper_line:
+                    return section_name
+        return None
+
     def _clean_content(self, content: List[str]) -> List[str]:
         """Clean and format section content"""
-        cleaned = []
-        for line in content:
-            line = line.strip()
-            if line and not any(marker.upper() in line.upper() 
-                              for markers in self.sections.values() 
-                              for marker in markers):
-                # Remove bullet points and other common markers
-                line = re.sub(r'^[-•●■◆○*]+\s*', '', line)
-                if line:
-                    cleaned.append(line)
-        return cleaned
+        return [line for line in map(self._clean_line, content) if line]
+
+    def _clean_line(self, line: str) -> Optional[str]:
+        line = line.strip()
+        if line and not self._section_regex.search(line.upper()):
+            return self._strip_content_line(line)
+        return None
+
+    @staticmethod
+    def _strip_content_line(line: str) -> Optional[str]:
+        """Clean a stripped line that ``_classify_line`` already found is not a header"""
+        # Remove bullet points and other common markers
+        return strip_bullet(line) or None
 
     def _validate_structured_data(self, data: Dict) -> Dict:
         """Validate and ensure minimum required data structure"""
@@ -0,0 +1,273 @@
+import hashlib
+import json
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from metrics import metrics
+from prompts import GUIDE_SECTIONS
+from rate_limiter import SingleFlight
+
+
+# Set while a target of iter_progress computes in a worker thread
+_progress: ContextVar[Optional[Callable[[Any], None]]] = ContextVar("pipeline_progress", default=None)
+
+
+def progress_reporter() -> Optional[Callable[[Any], None]]:
+    """Callback that hands a partial result of the running stage to ``iter_progress``, or None
+
+    None when no ``iter_progress`` caller is listening, e.g. for stages run
+    by ``run`` or resolved as an upstream dependency.
+    """
+    return _progress.get()
+
+
+def fingerprint(value: Any) -> str:
+    """Content digest of a stage input or output"""
+    digest = getattr(value, "digest", None)
+    if isinstance(digest, str):
+        # Already hashed once on ingest (upload_ingest.IngestedUpload)
+        return digest
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return hashlib.sha256(value).hexdigest()
+    if isinstance(value, str):
+        data = value.encode("utf-8")
+    else:
+        data = json.dumps(value, sort_keys=True, default=repr).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+@dataclass
+class Stage:
+    name: str
+    fn: Callable[..., Any]
+    inputs: Tuple[str, ...]
+    # Key downstream stages by a digest of this stage's output rather than of
+    # its inputs, so an input change that leaves the output alone stops here
+    key_by_value: bool = False
+
+
+class Pipeline:
+    """Dependency graph of memoized stages
+
+    Every stage is a function of named inputs, which are either other stages
+    or values passed to ``run``. A stage's memo key is derived from the keys
+    of its inputs, so changing one input recomputes only the stages that
+    depend on it; everything upstream or on other branches is reused. Stage
+    functions that raise are not memoized, and concurrent runs that need the
+    same stage result share one computation.
+    """
+
+    def __init__(self, max_entries: int = 256, name: str = "pipeline"):
+        self.max_entries = max_entries
+        self.name = name
+        self._stages: Dict[str, Stage] = {}
+        self._memo: Dict[str, "OrderedDict[str, Any]"] = {}
+        self._single_flight = SingleFlight(name=name)
+        self._lock = threading.Lock()
+
+    def add_stage(self, name: str, fn: Callable[..., Any], inputs: Iterable[str], key_by_value: bool = False):
+        """Register stage ``name``, computed as ``fn(*inputs)`` with the inputs' values in order"""
+        self._stages[name] = Stage(name, fn, tuple(inputs), key_by_value)
+        self._memo[name] = OrderedDict()
+
+    def run(self, target: str, **inputs) -> Any:
+        return self.run_many([target], **inputs)[target]
+
+    def run_many(self, targets: Iterable[str], **inputs) -> Dict[str, Any]:
+        """Values of ``targets``, computing only stages whose inputs changed
+
+        A stage name may also be passed as an input to start the graph there,
+        e.g. ``structured=...`` when a resume was already parsed elsewhere.
+        """
+        resolved: Dict[str, Tuple[Any, str]] = {}
+        return {target: self._resolve(target, inputs, resolved)[0] for target in targets}
+
+    def iter_completed(self, targets: Iterable[str], max_workers: Optional[int] = None,
+                       return_exceptions: bool = False, **inputs) -> Iterator[Tuple[str, Any]]:
+        """Yield ``(target, value)`` as each target finishes, computing the targets in parallel
+
+        The targets' own inputs are resolved first in the calling thread, so
+        shared upstream stages run once, and a failure there raises straight
+        away. A failed target raises when its turn comes, or with
+        ``return_exceptions`` is yielded with the exception as its value so
+        the other targets still arrive; targets still running keep going and
+        are memoized when done.
+        """
+        for target, _, value in self._iter_events(targets, max_workers, return_exceptions, inputs, False):
+            yield target, value
+
+    def iter_progress(self, targets: Iterable[str], max_workers: Optional[int] = None,
+                      return_exceptions: bool = False, **inputs) -> Iterator[Tuple[str, bool, Any]]:
+        """Like ``iter_completed``, but also yield what the targets report while they run
+
+        Yields ``(target, False, update)`` for each update a target's stage
+        function passes to ``progress_reporter()``, e.g. streamed text, and
+        ``(target, True, value)`` when it finishes. Updates arrive on the
+        calling thread, so they can be rendered directly.
+        """
+        return self._iter_events(targets, max_workers, return_exceptions, inputs, True)
+
+    def _iter_events(self, targets: Iterable[str], max_workers: Optional[int], return_exceptions: bool,
+                     inputs: Dict[str, Any], with_progress: bool) -> Iterator[Tuple[str, bool, Any]]:
+        targets = list(targets)
+        resolved: Dict[str, Tuple[Any, str]] = {}
+        for target in targets:
+            stage = self._stages.get(target)
+            for dependency in stage.inputs if stage is not None else ():
+                self._resolve(dependency, inputs, resolved)
+
+        events: "queue.Queue[Tuple[str, bool, Any, Optional[BaseException]]]" = queue.Queue()
+
+        def compute(target: str):
+            # Without a listener stages see no reporter, so e.g. sections are not streamed for nothing
+            report = (lambda update: events.put((target, False, update, None))) if with_progress else None
+            token = _progress.set(report)
+            try:
+                events.put((target, True, self._resolve(target, inputs, dict(resolved))[0], None))
+            except BaseException as error:
+                events.put((target, True, None, error))
+            finally:
+                _progress.reset(token)
+
+        executor = ThreadPoolExecutor(max_workers=max_workers or max(len(targets), 1),
+                                      thread_name_prefix=self.name)
+        try:
+            for target in targets:
+                executor.submit(compute, target)
+            remaining = len(targets)
+            while remaining:
+                target, done, value, error = events.get()
+                if done:
+                    remaining -= 1
+                if error is None:
+                    yield target, done, value
+                elif return_exceptions:
+                    yield target, done, error
+                else:
+                    raise error
+        finally:
+            executor.shutdown(wait=False)
+
+    def _resolve(self, name: str, inputs: Dict[str, Any], resolved: Dict[str, Tuple[Any, str]]) -> Tuple[Any, str]:
+        if name in resolved:
+            return resolved[name]
+        if name in inputs:
+            value = inputs[name]
+            resolved[name] = (value, fingerprint(value))
+            return resolved[name]
+        stage = self._stages.get(name)
+        if stage is None:
+            raise KeyError(f"Pipeline has no stage or input named {name!r}")
+
+        upstream = [self._resolve(dependency, inputs, resolved) for dependency in stage.inputs]
+        key = hashlib.sha256(
+            "\0".join([stage.name] + [dependency_key for _, dependency_key in upstream]).encode("utf-8")
+        ).hexdigest()
+        arguments = [value for value, _ in upstream]
+
+        found, value = self._lookup(stage.name, key)
+        if found:
+            metrics.increment("pipeline_stages_total", stage=stage.name, result="reused")
+        else:
+            value = self._single_flight.do(key, lambda: self._compute(stage, key, arguments))
+        resolved[name] = (value, fingerprint(value) if stage.key_by_value else key)
+        return resolved[name]
+
+    def _lookup(self, stage_name: str, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            memo = self._memo[stage_name]
+            if key in memo:
+                memo.move_to_end(key)
+                return True, memo[key]
+        return False, None
+
+    def _compute(self, stage: Stage, key: str, arguments: List[Any]) -> Any:
+        # Another caller may have finished this stage since the lookup
+        found, value = self._lookup(stage.name, key)
+        if found:
+            metrics.increment("pipeline_stages_total", stage=stage.name, result="reused")
+            return value
+        value = stage.fn(*arguments)
+        metrics.increment("pipeline_stages_total", stage=stage.name, result="computed")
+        with self._lock:
+            memo = self._memo[stage.name]
+            memo[key] = value
+            while len(memo) > self.max_entries:
+                memo.popitem(last=False)
+        return value
+
+
+def section_stage(title: str) -> str:
+    return f"section:{title}"
+
+
+def guide_section_stages() -> List[str]:
+    """Stage names of the guide sections, in display order"""
+    return [section_stage(section.title) for section in GUIDE_SECTIONS]
+
+
+def merge_sections(sections: List[Tuple[str, str]]) -> str:
+    """Join (title, text) pairs under ``# Title`` headers, as LLMUtils.extract_sections expects"""
+    return "\n\n".join(f"# {title}\n\n{text.strip()}" for title, text in sections)
+
+
+def build_guide_pipeline(llm_service, prompt_generator, parsing_service=None, resume_cache=None,
+                         max_entries: int = 256) -> Pipeline:
+    """PDF -> parsed resume -> skills -> one prompt and one LLM call per guide section -> guide
+
+    Each section depends only on the skills and role, plus the company for
+    company-specific sections, so changing the company regenerates only
+    those sections and a re-uploaded or edited resume with the same skills
+    reuses the whole guide. The ``pdf`` input is raw bytes or an
+    IngestedUpload, whose ingest-time digest keys the run without rehashing.
+    Without ``parsing_service``, runs must start at ``structured``.
+
+    Use ``iter_completed`` over ``guide_section_stages()`` to generate the
+    sections concurrently, each with its own output-token budget; the guide
+    then takes as long as its slowest section rather than all five in turn.
+    ``iter_progress`` also yields each section's text chunks as they stream
+    in. The ``guide`` stage itself computes them one after another.
+    """
+    pipeline = Pipeline(max_entries=max_entries, name="guide_pipeline")
+
+    if parsing_service is not None:
+        def parse(pdf):
+            result = parsing_service.parse(pdf, cache=resume_cache)
+            if result.error:
+                raise ValueError(result.error)
+            return result.structured_data
+
+        pipeline.add_stage("structured", parse, ["pdf"])
+    pipeline.add_stage("skills", lambda structured: structured.get('skills', {}), ["structured"], key_by_value=True)
+
+    for section in GUIDE_SECTIONS:
+        def prompt(skills, role, company="", section=section):
+            with metrics.span("prompt_build", section=section.title):
+                return prompt_generator.generate_section_prompt(skills, company, role, section)
+
+        dependencies = ["skills", "role"] + (["company"] if section.company_specific else [])
+        pipeline.add_stage(f"prompt:{section.title}", prompt, dependencies, key_by_value=True)
+
+        def generate(section_prompt, section=section):
+            report = progress_reporter()
+            if report is None:
+                return llm_service.generate_section(section_prompt, max_output_tokens=section.max_output_tokens)
+            # Someone is rendering this section as it is written: pass each chunk on
+            chunks = []
+            for chunk in llm_service.stream_section(section_prompt, max_output_tokens=section.max_output_tokens):
+                report(chunk)
+                chunks.append(chunk)
+            return "".join(chunks)
+
+        pipeline.add_stage(section_stage(section.title), generate, [f"prompt:{section.title}"])
+
+    def guide(*sections):
+        return merge_sections([(section.title, text) for section, text in zip(GUIDE_SECTIONS, sections)])
+
+    pipeline.add_stage("guide", guide, guide_section_stages())
+    return pipeline
@@ -0,0 +1,189 @@
+import hashlib
+import itertools
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Dict, FrozenSet, Iterator, List
+
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Skills that make a suggested role more likely for a resume
+ROLE_SKILL_HINTS = {
+    "Frontend Developer": {"javascript", "typescript", "react", "react.js", "angular", "vue", "vue.js",
+                           "svelte", "next.js", "html", "html5", "css", "css3", "tailwind", "figma"},
+    "Backend Developer": {"java", "go", "golang", "c#", "ruby", "php", "django", "flask", "fastapi",
+                          "spring", "express", "node.js", "sql", "postgresql", "mysql", "redis", "mongodb"},
+    "Full Stack Developer": {"javascript", "typescript", "react", "node.js", "express", "django",
+                             "next.js", "sql", "mongodb", "postgresql"},
+    "Data Scientist": {"python", "r", "sql", "pandas", "numpy", "scipy", "scikit-learn", "tensorflow",
+                       "pytorch", "keras", "matplotlib", "seaborn", "plotly", "julia", "matlab"},
+    "DevOps Engineer": {"docker", "kubernetes", "jenkins", "aws", "azure", "gcp", "bash", "shell",
+                        "powershell", "travis ci", "circleci", "heroku", "digitalocean"},
+    "Software Engineer": set()
+}
+
+
+def rank_roles(structured_data: dict, roles: List[str]) -> List[str]:
+    """Suggested roles ordered by how many of the resume's skills hint at them"""
+    skills = {
+        skill.lower()
+        for category in structured_data.get('skills', {}).values()
+        for skill in category
+    }
+    # Stable sort keeps the suggestion order for ties (Software Engineer is a catch-all)
+    return sorted(roles, key=lambda role: -len(skills & ROLE_SKILL_HINTS.get(role, set())))
+
+
+class GuidePrefetcher:
+    """Speculatively generates guides for the roles a user is likely to pick
+
+    Jobs run one at a time on a low-priority background thread, through the
+    guide ``pipeline`` when given (else the service's streaming path), so a
+    finished guide is memoized or cached and a click during generation joins
+    the in-flight request. The
+    worker holds back while any interactive request is running or the rate
+    limiter is short of headroom, and at most ``max_per_hour`` guides are
+    prefetched per process. A newer ``prefetch`` call for the same session
+    supersedes its older, still-queued jobs.
+    """
+
+    def __init__(self, llm_service, prompt_generator, roles_per_resume: int = 2, max_per_hour: int = 30,
+                 min_headroom: float = 0.5, poll_interval: float = 0.25, pipeline=None):
+        self.llm_service = llm_service
+        self.prompt_generator = prompt_generator
+        self.pipeline = pipeline
+        self.roles_per_resume = roles_per_resume
+        self.max_per_hour = max_per_hour
+        self.min_headroom = min_headroom
+        self.poll_interval = poll_interval
+        self._queue: "queue.PriorityQueue" = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._generations: Dict[str, int] = {}
+        self._pending: "OrderedDict[str, FrozenSet[str]]" = OrderedDict()
+        self._started: "OrderedDict[str, None]" = OrderedDict()
+        self._started_at: deque = deque()
+        self._interactive = 0
+        self._lock = threading.Lock()
+        self._worker = None
+
+    @contextmanager
+    def interactive(self) -> Iterator[None]:
+        """Mark a user-facing request as running; prefetching pauses meanwhile"""
+        with self._lock:
+            self._interactive += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._interactive -= 1
+
+    def prefetch(self, session_id: str, structured_data: dict, company_name: str, roles: List[str]) -> int:
+        """Queue guides for the most likely of ``roles``; returns how many were newly queued"""
+        jobs = []
+        for rank, role in enumerate(rank_roles(structured_data, roles)[:self.roles_per_resume]):
+            prompt = self.prompt_generator.generate_interview_prompt(structured_data, company_name, role)
+            key = hashlib.sha256(f"{role}\0{prompt}".encode("utf-8")).hexdigest()
+            jobs.append((rank, key, prompt, role))
+
+        with self._lock:
+            wanted = [job for job in jobs if job[1] not in self._started]
+            keys = frozenset(job[1] for job in wanted)
+            if not wanted or self._pending.get(session_id) == keys:
+                # Streamlit reruns the script on every interaction; nothing changed
+                return 0
+            generation = self._generations.get(session_id, 0) + 1
+            self._generations[session_id] = generation
+            self._pending[session_id] = keys
+            self._pending.move_to_end(session_id)
+            while len(self._pending) > 1024:
+                stale_session, _ = self._pending.popitem(last=False)
+                self._generations.pop(stale_session, None)
+            self._ensure_worker()
+
+        for rank, key, prompt, role in wanted:
+            self._queue.put((rank, next(self._sequence), session_id, generation, key, prompt, role,
+                             structured_data, company_name))
+        metrics.increment("prefetch_queued_total", len(wanted))
+        return len(wanted)
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="guide-prefetch", daemon=True)
+            self._worker.start()
+
+    def _within_budget(self) -> bool:
+        now = time.monotonic()
+        while self._started_at and now - self._started_at[0] > 3600:
+            self._started_at.popleft()
+        return len(self._started_at) < self.max_per_hour
+
+    def _idle(self) -> bool:
+        with self._lock:
+            if self._interactive:
+                return False
+        limiter = getattr(self.llm_service, "rate_limiter", None)
+        return limiter is None or limiter.headroom() >= self.min_headroom
+
+    def _run(self):
+        while True:
+            _, _, session_id, generation, key, prompt, role, structured_data, company_name = self._queue.get()
+            try:
+                with self._lock:
+                    if self._generations.get(session_id) != generation:
+                        skip = "superseded"
+                    elif key in self._started:
+                        skip = "duplicate"
+                    elif not self._within_budget():
+                        skip = "budget"
+                    else:
+                        skip = None
+                        self._started_at.append(time.monotonic())
+                        self._started[key] = None
+                        while len(self._started) > 1024:
+                            self._started.popitem(last=False)
+                if skip:
+                    metrics.increment("prefetch_skipped_total", reason=skip)
+                    continue
+
+                # Yield to interactive traffic before spending quota on a guess
+                while not self._idle():
+                    time.sleep(self.poll_interval)
+                with self._lock:
+                    superseded = self._generations.get(session_id) != generation
+                if superseded:
+                    self._forget(key)
+                    metrics.increment("prefetch_skipped_total", reason="superseded")
+                    continue
+
+                if self.pipeline is not None:
+                    # Raises instead of returning a fallback; handled below
+                    with metrics.span("prefetch", role=role):
+                        self.pipeline.run("guide", structured=structured_data, company=company_name, role=role)
+                    metrics.increment("prefetch_completed_total")
+                    continue
+
+                with metrics.span("prefetch", role=role):
+                    guide = "".join(self.llm_service.stream_response(prompt, role))
+                if guide.startswith("Error generating response") or \
+                        guide == self.llm_service.llm_utils.get_fallback_response(role):
+                    # Nothing was cached; leave the guide to a later prefetch or the user's click
+                    self._forget(key)
+                    metrics.increment("prefetch_failed_total")
+                else:
+                    metrics.increment("prefetch_completed_total")
+            except Exception as e:
+                logger.warning("Prefetch for %s failed: %s", role, e)
+                self._forget(key)
+                metrics.increment("prefetch_failed_total")
+            finally:
+                self._queue.task_done()
+
+    def _forget(self, key: str):
+        # Lets a later prefetch call retry this guide
+        with self._lock:
+            self._started.pop(key, None)
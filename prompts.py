@@ -1,14 +1,65 @@
+from typing import Dict, List, NamedTuple
+
+from pdf_processor import skill_sort_key
+
+
+class GuideSection(NamedTuple):
+    title: str
+    instructions: str
+    company_specific: bool  # False: shared by every company for the same role and skills
+    max_output_tokens: int  # cap for this section's own request
+
+
+# Sections of the interview guide, in display order
+GUIDE_SECTIONS = [
+    GuideSection("Technical Questions",
+                 "List 8-10 technical interview questions, each with a short note on what a strong answer covers. "
+                 "Tie them to the company's products, scale and technical environment.", True, 600),
+    GuideSection("Coding Challenges",
+                 "Give 3-4 coding challenges of increasing difficulty that exercise the candidate's languages and "
+                 "frameworks, each with the expected approach and its complexity.", False, 500),
+    GuideSection("System Design Questions",
+                 "Give 2-3 system design questions modeled on problems the company is likely to face, with the key "
+                 "components and trade-offs to discuss.", True, 500),
+    GuideSection("Key Concepts",
+                 "List the core concepts, patterns and tools the candidate should review for this role, with one "
+                 "line on why each matters.", False, 350),
+    GuideSection("Preparation Steps",
+                 "Give a step-by-step preparation plan for the week before the interview, including how to research "
+                 "the company and which of the candidate's projects to prepare to discuss.", True, 400),
+]
+
+
 class PromptGenerator:
+    @staticmethod
+    def _clean_skills(skills: dict) -> Dict[str, List[str]]:
+        # Remove duplicates and clean up skills; sorted so identical profiles
+        # always produce the same prompt (and hit the response cache)
+        return {
+            category: sorted(set([skill.strip() for skill in skills.get(category, [])]), key=skill_sort_key)
+            for category in ('languages', 'frameworks', 'tools')
+        }
+
+    def generate_section_prompt(self, skills: dict, company_name: str, role_name: str, section: GuideSection) -> str:
+        """Prompt for one guide section; the company is left out of sections that do not depend on it"""
+        cleaned = self._clean_skills(skills)
+        languages, frameworks, tools = cleaned['languages'], cleaned['frameworks'], cleaned['tools']
+        position = f"{role_name} position at {company_name}" if section.company_specific else f"{role_name} position"
+
+        return f"""As an expert technical interviewer, write the "{section.title}" section of an interview guide for a {position}.
+
+Candidate's Technical Profile:
+- Programming Languages: {', '.join(languages) if languages else 'Not specified'}
+- Frameworks & Libraries: {', '.join(frameworks) if frameworks else 'Not specified'}
+- Tools & Technologies: {', '.join(tools) if tools else 'Not specified'}
+
+{section.instructions}
+
+Start directly with the content, without repeating the section title. Focus on practical, real-world scenarios and provide specific examples."""
+
     def generate_interview_prompt(self, structured_data: dict, company_name: str, role_name: str) -> str:
-        skills = structured_data.get('skills', {})
-        languages = skills.get('languages', [])
-        frameworks = skills.get('frameworks', [])
-        tools = skills.get('tools', [])
-        
-        # Remove duplicates and clean up skills
-        languages = list(set([lang.strip() for lang in languages]))
-        frameworks = list(set([framework.strip() for framework in frameworks]))
-        tools = list(set([tool.strip() for tool in tools]))
+        cleaned = self._clean_skills(structured_data.get('skills', {}))
+        languages, frameworks, tools = cleaned['languages'], cleaned['frameworks'], cleaned['tools']
 
         prompt = f"""Creating interview guide for {role_name} position at {company_name}.
 
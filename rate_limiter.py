@@ -0,0 +1,247 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+from metrics import metrics
+
+
+class RateLimitExceeded(Exception):
+    """Waiting for quota would take longer than the limiter's ``max_wait``"""
+
+
+class RateLimiter:
+    """Process-wide client-side limiter for requests and tokens per minute
+
+    Two token buckets, refilled continuously, each holding up to one minute of
+    quota. ``reserve`` deducts a request's cost immediately, even when that
+    drives a bucket negative, and returns how long the caller must wait for
+    the deficit to refill. Callers are therefore served in arrival order
+    without a condition variable, and the same reservation works for threads
+    (``acquire``) and coroutines (``aacquire``). A limit of None is not enforced.
+    """
+
+    def __init__(self, requests_per_minute: Optional[float] = 60, tokens_per_minute: Optional[float] = 1_000_000,
+                 max_wait: Optional[float] = 30.0, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep, name: str = "gemini"):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_wait = max_wait
+        self.clock = clock
+        self.sleep = sleep
+        self.name = name
+        self._requests = float(requests_per_minute or 0)
+        self._tokens = float(tokens_per_minute or 0)
+        self._refilled_at = clock()
+        self._waiting = 0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        elapsed = now - self._refilled_at
+        self._refilled_at = now
+        if self.requests_per_minute:
+            self._requests = min(self.requests_per_minute, self._requests + elapsed * self.requests_per_minute / 60)
+        if self.tokens_per_minute:
+            self._tokens = min(self.tokens_per_minute, self._tokens + elapsed * self.tokens_per_minute / 60)
+
+    def reserve(self, tokens: int) -> float:
+        """Claim quota for one request of ``tokens``; returns the seconds to wait before sending it"""
+        with self._lock:
+            self._refill(self.clock())
+            wait = 0.0
+            if self.requests_per_minute:
+                self._requests -= 1
+                wait = max(wait, -self._requests * 60 / self.requests_per_minute)
+            if self.tokens_per_minute:
+                self._tokens -= tokens
+                wait = max(wait, -self._tokens * 60 / self.tokens_per_minute)
+            if self.max_wait is not None and wait > self.max_wait:
+                # Give the quota back; this request is not going to be sent
+                self._give_back(tokens)
+                metrics.increment("rate_limit_rejections_total", limiter=self.name)
+                raise RateLimitExceeded(f"Rate limit wait of {wait:.1f}s exceeds {self.max_wait:.0f}s")
+        metrics.observe("rate_limit_wait_seconds", wait, limiter=self.name)
+        if wait > 0:
+            metrics.increment("rate_limited_requests_total", limiter=self.name)
+        return wait
+
+    def release(self, tokens: int):
+        """Give back a reservation of ``tokens`` whose request will not be sent after all"""
+        with self._lock:
+            self._give_back(tokens)
+
+    def _give_back(self, tokens: int):
+        if self.requests_per_minute:
+            self._requests = min(self.requests_per_minute, self._requests + 1)
+        if self.tokens_per_minute:
+            self._tokens = min(self.tokens_per_minute, self._tokens + tokens)
+
+    def settle(self, reserved: int, used: int):
+        """Return unused token quota once a request's actual usage is known"""
+        if used < reserved and self.tokens_per_minute:
+            with self._lock:
+                self._tokens = min(self.tokens_per_minute, self._tokens + reserved - used)
+
+    def _queued(self, delta: int):
+        with self._lock:
+            self._waiting += delta
+            depth = self._waiting
+        metrics.set_gauge("rate_limiter_queue_depth", depth, limiter=self.name)
+
+    def headroom(self) -> float:
+        """Fraction of the tighter bucket that is currently available (0 when in deficit)"""
+        with self._lock:
+            self._refill(self.clock())
+            fractions = [1.0]
+            if self.requests_per_minute:
+                fractions.append(self._requests / self.requests_per_minute)
+            if self.tokens_per_minute:
+                fractions.append(self._tokens / self.tokens_per_minute)
+            return max(min(fractions), 0.0)
+
+    @property
+    def queue_depth(self) -> int:
+        """Callers currently waiting for quota"""
+        with self._lock:
+            return self._waiting
+
+    def acquire(self, tokens: int) -> float:
+        """Block until a request of ``tokens`` may be sent; returns the time waited"""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            self._queued(1)
+            try:
+                self.sleep(wait)
+            finally:
+                self._queued(-1)
+        return wait
+
+    async def aacquire(self, tokens: int) -> float:
+        """Async ``acquire``"""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            self._queued(1)
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                # The caller gave up, so the quota goes to the callers queued behind it
+                self.release(tokens)
+                raise
+            finally:
+                self._queued(-1)
+        return wait
+
+
+class _Broadcast:
+    """Chunks of one upstream stream, replayed to every reader"""
+
+    def __init__(self):
+        self.chunks: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.condition = threading.Condition()
+
+    def pump(self, source: Iterator[str]):
+        try:
+            for chunk in source:
+                with self.condition:
+                    self.chunks.append(chunk)
+                    self.condition.notify_all()
+        except BaseException as e:
+            self.error = e
+        finally:
+            with self.condition:
+                self.done = True
+                self.condition.notify_all()
+
+    def read(self) -> Iterator[str]:
+        position = 0
+        while True:
+            with self.condition:
+                while position >= len(self.chunks) and not self.done:
+                    self.condition.wait()
+                available = self.chunks[position:]
+                finished = self.done
+            position += len(available)
+            yield from available
+            if finished and position >= len(self.chunks):
+                break
+        if self.error is not None:
+            raise self.error
+
+
+class SingleFlight:
+    """Coalesces identical concurrent requests into one upstream call
+
+    While a call for ``key`` is in flight, later callers with the same key
+    wait for its result (or exception) instead of making their own. Nothing is
+    remembered once the call finishes; that is the response cache's job.
+    """
+
+    def __init__(self, name: str = "gemini"):
+        self.name = name
+        self._calls: Dict[str, Future] = {}
+        self._streams: Dict[str, _Broadcast] = {}
+        self._tasks: Dict[Tuple[int, str], asyncio.Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            metrics.increment("coalesced_requests_total", group=self.name, mode="call")
+            return future.result()
+
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._calls[key]
+        return future.result()
+
+    def stream(self, key: str, open_stream: Callable[[], Iterator[str]]) -> Iterator[str]:
+        """Share one upstream stream between identical concurrent requests
+
+        The upstream is drained by a background thread, so a reader that stops
+        early (e.g. a closed browser tab) does not stall the others.
+        """
+        with self._lock:
+            broadcast = self._streams.get(key)
+            leader = broadcast is None
+            if leader:
+                broadcast = self._streams[key] = _Broadcast()
+        if leader:
+            def run():
+                try:
+                    broadcast.pump(open_stream())
+                finally:
+                    with self._lock:
+                        del self._streams[key]
+
+            threading.Thread(target=run, daemon=True).start()
+        else:
+            metrics.increment("coalesced_requests_total", group=self.name, mode="stream")
+        return broadcast.read()
+
+    async def ado(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Async ``do``; cancelling one waiter does not cancel the shared call"""
+        task_key = (id(asyncio.get_running_loop()), key)
+        with self._lock:
+            task = self._tasks.get(task_key)
+            leader = task is None
+            if leader:
+                task = self._tasks[task_key] = asyncio.ensure_future(factory())
+                task.add_done_callback(lambda _: self._forget(task_key))
+        if not leader:
+            metrics.increment("coalesced_requests_total", group=self.name, mode="async")
+        return await asyncio.shield(task)
+
+    def _forget(self, task_key: Tuple[int, str]):
+        with self._lock:
+            self._tasks.pop(task_key, None)
@@ -0,0 +1,348 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Awaitable, Callable, Optional
+
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses (as carried on google.api_core exceptions' ``code``) worth retrying
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """The upstream is failing; calls are rejected without being attempted"""
+
+
+class DeadlineExceeded(Exception):
+    """A call ran out of its time budget"""
+
+
+class AttemptTimeout(Exception):
+    """A single attempt overran ``attempt_timeout``; retried while budget remains"""
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Transient failures: timeouts, connection errors, throttling and 5xx responses"""
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError, ConnectionError, AttemptTimeout)):
+        return True
+    code = getattr(error, "code", None)
+    return isinstance(code, int) and code in RETRYABLE_STATUS_CODES
+
+
+@dataclass
+class RetryPolicy:
+    max_attempts: int = 3
+    base_delay: float = 0.5              # first backoff ceiling, doubled per retry
+    max_delay: float = 8.0
+    deadline: Optional[float] = 45.0     # total budget for all attempts and backoff
+    attempt_timeout: Optional[float] = None
+    hedge_after: Optional[float] = None  # start a duplicate request if the first is this slow
+
+    def backoff(self, retry: int, rng: random.Random) -> float:
+        """Full-jitter exponential backoff before retry number ``retry`` (0-based)"""
+        return rng.uniform(0, min(self.max_delay, self.base_delay * (2 ** retry)))
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker
+
+    After ``failure_threshold`` transient failures in a row the circuit opens
+    and callers are rejected immediately. Once ``reset_timeout`` has passed a
+    single probe call is let through (half-open); its outcome closes the
+    circuit again or re-opens it for another ``reset_timeout``.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic, name: str = "llm"):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.name = name
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may proceed; every True must be followed by record_* or release_probe"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if self.clock() - self._opened_at < self.reset_timeout:
+                    return False
+                self._transition(self.HALF_OPEN)
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._probe_in_flight = False
+            if self._state != self.CLOSED:
+                self._transition(self.CLOSED)
+
+    def release_probe(self):
+        """Give up an allowed call without an outcome (e.g. it was cancelled); the state is unchanged"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = self.clock()
+                if self._state != self.OPEN:
+                    self._transition(self.OPEN)
+
+    def _transition(self, state: str):
+        logger.warning("Circuit %s: %s -> %s", self.name, self._state, state)
+        metrics.increment("circuit_transitions_total", circuit=self.name, to=state)
+        self._state = state
+
+
+def _run_in_thread(fn: Callable[[], Any]) -> Future:
+    # Daemon threads: an abandoned (timed out or out-hedged) call never blocks shutdown
+    future = Future()
+
+    def target():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=target, daemon=True).start()
+    return future
+
+
+def _discard_result(discard: Callable[[Any], None], future: Future):
+    if future.exception() is not None:
+        return
+    try:
+        discard(future.result())
+    except Exception as e:
+        logger.warning("Could not discard an unused result: %s", e)
+
+
+class ResilientCaller:
+    """Runs upstream calls with retries, a deadline, optional hedging and a circuit breaker
+
+    ``call`` is for blocking functions and ``acall`` for coroutine factories;
+    both raise CircuitOpenError straight away while the breaker is open, so
+    callers can degrade instantly instead of waiting on a failing upstream.
+    Only transient errors (see ``is_retryable``) are retried or count against
+    the breaker; anything else is raised to the caller as-is.
+    """
+
+    def __init__(self, policy: Optional[RetryPolicy] = None, breaker: Optional[CircuitBreaker] = None,
+                 sleep: Callable[[float], None] = time.sleep, clock: Callable[[], float] = time.monotonic,
+                 rng: Optional[random.Random] = None):
+        self.policy = policy or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker(clock=clock)
+        self.sleep = sleep
+        self.clock = clock
+        self.rng = rng or random.Random()
+
+    def _deadline_at(self, deadline: Optional[float]) -> Optional[float]:
+        budget = deadline if deadline is not None else self.policy.deadline
+        return None if budget is None else self.clock() + budget
+
+    def _remaining(self, deadline_at: Optional[float]) -> Optional[float]:
+        return None if deadline_at is None else deadline_at - self.clock()
+
+    def _attempt_window(self, remaining: Optional[float]) -> Optional[float]:
+        limits = [limit for limit in (remaining, self.policy.attempt_timeout) if limit is not None]
+        return min(limits) if limits else None
+
+    def _admit(self, deadline_at: Optional[float], last_error: Optional[Exception]) -> Optional[float]:
+        """Gate an attempt on the breaker and the deadline, returning the time left"""
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.breaker.name} circuit is open") from last_error
+        remaining = self._remaining(deadline_at)
+        if remaining is not None and remaining <= 0:
+            self.breaker.record_failure()
+            raise DeadlineExceeded("Call deadline exceeded") from last_error
+        return remaining
+
+    def _record_error(self, error: Exception):
+        """Feed a failed attempt to the breaker; re-raises errors that must not be retried"""
+        if not is_retryable(error) and not isinstance(error, DeadlineExceeded):
+            # The upstream answered; the request itself was bad
+            self.breaker.record_success()
+            raise error
+        self.breaker.record_failure()
+        if isinstance(error, DeadlineExceeded):
+            raise error
+
+    def _next_delay(self, attempt: int, deadline_at: Optional[float], last_error: Exception) -> Optional[float]:
+        """Backoff before the next attempt, or None when attempts are used up"""
+        if attempt + 1 >= self.policy.max_attempts:
+            return None
+        delay = self.policy.backoff(attempt, self.rng)
+        remaining = self._remaining(deadline_at)
+        if remaining is not None and delay >= remaining:
+            raise DeadlineExceeded("Call deadline exceeded") from last_error
+        metrics.increment("retries_total", circuit=self.breaker.name)
+        logger.info("Retrying after %s in %.2fs", type(last_error).__name__, delay)
+        return delay
+
+    def call(self, fn: Callable[[], Any], deadline: Optional[float] = None,
+             discard: Optional[Callable[[Any], None]] = None) -> Any:
+        """Call ``fn`` until it succeeds or the policy gives up
+
+        ``discard`` receives the result of any attempt that finishes but is
+        not used (the loser of a hedge, or an attempt abandoned after a
+        timeout), e.g. to close a stream it opened.
+        """
+        deadline_at = self._deadline_at(deadline)
+        last_error = None
+        for attempt in range(self.policy.max_attempts):
+            remaining = self._admit(deadline_at, last_error)
+            try:
+                result = self._attempt(fn, remaining, discard)
+            except Exception as e:
+                self._record_error(e)
+                last_error = e
+            else:
+                self.breaker.record_success()
+                return result
+
+            delay = self._next_delay(attempt, deadline_at, last_error)
+            if delay is None:
+                break
+            self.sleep(delay)
+        raise last_error
+
+    def _attempt(self, fn: Callable[[], Any], remaining: Optional[float],
+                 discard: Optional[Callable[[Any], None]] = None) -> Any:
+        window = self._attempt_window(remaining)
+        hedge_after = self.policy.hedge_after
+        if window is None and hedge_after is None:
+            # Nothing to time out or race against, so no thread is needed
+            return fn()
+
+        futures = [_run_in_thread(fn)]
+        started = self.clock()
+        winner = None
+        try:
+            if hedge_after is not None and (window is None or hedge_after < window):
+                done, _ = wait(futures, timeout=hedge_after)
+                if not done:
+                    metrics.increment("hedged_requests_total", circuit=self.breaker.name)
+                    futures.append(_run_in_thread(fn))
+
+            # First success wins; an error only counts once every request has failed
+            pending = set(futures)
+            first_error = None
+            while pending:
+                timeout = None if window is None else max(window - (self.clock() - started), 0)
+                done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                if not done:
+                    break
+                for future in done:
+                    if future.exception() is None:
+                        winner = future
+                        return future.result()
+                    first_error = first_error or future.exception()
+            if first_error is not None and not pending:
+                raise first_error
+            if remaining is not None and window >= remaining:
+                raise DeadlineExceeded("Call deadline exceeded")
+            raise AttemptTimeout(f"Attempt took longer than {window:.1f}s")
+        finally:
+            # Threads cannot be stopped, so the results of losing or abandoned
+            # requests are handed to ``discard`` whenever they arrive
+            for future in futures:
+                if future is not winner and not future.cancel() and discard is not None:
+                    future.add_done_callback(partial(_discard_result, discard))
+
+    async def acall(self, factory: Callable[[], Awaitable[Any]], deadline: Optional[float] = None,
+                    discard: Optional[Callable[[Any], None]] = None) -> Any:
+        """Async ``call``; ``factory`` returns a fresh awaitable for every attempt"""
+        deadline_at = self._deadline_at(deadline)
+        last_error = None
+        for attempt in range(self.policy.max_attempts):
+            remaining = self._admit(deadline_at, last_error)
+            try:
+                result = await self._aattempt(factory, remaining, discard)
+            except asyncio.CancelledError:
+                # Outcome unknown; release a half-open probe without judging the upstream
+                self.breaker.release_probe()
+                raise
+            except Exception as e:
+                self._record_error(e)
+                last_error = e
+            else:
+                self.breaker.record_success()
+                return result
+
+            delay = self._next_delay(attempt, deadline_at, last_error)
+            if delay is None:
+                break
+            await asyncio.sleep(delay)
+        raise last_error
+
+    async def _aattempt(self, factory: Callable[[], Awaitable[Any]], remaining: Optional[float],
+                        discard: Optional[Callable[[Any], None]] = None) -> Any:
+        window = self._attempt_window(remaining)
+        hedge_after = self.policy.hedge_after
+        tasks = [asyncio.ensure_future(factory())]
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        winner = None
+        try:
+            if hedge_after is not None and (window is None or hedge_after < window):
+                done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+                if not done:
+                    metrics.increment("hedged_requests_total", circuit=self.breaker.name)
+                    tasks.append(asyncio.ensure_future(factory()))
+
+            pending = set(tasks)
+            first_error = None
+            while pending:
+                timeout = None if window is None else max(window - (loop.time() - started), 0)
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    break
+                for task in done:
+                    if task.exception() is None:
+                        winner = task
+                        return task.result()
+                    first_error = first_error or task.exception()
+            if first_error is not None and not pending:
+                raise first_error
+            if remaining is not None and window >= remaining:
+                raise DeadlineExceeded("Call deadline exceeded")
+            raise AttemptTimeout(f"Attempt took longer than {window:.1f}s")
+        finally:
+            # Unlike threads, losing or timed-out requests can actually be cancelled
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif task is not winner and discard is not None and not task.cancelled():
+                    # Finished in the same step as the winner
+                    _discard_result(discard, task)
@@ -0,0 +1,193 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+class ResponseCache:
+    """Base class for LLM response caches with TTL and size-bounded LRU eviction
+
+    Subclasses provide the storage through ``_load``, ``_store`` and ``_clear``;
+    this class owns key derivation and the hit/miss/eviction counters.
+    """
+
+    def __init__(self, ttl_seconds: float = 3600, max_entries: int = 256):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._counter_lock = threading.Lock()
+
+    @staticmethod
+    def make_key(prompt: str, generation_config: Dict[str, Any], model_name: str = "") -> str:
+        """Key on the whitespace-normalized prompt, model and generation settings"""
+        normalized_prompt = _WHITESPACE.sub(" ", prompt).strip()
+        payload = json.dumps(
+            {"model": model_name, "config": generation_config, "prompt": normalized_prompt},
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._load(key, time.time())
+        with self._counter_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        metrics.increment("cache_misses_total" if value is None else "cache_hits_total", cache="response")
+        return value
+
+    def put(self, key: str, value: str):
+        evicted = self._store(key, value, time.time() + self.ttl_seconds)
+        if evicted:
+            with self._counter_lock:
+                self.evictions += evicted
+            metrics.increment("cache_evictions_total", evicted, cache="response")
+
+    def clear(self):
+        self._clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._counter_lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+    def _load(self, key: str, now: float) -> Optional[str]:
+        raise NotImplementedError
+
+    def _store(self, key: str, value: str, expires_at: float) -> int:
+        """Store an entry and return how many entries were evicted to make room"""
+        raise NotImplementedError
+
+    def _clear(self):
+        raise NotImplementedError
+
+
+class MemoryResponseCache(ResponseCache):
+    """In-process response cache"""
+
+    def __init__(self, ttl_seconds: float = 3600, max_entries: int = 256):
+        super().__init__(ttl_seconds, max_entries)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _load(self, key: str, now: float) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _store(self, key: str, value: str, expires_at: float) -> int:
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            evicted = 0
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+            return evicted
+
+    def _clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteResponseCache(ResponseCache):
+    """Response cache in a local SQLite file, shared by every worker on the host"""
+
+    def __init__(self, path: str, ttl_seconds: float = 3600, max_entries: int = 1024):
+        super().__init__(ttl_seconds, max_entries)
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # A short-lived connection per operation keeps this safe across threads
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _load(self, key: str, now: float) -> Optional[str]:
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                if row[1] <= now:
+                    conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    return None
+                conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+                return row[0]
+        except sqlite3.Error as e:
+            logger.warning("Error reading response cache: %s", e)
+            metrics.increment("errors_total", stage="response_cache_read")
+            return None
+
+    def _store(self, key: str, value: str, expires_at: float) -> int:
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                    (key, value, expires_at, now)
+                )
+                conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+                cursor = conn.execute(
+                    """DELETE FROM responses WHERE key IN (
+                        SELECT key FROM responses ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                    )""",
+                    (self.max_entries,)
+                )
+                return max(cursor.rowcount, 0)
+        except sqlite3.Error as e:
+            logger.warning("Error writing response cache: %s", e)
+            metrics.increment("errors_total", stage="response_cache_write")
+            return 0
+
+    def _clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM responses")
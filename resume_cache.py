@@ -0,0 +1,124 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from metrics import metrics
+from pdf_processor import PARSER_VERSION
+from resume_profile import ResumeProfile
+
+logger = logging.getLogger(__name__)
+
+ParsedResume = Tuple[str, ResumeProfile]
+
+
+class ResumeCache:
+    """Content-addressed cache of parsed resumes
+
+    Entries are keyed by the SHA-256 of the PDF bytes plus PARSER_VERSION and
+    the PDF backend that parsed them, so re-uploads of the same file skip
+    decoding entirely. Recent entries live in an in-memory LRU as compact
+    ResumeProfiles; when ``cache_dir`` is given, every entry is also written
+    there as JSON so it survives restarts and is shared between workers.
+    """
+
+    def __init__(self, max_entries: int = 128, cache_dir: Optional[str] = None):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, ParsedResume]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def digest_of(pdf_bytes: bytes) -> str:
+        return hashlib.sha256(pdf_bytes).hexdigest()
+
+    @staticmethod
+    def make_key(digest: str, backend: str) -> str:
+        """Key for a PDF, by its SHA-256, as parsed by ``backend``"""
+        # Backends lay text out slightly differently, so their results are kept apart
+        return f"{digest}-v{PARSER_VERSION}-{backend}"
+
+    def find(self, digest: str, backends: Iterable[str]) -> Optional[Tuple[str, ParsedResume]]:
+        """(backend, entry) of the first of ``backends`` with an entry for the PDF, in memory or on disk
+
+        Which backend parses a document is only known once it is opened (a
+        damaged file skips the preferred one), so pass every backend it may
+        go to, in the order they are tried (``pdf_backends.backend_names``).
+        """
+        for backend in backends:
+            entry, tier = self._fetch(self.make_key(digest, backend))
+            if entry is not None:
+                with self._lock:
+                    self.hits += 1
+                metrics.increment("cache_hits_total", cache="resume", tier=tier)
+                return backend, entry
+        with self._lock:
+            self.misses += 1
+        metrics.increment("cache_misses_total", cache="resume")
+        return None
+
+    def _fetch(self, key: str) -> Tuple[Optional[ParsedResume], str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry, "memory"
+
+        entry = self._read_disk(key)
+        if entry is not None:
+            with self._lock:
+                self._remember(key, entry)
+        return entry, "disk"
+
+    def put(self, key: str, text: str, structured_data: Dict[str, Any]):
+        entry = (text, ResumeProfile.from_dict(structured_data))
+        with self._lock:
+            self._remember(key, entry)
+        self._write_disk(key, entry)
+
+    def _remember(self, key: str, entry: ParsedResume):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _read_disk(self, key: str) -> Optional[ParsedResume]:
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._disk_path(key), encoding="utf-8") as f:
+                data = json.load(f)
+            return data["text"], ResumeProfile.from_dict(data["structured_data"])
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("Error reading resume cache entry: %s", e)
+            metrics.increment("errors_total", stage="resume_cache_read")
+            return None
+
+    def _write_disk(self, key: str, entry: ParsedResume):
+        if not self.cache_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"text": entry[0], "structured_data": entry[1].to_dict()}, f)
+            # Atomic rename so concurrent readers never see a partial file
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning("Error writing resume cache entry: %s", e)
+            metrics.increment("errors_total", stage="resume_cache_write")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
@@ -0,0 +1,157 @@
+import hashlib
+import json
+import sys
+from array import array
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from pdf_processor import skill_sort_key, skill_spellings
+
+
+class SkillVocabulary:
+    """Fixed table of skill spellings, each with a small integer ID
+
+    Built once from TECH_PATTERNS, so it never grows with the uploads a
+    long-running process sees and every bitset over it stays within about
+    two machine words. Lookups ignore case, so "python" from a "Languages:
+    ..." list gets the ID of "Python" and decodes to that spelling; other
+    free-form skills have no ID and profiles keep them as plain strings.
+    """
+
+    def __init__(self, names: Tuple[str, ...]):
+        self._names = tuple(sys.intern(name) for name in names)
+        self._ids = {name.casefold(): skill_id for skill_id, name in enumerate(self._names)}
+
+    def id_for(self, name: str) -> Optional[int]:
+        return self._ids.get(name.casefold())
+
+    def name(self, skill_id: int) -> str:
+        return self._names[skill_id]
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+skill_vocabulary = SkillVocabulary(tuple(spelling for spelling, _ in skill_spellings()))
+
+# (category, bitset of vocabulary skills, other skills)
+_CategorySkills = Tuple[str, int, Tuple[str, ...]]
+
+
+def _encode(names: List[str]) -> Tuple[int, Tuple[str, ...]]:
+    bits = 0
+    others = []
+    for name in names:
+        skill_id = skill_vocabulary.id_for(name)
+        if skill_id is None:
+            others.append(name)
+        else:
+            bits |= 1 << skill_id
+    return bits, tuple(others)
+
+
+def _decode(bits: int, others: Tuple[str, ...]) -> List[str]:
+    names = list(others)
+    while bits:
+        lowest = bits & -bits
+        names.append(skill_vocabulary.name(lowest.bit_length() - 1))
+        bits ^= lowest
+    # The order PDFProcessor produces
+    return sorted(names, key=skill_sort_key)
+
+
+class ResumeProfile(Mapping):
+    """Compact, read-only form of PDFProcessor's structured data
+
+    Skills are kept per category as a bitset over the fixed skill vocabulary
+    plus a tuple of any other (free-form) skills, and all section lines live
+    in a single string with (start, end) offsets per line, so a parsed resume
+    costs a few objects instead of one per line and per skill. It reads like
+    the dict it replaces: ``profile['skills']``, ``profile.get('sections', {})``
+    and ``dict(profile)`` build the familiar dicts of lists on access, and
+    comparing it with such a dict works. Skill lists come back in the
+    parser's order (see ``skill_sort_key``), with case variants of a
+    vocabulary skill ("go" next to "Go") folded into its spelling.
+    """
+
+    __slots__ = ("_skills", "_buffer", "_sections", "_digest")
+
+    def __init__(self, skills: Tuple[_CategorySkills, ...], buffer: str,
+                 sections: Tuple[Tuple[str, array], ...]):
+        self._skills = skills
+        self._buffer = buffer
+        self._sections = sections
+        self._digest: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, structured_data: Mapping) -> "ResumeProfile":
+        """Build a profile from ``{'sections': {...}, 'skills': {...}}``; profiles are returned as is"""
+        if isinstance(structured_data, ResumeProfile):
+            return structured_data
+        skills = tuple(
+            (sys.intern(category),) + _encode(names)
+            for category, names in structured_data.get('skills', {}).items()
+        )
+        parts = []
+        sections = []
+        length = 0
+        for name, lines in structured_data.get('sections', {}).items():
+            offsets = array('I')
+            for line in lines:
+                offsets.append(length)
+                length += len(line)
+                offsets.append(length)
+                parts.append(line)
+            sections.append((sys.intern(name), offsets))
+        return cls(skills, "".join(parts), tuple(sections))
+
+    @property
+    def skills(self) -> Dict[str, List[str]]:
+        return {category: _decode(bits, others) for category, bits, others in self._skills}
+
+    @property
+    def sections(self) -> Dict[str, List[str]]:
+        buffer = self._buffer
+        return {
+            name: [buffer[offsets[i]:offsets[i + 1]] for i in range(0, len(offsets), 2)]
+            for name, offsets in self._sections
+        }
+
+    def skill_bits(self, category: str) -> int:
+        """Bitset of a category's vocabulary skill IDs, for fast overlap checks between profiles"""
+        return next((bits for name, bits, _ in self._skills if name == category), 0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'sections': self.sections, 'skills': self.skills}
+
+    @property
+    def digest(self) -> str:
+        """SHA-256 of the JSON form, i.e. pipeline.fingerprint of ``to_dict()``"""
+        if self._digest is None:
+            self._digest = hashlib.sha256(
+                json.dumps(self.to_dict(), sort_keys=True, default=repr).encode("utf-8")
+            ).hexdigest()
+        return self._digest
+
+    def __getitem__(self, key: str) -> Dict[str, List[str]]:
+        if key == 'skills':
+            return self.skills
+        if key == 'sections':
+            return self.sections
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(('sections', 'skills'))
+
+    def __len__(self) -> int:
+        return 2
+
+    def __reduce__(self):
+        # Rebuilt from names, so a profile never depends on how IDs were assigned
+        return ResumeProfile.from_dict, (self.to_dict(),)
+
+    def __repr__(self) -> str:
+        counts = ", ".join(
+            f"{category}={bin(bits).count('1') + len(others)}" for category, bits, others in self._skills
+        )
+        return f"ResumeProfile({counts}, sections={len(self._sections)})"
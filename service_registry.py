@@ -0,0 +1,76 @@
+import hashlib
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceRegistry:
+    """Process-wide home for long-lived services, shared by every session
+
+    Streamlit reruns the whole script on every interaction; fetching services
+    from here instead of constructing them makes that free after the first
+    build. A service is rebuilt lazily when its ``key`` changes (e.g. a new
+    API key) or its health check fails. Build and reuse counts are recorded
+    so the UI can show how much setup time is saved.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._services: Dict[str, Any] = {}
+        self._fingerprints: Dict[str, str] = {}
+        self.build_seconds: Dict[str, float] = {}
+        self.builds: Dict[str, int] = {}
+        self.reuses: Dict[str, int] = {}
+
+    @staticmethod
+    def _fingerprint(key: Optional[Hashable]) -> str:
+        # Only a digest is kept, so secrets such as API keys are not held here
+        return hashlib.sha256(repr(key).encode("utf-8")).hexdigest()
+
+    def get(self, name: str, factory: Callable[[], Any], key: Optional[Hashable] = None,
+            health_check: Optional[Callable[[Any], bool]] = None) -> Any:
+        """Return the shared service ``name``, building it with ``factory`` if needed"""
+        fingerprint = self._fingerprint(key)
+        with self._lock:
+            service = self._services.get(name)
+            if service is not None and self._fingerprints.get(name) == fingerprint:
+                if health_check is None or self._is_healthy(service, health_check):
+                    self.reuses[name] = self.reuses.get(name, 0) + 1
+                    return service
+
+            started = time.perf_counter()
+            service = factory()
+            self.build_seconds[name] = time.perf_counter() - started
+            self.builds[name] = self.builds.get(name, 0) + 1
+            self._services[name] = service
+            self._fingerprints[name] = fingerprint
+            return service
+
+    def _is_healthy(self, service: Any, health_check: Callable[[Any], bool]) -> bool:
+        try:
+            return bool(health_check(service))
+        except Exception as e:
+            logger.warning("Service health check failed: %s", e)
+            return False
+
+    def invalidate(self, name: str):
+        with self._lock:
+            self._services.pop(name, None)
+            self._fingerprints.pop(name, None)
+
+    def rebuild_cost_seconds(self) -> float:
+        """What constructing every registered service from scratch would cost"""
+        with self._lock:
+            return sum(self.build_seconds.values())
+
+    def saved_seconds(self) -> float:
+        """Construction time avoided so far by reusing services"""
+        with self._lock:
+            return sum(self.build_seconds.get(name, 0.0) * count for name, count in self.reuses.items())
+
+
+# One registry per process; Streamlit keeps imported modules alive across reruns
+registry = ServiceRegistry()
@@ -0,0 +1,94 @@
+from chat_context import ChatContextManager, _text_of
+
+GUIDE = (
+    "# Role Overview\n\nData scientists turn data into decisions.\n\n"
+    "# Technical Questions\n\nExpect SQL joins, window functions and pandas.\n\n"
+    "# Behavioral Questions\n\nPrepare stories about conflict and ownership."
+)
+
+
+def user(text):
+    return {"role": "user", "parts": [{"text": text}]}
+
+
+def assistant(text):
+    return {"role": "assistant", "parts": [{"text": text}]}
+
+
+def guide(text=GUIDE):
+    return {"role": "assistant", "parts": [{"text": text}], "guide": True}
+
+
+def conversation(turns):
+    transcript = [guide()]
+    for index in range(turns):
+        transcript += [user(f"Question {index} about SQL joins?"), assistant(f"Answer {index}. More detail follows.")]
+    return transcript
+
+
+def roles(history):
+    return [message["role"] for message in history]
+
+
+def assert_alternates(history):
+    assert roles(history) == ["user", "model"] * (len(history) // 2)
+
+
+def test_guide_is_pinned_with_relevant_sections_and_recent_turns_kept_verbatim():
+    manager = ChatContextManager(recent_messages=4)
+    history = manager.build_history(conversation(5), "How do I practice SQL joins?")
+
+    assert_alternates(history)
+    context = _text_of(history[0])
+    assert "Role Overview; Technical Questions; Behavioral Questions" in context
+    assert "Expect SQL joins" in context and "conflict and ownership" not in context
+    # Older turns are summarized, the last two exchanges stay verbatim
+    assert "Earlier in this conversation:\nUser: Question 0 about SQL joins?" in context
+    assert [_text_of(message) for message in history[2:]] == [
+        "Question 3 about SQL joins?", "Answer 3. More detail follows.",
+        "Question 4 about SQL joins?", "Answer 4. More detail follows.",
+    ]
+
+
+def test_each_message_is_summarized_once():
+    summarized = []
+    manager = ChatContextManager(recent_messages=2, summarizer=lambda text: summarized.append(text) or text[:10])
+    transcript = conversation(3)
+    manager.build_history(transcript, "Next?")
+    manager.build_history(transcript + [user("Next?"), assistant("Sure.")], "And then?")
+    assert len(summarized) == len(set(summarized)) == 6
+
+
+def test_trimming_drops_summaries_then_sections_then_old_turns():
+    manager = ChatContextManager(token_budget=40, recent_messages=4)
+    history = manager.build_history(conversation(5), "How do I practice SQL joins?")
+
+    assert_alternates(history)
+    context = _text_of(history[0])
+    assert context.startswith("Interview guide sections:")
+    assert "Earlier in this conversation" not in context and "Expect SQL joins" not in context
+    assert [_text_of(message) for message in history[2:]] == [
+        "Question 4 about SQL joins?", "Answer 4. More detail follows."
+    ]
+
+
+def test_regenerated_guide_replaces_the_old_one_and_roles_still_alternate():
+    transcript = conversation(2) + [guide("# Role Overview\n\nNow for a data engineer."), assistant("Anything else?"),
+                                    user("Yes, what about Spark?"), user("And Airflow?"), assistant("Both matter.")]
+    history = ChatContextManager(recent_messages=20).build_history(transcript, "What should a data engineer study?")
+
+    assert_alternates(history)
+    context = _text_of(history[0])
+    assert "Now for a data engineer." in context and "SQL joins, window functions" not in context
+    texts = [_text_of(message) for message in history[2:]]
+    assert "Answer 1. More detail follows.\n\nAnything else?" in texts
+    assert "Yes, what about Spark?\n\nAnd Airflow?" in texts
+    assert not any("data engineer" in text for text in texts)
+
+
+def test_history_ends_with_a_model_turn():
+    transcript = conversation(1) + [user("A question whose answer failed")]
+    history = ChatContextManager().build_history(transcript, "Asking again")
+
+    assert_alternates(history)
+    assert history[-1]["role"] == "model"
@@ -0,0 +1,50 @@
+import pytest
+
+from fallback_templates import get_role_template, match_role
+
+
+@pytest.mark.parametrize("role, expected", [
+    ("Software Engineer", "Software Engineer"),
+    ("Senior Software Developer", "Software Engineer"),
+    ("Java Developer", "Backend Developer"),
+    ("Python Backend Developer", "Backend Developer"),
+    ("Security Engineer", "Security Engineer"),
+    ("Application Security Engineer", "Security Engineer"),
+    ("Front-End Engineer", "Frontend Developer"),
+    ("JavaScript Developer", "Frontend Developer"),
+    ("Fullstack Web Developer", "Full Stack Developer"),
+    ("Sr. Data Scientist", "Data Scientist"),
+    ("Machine Learning Engineer", "Data Scientist"),
+    ("Site Reliability Engineer", "DevOps Engineer"),
+    ("Dev Ops Engineer", "DevOps Engineer"),
+    ("Senior Dev-Ops Engineer", "DevOps Engineer"),
+    ("QA Automation Engineer", "QA Engineer"),
+    ("iOS Developer", "Mobile Developer"),
+])
+def test_match_role(role, expected):
+    assert match_role(role) == expected
+
+
+@pytest.mark.parametrize("role, expected", [
+    ("Frontnd Developer", "Frontend Developer"),
+    ("Backedn Developer", "Backend Developer"),
+    ("Data Scienist", "Data Scientist"),
+])
+def test_match_role_tolerates_typos(role, expected):
+    assert match_role(role) == expected
+
+
+@pytest.mark.parametrize("role", [
+    "Data Engineer", "Web3 Developer", "AI Engineer", "Platform Engineer", "Product Manager",
+    # "data analyst" is a Data Scientist alias, but only with its words side by side
+    "Data Security Analyst",
+])
+def test_match_role_needs_every_word_of_a_name(role):
+    assert match_role(role) is None
+
+
+def test_suggested_roles_have_their_own_templates():
+    for role in ["Frontend Developer", "Backend Developer", "Full Stack Developer", "Data Scientist",
+                 "DevOps Engineer", "Software Engineer"]:
+        assert match_role(role) == role
+        assert f"Technical Questions for {role}" in get_role_template(role)
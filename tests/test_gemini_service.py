@@ -0,0 +1,268 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import gemini_service
+from gemini_service import AsyncGeminiService, GeminiService
+from rate_limiter import RateLimiter
+from resilience import ResilientCaller, RetryPolicy
+from response_cache import MemoryResponseCache
+
+
+class Chunk:
+    def __init__(self, text):
+        self._text = text
+
+    @property
+    def text(self):
+        if self._text is None:
+            # Like the SDK for chunks that carry only safety metadata
+            raise ValueError("chunk has no text parts")
+        return self._text
+
+
+def chunks(*texts, error=None):
+    for text in texts:
+        yield Chunk(text)
+    if error is not None:
+        raise error
+
+
+class FakeModel:
+    """Stands in for GenerativeModel; every call streams the next scripted response"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def generate_content(self, contents, generation_config=None, stream=False):
+        assert stream
+        return self._next()
+
+    def start_chat(self, history=None):
+        return SimpleNamespace(send_message=lambda question, stream=False: self._next())
+
+    def _next(self):
+        self.calls += 1
+        return self.responses.pop(0)
+
+
+def service(model, **kwargs):
+    return GeminiService(api_key="test", model=model, coalesce=False, **kwargs)
+
+
+def cached(llm, prompt, role):
+    return llm.cache.get(llm._request_key(llm.build_structured_prompt(prompt, role)))
+
+
+def test_stream_response_yields_chunks_in_order_and_caches_them():
+    cache = MemoryResponseCache()
+    model = FakeModel(chunks("Role ", None, "overview", "", " and skills"))
+    llm = service(model, cache=cache)
+
+    assert list(llm.stream_response("Build a guide", "Data Scientist")) == ["Role ", "overview", " and skills"]
+    # The complete response is cached, so a repeat never reaches the model
+    assert list(llm.stream_response("Build a guide", "Data Scientist")) == ["Role overview and skills"]
+    assert model.calls == 1
+
+
+def test_stream_response_reports_an_error_after_partial_output():
+    llm = service(FakeModel(chunks("Role ", "overview", error=ValueError("stream reset"))),
+                  cache=MemoryResponseCache())
+
+    assert list(llm.stream_response("Build a guide", "Data Scientist")) == [
+        "Role ", "overview", "Error generating response: stream reset"
+    ]
+    assert cached(llm, "Build a guide", "Data Scientist") is None
+
+
+def test_stream_response_with_an_empty_stream():
+    llm = service(FakeModel(chunks()), cache=MemoryResponseCache())
+
+    assert list(llm.stream_response("Build a guide", "Data Scientist")) == ["Failed to generate response."]
+    assert cached(llm, "Build a guide", "Data Scientist") is None
+
+
+class UsageStream:
+    """Streamed response that reports its token usage once it has been read, like the SDK's"""
+
+    def __init__(self, *texts, total_tokens):
+        self.chunks = chunks(*texts)
+        self.total_tokens = total_tokens
+        self.usage_metadata = None
+
+    def __iter__(self):
+        yield from self.chunks
+        self.usage_metadata = SimpleNamespace(total_token_count=self.total_tokens)
+
+
+def quota():
+    # A frozen clock, so nothing refills during the test
+    return RateLimiter(requests_per_minute=None, tokens_per_minute=100_000, max_wait=None, clock=lambda: 0.0)
+
+
+def test_stream_response_settles_the_quota_with_the_reported_usage():
+    limiter = quota()
+    llm = service(FakeModel(UsageStream("Role ", "overview", total_tokens=300)), rate_limiter=limiter)
+
+    assert list(llm.stream_response("Build a guide", "Data Scientist")) == ["Role ", "overview"]
+    assert limiter.headroom() == pytest.approx(1 - 300 / 100_000)
+
+
+def test_stream_response_settles_the_quota_after_an_error():
+    limiter = quota()
+    llm = service(FakeModel(chunks("Role ", error=ValueError("stream reset"))), rate_limiter=limiter)
+
+    list(llm.stream_response("Build a guide", "Data Scientist"))
+    # Only the prompt and the chunk received stay charged, not the whole output budget
+    max_output_tokens = llm.generation_config['max_output_tokens']
+    assert limiter.headroom() > 1 - max_output_tokens / 100_000
+
+
+def test_stream_chat_yields_chunks_in_order():
+    llm = service(FakeModel(chunks("Start ", "with ", "SQL")))
+    assert list(llm.stream_chat_with_history([], "Where do I start?")) == ["Start ", "with ", "SQL"]
+
+
+def test_stream_chat_reports_an_error_after_partial_output():
+    llm = service(FakeModel(chunks("Start ", error=ValueError("stream reset"))))
+    assert list(llm.stream_chat_with_history([], "Where do I start?")) == [
+        "Start ", "Error generating response with history: stream reset"
+    ]
+
+
+def test_stream_chat_with_an_empty_stream():
+    llm = service(FakeModel(chunks(None)))
+    assert list(llm.stream_chat_with_history([], "Where do I start?")) == ["Failed to generate response."]
+
+
+class FakeAsyncModel:
+    """Async GenerativeModel stand-in that answers after ``delay`` seconds"""
+
+    def __init__(self, text="Generated guide", delay=0.0):
+        self.text = text
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def generate_content_async(self, contents, generation_config=None):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            return SimpleNamespace(text=self.text)
+        finally:
+            self.in_flight -= 1
+
+    def start_chat(self, history=None):
+        return SimpleNamespace(send_message_async=lambda question: self.generate_content_async(question))
+
+
+def async_service(model, **kwargs):
+    # No policy deadline, so only the service and per-call timeouts apply
+    resilience = ResilientCaller(RetryPolicy(deadline=None, max_attempts=1))
+    return AsyncGeminiService(api_key="test", model=model, coalesce=False, resilience=resilience, **kwargs)
+
+
+def test_agenerate_response_returns_and_caches_the_text():
+    model = FakeAsyncModel()
+    llm = async_service(model, cache=MemoryResponseCache())
+
+    async def run():
+        return [await llm.agenerate_response("Build a guide", "Data Scientist") for _ in range(2)]
+
+    assert asyncio.run(run()) == ["Generated guide", "Generated guide"]
+    assert llm.cache.stats()["hits"] == 1
+
+
+def test_agenerate_response_with_empty_text():
+    llm = async_service(FakeAsyncModel(text=""))
+    assert asyncio.run(llm.agenerate_response("Build a guide", "Data Scientist")) == "Failed to generate response."
+
+
+def test_service_timeout_applies_by_default():
+    llm = async_service(FakeAsyncModel(delay=1), timeout=0.02, fallback_on_failure=False)
+    assert asyncio.run(llm.agenerate_response("Build a guide", "Data Scientist")) == (
+        "Error generating response: request timed out"
+    )
+    assert asyncio.run(llm.achat_with_history([], "Where do I start?")) == (
+        "Error generating response with history: request timed out"
+    )
+
+
+def test_service_timeout_falls_back_to_the_role_template():
+    llm = async_service(FakeAsyncModel(delay=1), timeout=0.02)
+    assert asyncio.run(llm.agenerate_response("Build a guide", "Data Scientist")) == (
+        llm.llm_utils.get_fallback_response("Data Scientist")
+    )
+
+
+def test_per_call_timeout_overrides_the_service_timeout():
+    llm = async_service(FakeAsyncModel(delay=0.05), timeout=0.01)
+    assert asyncio.run(llm.agenerate_response("Build a guide", "Data Scientist", timeout=None)) == "Generated guide"
+    assert asyncio.run(llm.achat_with_history([], "Where do I start?", timeout=1)) == "Generated guide"
+
+    slow = async_service(FakeAsyncModel(delay=1), timeout=None, fallback_on_failure=False)
+    assert asyncio.run(slow.agenerate_response("Build a guide", "Data Scientist", timeout=0.02)) == (
+        "Error generating response: request timed out"
+    )
+
+
+def test_concurrent_calls_are_bounded():
+    model = FakeAsyncModel(delay=0.01)
+    llm = async_service(model, max_concurrency=2)
+
+    async def run():
+        return await asyncio.gather(*(llm.agenerate_response(f"Guide {i}", "Data Scientist") for i in range(6)))
+
+    assert asyncio.run(run()) == ["Generated guide"] * 6
+    assert model.max_in_flight == 2
+
+
+def test_model_is_built_once_under_concurrent_first_use(monkeypatch):
+    built = []
+    entered = threading.Barrier(8)
+
+    class SlowSDK:
+        @staticmethod
+        def configure(api_key):
+            time.sleep(0.01)
+
+        @staticmethod
+        def GenerativeModel(name):
+            built.append(name)
+            return object()
+
+    monkeypatch.setattr(gemini_service, "_genai", lambda: SlowSDK)
+    llm = GeminiService(api_key="test")
+    models = []
+
+    def first_use():
+        entered.wait()
+        models.append(llm.model)
+
+    threads = [threading.Thread(target=first_use) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(built) == 1
+    assert all(model is models[0] for model in models)
+
+
+def test_stream_section_streams_then_shares_the_cache_with_generate_section():
+    model = FakeModel(chunks("## Skills", " to review"))
+    llm = service(model, cache=MemoryResponseCache())
+
+    assert list(llm.stream_section("Write the skills section", max_output_tokens=512)) == ["## Skills", " to review"]
+    assert llm.generate_section("Write the skills section", max_output_tokens=512) == "## Skills to review"
+    assert model.calls == 1
+
+
+def test_stream_section_raises_on_an_empty_stream():
+    llm = service(FakeModel(chunks()), cache=MemoryResponseCache())
+    with pytest.raises(ValueError):
+        list(llm.stream_section("Write the skills section"))
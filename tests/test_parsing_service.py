@@ -0,0 +1,56 @@
+import io
+
+import pytest
+
+from benchmarks.corpus import ResumeSpec, build_pdf
+from parsing_service import ParsingService
+from pdf_backends import BACKENDS
+from pdf_processor import PDFProcessor
+from resume_cache import ResumeCache
+from upload_ingest import ingest_bytes
+
+pytest.importorskip("PyPDF2")
+
+
+@pytest.fixture(scope="module")
+def service():
+    service = ParsingService(max_workers=1)
+    yield service
+    service.shutdown()
+
+
+def test_worker_matches_whole_document_parse(service):
+    pdf_bytes = build_pdf(ResumeSpec(pages=3, skill_density=0.6))
+    processor = PDFProcessor()
+    text = processor.extract_text(io.BytesIO(pdf_bytes))
+
+    result = service.parse(pdf_bytes)
+    assert result.error is None
+    assert result.text == text
+    assert result.structured_data == processor.get_structured_data(text)
+
+
+def test_cache_is_keyed_by_upload_digest(service):
+    cache = ResumeCache()
+    upload = ingest_bytes(build_pdf(ResumeSpec(pages=1)), "resume.pdf")
+    first = service.parse(upload, cache=cache)
+    second = service.parse(upload.data.tobytes(), cache=cache)
+    assert (cache.misses, cache.hits) == (1, 1)
+    assert second.structured_data == first.structured_data
+
+
+def test_cache_is_keyed_by_the_backend_that_parsed(service):
+    cache = ResumeCache()
+    upload = ingest_bytes(build_pdf(ResumeSpec(pages=1)), "resume.pdf")
+    result = service.parse(upload, cache=cache)
+    assert result.backend in BACKENDS
+
+    others = [name for name in BACKENDS if name != result.backend]
+    assert cache.find(upload.digest, others) is None
+    backend, (text, _) = cache.find(upload.digest, others + [result.backend])
+    assert (backend, text) == (result.backend, result.text)
+    assert service.parse(upload, cache=cache).backend == result.backend
+
+
+def test_unreadable_pdf_is_an_error(service):
+    assert service.parse(b"%PDF-1.4 not really a pdf").error
@@ -0,0 +1,41 @@
+import io
+
+import pytest
+
+from benchmarks.corpus import ResumeSpec, build_pdf, default_corpus
+from benchmarks.pdf_backends import compare, parse
+from pdf_backends import BACKENDS, document_traits, open_document, route_backends
+from pdf_processor import PDFProcessor
+
+
+def damaged_pdf() -> bytes:
+    # Cut off the cross-reference table and trailer, as in a truncated upload
+    data = build_pdf(ResumeSpec(pages=2, seed=1))
+    return data[:data.rindex(b"xref")]
+
+
+def test_document_traits():
+    assert document_traits(io.BytesIO(build_pdf(ResumeSpec(pages=1)))) == {"damaged": False, "encrypted": False}
+    assert document_traits(io.BytesIO(damaged_pdf()))["damaged"]
+
+
+def test_damaged_documents_go_to_tolerant_backends_first():
+    strict_first = (BACKENDS["pypdf2"], BACKENDS["pypdfium2"])
+    assert route_backends(io.BytesIO(build_pdf(ResumeSpec(pages=1))), strict_first) == strict_first
+    assert route_backends(io.BytesIO(damaged_pdf()), strict_first) == strict_first[::-1]
+
+
+def test_damaged_document_opens_with_pdfium():
+    pytest.importorskip("pypdfium2")
+    backend, pages = open_document(io.BytesIO(damaged_pdf()), (BACKENDS["pypdf2"], BACKENDS["pypdfium2"]))
+    assert backend.name == "pypdfium2"
+    assert "Jane Doe" in backend.page_text(next(iter(pages)))
+
+
+@pytest.mark.parametrize("spec", default_corpus(quick=True), ids=lambda spec: spec.name)
+def test_pdfium_text_matches_pypdf2(spec):
+    pytest.importorskip("pypdfium2")
+    pytest.importorskip("PyPDF2")
+    pdf_bytes = build_pdf(spec)
+    reference = parse(PDFProcessor(backend="pypdf2"), pdf_bytes)
+    assert compare(reference, parse(PDFProcessor(backend="pypdfium2"), pdf_bytes)) == []
@@ -0,0 +1,51 @@
+import pytest
+
+from benchmarks.corpus import ResumeSpec, synthetic_pages
+from pdf_processor import PDFProcessor
+
+PAGES = [
+    "EDUCATION\n- \n•\nSKILLS Languages: Python, Go\nFrameworks: React\nEXPERIENCE\n- Built Docker images",
+    "TECHNICAL SKILLS\nTools: Docker, git\nEDUCATION\nPROJECTS\n* bar",
+]
+
+
+def test_incremental_snapshots_match_whole_document_parse():
+    processor = PDFProcessor()
+    for pages in (PAGES, ["\n".join(lines) for lines in synthetic_pages(ResumeSpec(pages=5, skill_density=0.6))]):
+        snapshots = list(processor.iter_structured_data_from_pages(pages))
+        assert len(snapshots) == len(pages)
+        for count, snapshot in enumerate(snapshots, start=1):
+            assert snapshot == processor.get_structured_data("\n".join(pages[:count]))
+
+
+def test_snapshots_do_not_share_the_open_section():
+    processor = PDFProcessor()
+    first, second = processor.iter_structured_data_from_pages(["EXPERIENCE\n- one", "- two"])
+    assert first['sections']['Experience'] == ['one']
+    assert second['sections']['Experience'] == ['one', 'two']
+
+
+def test_skill_batch_matches_extract_skills():
+    pytest.importorskip("numpy")
+    processor = PDFProcessor()
+    texts = [
+        "Built apps in React Native and Ruby on Rails with C++, C#, Node.js.",
+        "C++17 and C#9 are not C++ or C#; react.js, vue. and ASP.NET Core are",
+        "ruby  on rails\nreact\nnative, Scikit-learn, HTML5 and CSS",
+        "Go\t \nC# \0Ruby on Rails \n",
+        "",
+    ] + ["\n".join("\n".join(lines) for lines in synthetic_pages(ResumeSpec(pages=2, skill_density=0.6, seed=seed)))
+         for seed in range(3)]
+    batch = processor.extract_skills_batch(texts)
+    assert len(batch) == len(texts)
+    for index, text in enumerate(texts):
+        expected = {
+            skill.casefold()
+            for skills in processor.extract_skills(text).values()
+            for skill in skills
+            if skill.casefold() in processor._skill_categories
+        }
+        assert {skill.casefold() for skills in batch.skills(index).values() for skill in skills} == expected
+    assert batch.skills(0)['frameworks'] == ['Node.js', 'React Native', 'Ruby on Rails']
+    # The word counts the skills were read from
+    assert batch.tokens.document_frequency()['vue'] == 1
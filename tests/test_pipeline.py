@@ -0,0 +1,106 @@
+from types import SimpleNamespace
+
+import pytest
+
+from pipeline import Pipeline, build_guide_pipeline, guide_section_stages, progress_reporter
+from prompts import GUIDE_SECTIONS, PromptGenerator
+
+
+def build(calls):
+    pipeline = Pipeline()
+    pipeline.add_stage("double", lambda x: calls.append("double") or x * 2, ["x"])
+
+    def fail(x):
+        calls.append("fail")
+        raise ValueError("upstream said no")
+
+    pipeline.add_stage("fail", fail, ["double"])
+    pipeline.add_stage("square", lambda x: x * x, ["double"])
+    return pipeline
+
+
+def test_iter_completed_yields_failures_with_return_exceptions():
+    calls = []
+    results = dict(build(calls).iter_completed(["fail", "square"], return_exceptions=True, x=3))
+    assert results["square"] == 36
+    assert isinstance(results["fail"], ValueError)
+    assert calls.count("double") == 1
+
+
+def test_iter_completed_raises_failures_by_default():
+    with pytest.raises(ValueError):
+        dict(build([]).iter_completed(["fail", "square"], x=3))
+
+
+def test_failures_are_not_memoized():
+    calls = []
+    pipeline = build(calls)
+    for _ in range(2):
+        dict(pipeline.iter_completed(["fail"], return_exceptions=True, x=1))
+    assert calls.count("fail") == 2
+    assert calls.count("double") == 1
+
+
+def test_iter_progress_yields_reported_updates_before_the_value():
+    pipeline = Pipeline()
+
+    def count(x):
+        report = progress_reporter()
+        for i in range(x):
+            report(i)
+        return x
+
+    pipeline.add_stage("count", count, ["x"])
+    assert list(pipeline.iter_progress(["count"], x=3)) == [
+        ("count", False, 0), ("count", False, 1), ("count", False, 2), ("count", True, 3)
+    ]
+    # Nobody listens outside iter_progress
+    pipeline.add_stage("quiet", lambda x: progress_reporter() is None, ["x"])
+    assert pipeline.run("quiet", x=3) is True
+    assert dict(pipeline.iter_completed(["quiet"], x=4)) == {"quiet": True}
+
+
+class CountingLLM:
+    def __init__(self):
+        self.prompts = []
+
+    def generate_section(self, section_prompt, max_output_tokens=None):
+        self.prompts.append(section_prompt)
+        return f"Section text {len(self.prompts)}"
+
+
+class CountingParser:
+    def __init__(self):
+        self.calls = 0
+
+    def parse(self, pdf, cache=None):
+        self.calls += 1
+        structured = {'sections': {}, 'skills': {'languages': ['Python'], 'frameworks': ['Django'], 'tools': []}}
+        return SimpleNamespace(error=None, structured_data=structured)
+
+
+def test_company_and_role_changes_recompute_only_dependent_sections():
+    llm, parser = CountingLLM(), CountingParser()
+    pipeline = build_guide_pipeline(llm, PromptGenerator(), parsing_service=parser)
+
+    def generated(company, role):
+        """Titles of the sections sent to the LLM for this run, one entry per call"""
+        before = len(llm.prompts)
+        dict(pipeline.iter_completed(guide_section_stages(), pdf=b"%PDF-1.4 resume", company=company, role=role))
+        return sorted(section.title for prompt in llm.prompts[before:]
+                      for section in GUIDE_SECTIONS if f'"{section.title}"' in prompt)
+
+    every_section = sorted(section.title for section in GUIDE_SECTIONS)
+    company_specific = sorted(section.title for section in GUIDE_SECTIONS if section.company_specific)
+
+    assert generated("Acme", "Backend Developer") == every_section
+    # A new company regenerates only the sections that mention it
+    assert generated("Globex", "Backend Developer") == company_specific
+    # A new role changes every prompt
+    assert generated("Globex", "Data Engineer") == every_section
+    # Seen before: every section, and the guide built from them, is memoized
+    assert generated("Acme", "Backend Developer") == []
+    assert pipeline.run("guide", pdf=b"%PDF-1.4 resume", company="Acme", role="Backend Developer")
+    assert len(llm.prompts) == 2 * len(every_section) + len(company_specific)
+    # The resume was parsed once for all of it
+    assert parser.calls == 1
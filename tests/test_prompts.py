@@ -0,0 +1,14 @@
+import itertools
+
+from prompts import GUIDE_SECTIONS, PromptGenerator
+
+
+def test_skill_order_does_not_depend_on_input_order():
+    generator = PromptGenerator()
+    prompts = {
+        generator.generate_section_prompt({'languages': list(order), 'tools': ['git', ' Git ']},
+                                          "Acme", "Backend Developer", GUIDE_SECTIONS[0])
+        for order in itertools.permutations(["go", "Python", "Go", "GO"])
+    }
+    assert len(prompts) == 1
+    assert "Programming Languages: GO, Go, go, Python" in prompts.pop()
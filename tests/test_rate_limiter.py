@@ -0,0 +1,195 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from metrics import metrics
+from rate_limiter import RateLimiter, RateLimitExceeded, SingleFlight
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+
+def limiter(clock, **limits) -> RateLimiter:
+    return RateLimiter(**{"requests_per_minute": None, "tokens_per_minute": None, "max_wait": None, **limits},
+                       clock=clock, sleep=clock.sleep)
+
+
+def test_requests_per_minute_refill_continuously():
+    clock = FakeClock()
+    limit = limiter(clock, requests_per_minute=60)
+    assert [limit.acquire(1) for _ in range(60)] == [0.0] * 60
+    # The bucket is empty; each further request waits for one second of refill
+    assert limit.acquire(1) == pytest.approx(1.0)
+    assert clock.now == pytest.approx(1.0)
+    clock.now += 30
+    assert limit.headroom() == pytest.approx(0.5)
+
+
+def test_tokens_per_minute_wait_for_the_deficit():
+    clock = FakeClock()
+    limit = limiter(clock, tokens_per_minute=600)
+    assert limit.reserve(600) == 0.0
+    assert limit.reserve(300) == pytest.approx(30.0)
+    # Reservations queue behind each other
+    assert limit.reserve(100) == pytest.approx(40.0)
+
+
+def test_waits_beyond_max_wait_are_rejected_and_refunded():
+    clock = FakeClock()
+    limit = limiter(clock, tokens_per_minute=600, max_wait=10)
+    limit.reserve(600)
+    with pytest.raises(RateLimitExceeded):
+        limit.reserve(300)
+    # The rejected request took nothing, so a small one still fits
+    assert limit.reserve(60) == pytest.approx(6.0)
+
+
+def test_settle_returns_unused_tokens():
+    clock = FakeClock()
+    limit = limiter(clock, tokens_per_minute=600)
+    limit.reserve(600)
+    limit.settle(600, 100)
+    assert limit.reserve(500) == 0.0
+    # Usage above the reservation is not charged after the fact
+    limit.settle(500, 900)
+    assert limit.reserve(1) == pytest.approx(0.1)
+
+
+def test_cancelled_wait_returns_the_reservation():
+    clock = FakeClock()
+    limit = limiter(clock, requests_per_minute=60, tokens_per_minute=600)
+    limit.reserve(600)
+
+    async def run():
+        task = asyncio.ensure_future(limit.aacquire(300))
+        await asyncio.sleep(0.01)
+        assert limit.queue_depth == 1
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert limit.queue_depth == 0
+    assert limit.reserve(300) == pytest.approx(30.0)
+
+
+def coalesced(group: str, mode: str) -> float:
+    return metrics.counters().get(f"coalesced_requests_total{{group={group},mode={mode}}}", 0)
+
+
+def wait_until(condition):
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def run_concurrently(single: SingleFlight, group: str, fn, callers: int = 4):
+    """Call ``single.do`` from several threads while ``fn`` is in flight; returns results or errors"""
+    before = coalesced(group, "call")
+    release = threading.Event()
+    calls = []
+    outcomes = []
+
+    def leader():
+        calls.append(None)
+        release.wait(5)
+        return fn()
+
+    def call():
+        try:
+            outcomes.append(single.do("key", leader))
+        except Exception as e:
+            outcomes.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    wait_until(lambda: calls and coalesced(group, "call") - before == callers - 1)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    return outcomes
+
+
+def test_do_shares_one_call_between_concurrent_callers():
+    single = SingleFlight(name="test_do")
+    assert run_concurrently(single, "test_do", lambda: "guide") == ["guide"] * 4
+    # Nothing is remembered once the call is done
+    assert single.do("key", lambda: "fresh") == "fresh"
+
+
+def test_do_raises_the_leaders_error_in_every_caller():
+    def fail():
+        raise ConnectionError("reset")
+
+    outcomes = run_concurrently(SingleFlight(name="test_do_error"), "test_do_error", fail)
+    assert len(outcomes) == 4
+    assert all(isinstance(outcome, ConnectionError) for outcome in outcomes)
+
+
+def test_stream_replays_one_upstream_to_every_reader():
+    single = SingleFlight(name="test_stream")
+    release = threading.Event()
+    opened = []
+
+    def open_stream():
+        opened.append(None)
+        release.wait(5)
+        yield "Role "
+        yield "overview"
+        raise ConnectionError("stream reset")
+
+    readers = [single.stream("key", open_stream) for _ in range(3)]
+    release.set()
+    for reader in readers:
+        chunks = []
+        with pytest.raises(ConnectionError):
+            for chunk in reader:
+                chunks.append(chunk)
+        assert chunks == ["Role ", "overview"]
+    assert len(opened) == 1
+
+
+def test_ado_shares_one_call_and_survives_a_cancelled_waiter():
+    single = SingleFlight(name="test_ado")
+    calls = []
+
+    async def request():
+        calls.append(None)
+        await asyncio.sleep(0.02)
+        return "guide"
+
+    async def run():
+        waiters = [asyncio.ensure_future(single.ado("key", request)) for _ in range(3)]
+        await asyncio.sleep(0)
+        waiters[0].cancel()
+        return await asyncio.gather(*waiters[1:])
+
+    assert asyncio.run(run()) == ["guide", "guide"]
+    assert len(calls) == 1
+
+
+def test_ado_raises_the_error_in_every_waiter():
+    single = SingleFlight(name="test_ado_error")
+
+    async def request():
+        await asyncio.sleep(0.01)
+        raise ConnectionError("reset")
+
+    async def run():
+        return await asyncio.gather(*(single.ado("key", request) for _ in range(3)), return_exceptions=True)
+
+    outcomes = asyncio.run(run())
+    assert all(isinstance(outcome, ConnectionError) for outcome in outcomes)
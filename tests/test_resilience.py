@@ -0,0 +1,200 @@
+import asyncio
+import threading
+
+import pytest
+
+from resilience import AttemptTimeout, CircuitBreaker, CircuitOpenError, ResilientCaller, RetryPolicy
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+
+def flaky(*outcomes):
+    """A call that raises or returns each outcome in turn, recording the thread it ran on"""
+    outcomes = list(outcomes)
+    threads = []
+
+    def fn():
+        threads.append(threading.current_thread())
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    fn.threads = threads
+    return fn
+
+
+def caller(clock=None, **policy) -> ResilientCaller:
+    clock = clock or FakeClock()
+    return ResilientCaller(RetryPolicy(**{"deadline": None, **policy}), sleep=clock.sleep, clock=clock)
+
+
+def test_retries_transient_errors_inline_without_a_deadline_or_hedge():
+    fn = flaky(ConnectionError("reset"), TimeoutError("slow"), "ok")
+    assert caller().call(fn) == "ok"
+    assert fn.threads == [threading.current_thread()] * 3
+
+
+def test_does_not_retry_bad_requests():
+    fn = flaky(ValueError("bad prompt"), "ok")
+    resilient = caller()
+    with pytest.raises(ValueError):
+        resilient.call(fn)
+    assert len(fn.threads) == 1
+    assert resilient.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_gives_up_after_max_attempts():
+    with pytest.raises(ConnectionError):
+        caller(max_attempts=2).call(flaky(ConnectionError("a"), ConnectionError("b"), "never"))
+
+
+def test_breaker_opens_then_lets_one_probe_through():
+    clock = FakeClock()
+    resilient = ResilientCaller(RetryPolicy(max_attempts=1, deadline=None),
+                                breaker=CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=clock),
+                                sleep=clock.sleep, clock=clock)
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            resilient.call(flaky(ConnectionError("down")))
+    assert resilient.breaker.state == CircuitBreaker.OPEN
+
+    fn = flaky("ok")
+    with pytest.raises(CircuitOpenError):
+        resilient.call(fn)
+    assert fn.threads == []
+
+    clock.now += 30
+    assert resilient.breaker.state == CircuitBreaker.HALF_OPEN
+    assert resilient.call(fn) == "ok"
+    assert resilient.breaker.state == CircuitBreaker.CLOSED
+
+
+def slow_first(release: threading.Event, slow_result: str, fast_result: str):
+    """A call whose first request waits for ``release``; later ones return at once"""
+    calls = []
+
+    def fn():
+        calls.append(None)
+        if len(calls) == 1:
+            release.wait(5)
+            return slow_result
+        return fast_result
+
+    return fn
+
+
+def collector():
+    """A discard callback, with an event set once it has been called"""
+    discarded = []
+    called = threading.Event()
+
+    def discard(result):
+        discarded.append(result)
+        called.set()
+
+    return discard, discarded, called
+
+
+def test_attempt_timeout_retries_and_discards_the_late_result():
+    release = threading.Event()
+    discard, discarded, called = collector()
+    resilient = ResilientCaller(RetryPolicy(attempt_timeout=0.05, deadline=None, base_delay=0))
+    assert resilient.call(slow_first(release, "late", "ok"), discard=discard) == "ok"
+    release.set()
+    assert called.wait(5)
+    assert discarded == ["late"]
+
+
+def test_hedge_returns_the_faster_request_and_discards_the_loser():
+    release = threading.Event()
+    discard, discarded, called = collector()
+    resilient = ResilientCaller(RetryPolicy(hedge_after=0.02, deadline=None))
+    assert resilient.call(slow_first(release, "slow", "fast"), discard=discard) == "fast"
+    release.set()
+    assert called.wait(5)
+    assert discarded == ["slow"]
+
+
+def test_async_hedge_cancels_the_loser():
+    cancelled = []
+
+    async def run():
+        calls = []
+
+        async def request():
+            calls.append(None)
+            if len(calls) == 1:
+                try:
+                    await asyncio.sleep(5)
+                except asyncio.CancelledError:
+                    cancelled.append(True)
+                    raise
+                return "slow"
+            return "fast"
+
+        resilient = ResilientCaller(RetryPolicy(hedge_after=0.02, deadline=None))
+        result = await resilient.acall(request)
+        await asyncio.sleep(0)
+        return result
+
+    assert asyncio.run(run()) == "fast"
+    assert cancelled == [True]
+
+
+def test_async_attempt_timeout_is_retried():
+    async def run():
+        calls = []
+
+        async def request():
+            calls.append(None)
+            if len(calls) == 1:
+                await asyncio.sleep(5)
+            return len(calls)
+
+        resilient = ResilientCaller(RetryPolicy(attempt_timeout=0.02, deadline=None, base_delay=0))
+        return await resilient.acall(request)
+
+    assert asyncio.run(run()) == 2
+
+
+def test_attempt_timeout_raised_when_attempts_run_out():
+    resilient = ResilientCaller(RetryPolicy(attempt_timeout=0.01, deadline=None, max_attempts=1))
+    release = threading.Event()
+    with pytest.raises(AttemptTimeout):
+        resilient.call(lambda: release.wait(5))
+    release.set()
+
+
+def test_cancelled_probe_leaves_the_breaker_half_open():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+    resilient = ResilientCaller(RetryPolicy(max_attempts=1, deadline=None), breaker=breaker, clock=clock)
+    with pytest.raises(ConnectionError):
+        resilient.call(flaky(ConnectionError("down")))
+    clock.now += 30
+
+    async def run():
+        async def request():
+            await asyncio.sleep(5)
+
+        task = asyncio.ensure_future(resilient.acall(request))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # The probe slot was released, so the next call is let through
+    assert resilient.call(flaky("ok")) == "ok"
+    assert breaker.state == CircuitBreaker.CLOSED
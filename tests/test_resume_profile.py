@@ -0,0 +1,40 @@
+import pickle
+
+from pipeline import fingerprint
+from resume_profile import ResumeProfile, skill_vocabulary
+
+
+def structured(skills, sections=None):
+    return {
+        'sections': sections if sections is not None else {'Education': ['BSc Computer Science', 'GPA 3.9']},
+        'skills': {'languages': [], 'frameworks': [], 'tools': [], **skills},
+    }
+
+
+def test_round_trips_parser_output():
+    data = structured({'languages': ['C++', 'Go', 'Python', 'Python 3.11 (typed)'], 'tools': ['Docker']},
+                      {'Experience': ['Built things', ''], 'Projects': []})
+    profile = ResumeProfile.from_dict(data)
+    assert profile == data
+    assert profile.to_dict() == data
+    assert profile.get('sections') == data['sections']
+    assert pickle.loads(pickle.dumps(profile)) == data
+
+
+def test_case_variants_share_the_vocabulary_id():
+    profile = ResumeProfile.from_dict(structured({'languages': ['Go', 'go', 'python', 'JAVASCRIPT'],
+                                                  'tools': ['docker']}))
+    canonical = structured({'languages': ['Go', 'JavaScript', 'Python'], 'tools': ['Docker']})
+    assert profile == canonical
+    assert profile.skill_bits('languages') == ResumeProfile.from_dict(canonical).skill_bits('languages')
+    assert profile.digest == fingerprint(canonical)
+
+
+def test_free_form_skills_do_not_grow_the_vocabulary():
+    size = len(skill_vocabulary)
+    data = structured({'languages': ['Python', 'Python 3.11 (typed)'], 'tools': ['in-house CI thing']})
+    profile = ResumeProfile.from_dict(data)
+    assert profile == data
+    assert len(skill_vocabulary) == size
+    # Bitsets only span the fixed vocabulary
+    assert profile.skill_bits('languages').bit_length() <= size
@@ -0,0 +1,49 @@
+import hashlib
+import io
+import os
+
+import pytest
+
+import upload_ingest
+from benchmarks.corpus import ResumeSpec, build_pdf
+from upload_ingest import UploadRejected, ingest_path, ingest_stream
+
+
+@pytest.fixture(scope="module")
+def pdf_bytes():
+    return build_pdf(ResumeSpec(pages=3))
+
+
+def test_large_in_memory_upload_is_spooled_to_a_file(pdf_bytes):
+    # BytesIO has getvalue(), like Streamlit's UploadedFile
+    upload = ingest_stream(io.BytesIO(pdf_bytes), "resume.pdf", spool_threshold=len(pdf_bytes) - 1)
+    path = upload.payload()
+    assert isinstance(path, str)
+    with open(path, "rb") as f:
+        assert f.read() == pdf_bytes
+    assert upload.digest == hashlib.sha256(pdf_bytes).hexdigest()
+    upload.close()
+    assert not os.path.exists(path)
+
+
+def test_small_in_memory_upload_stays_in_memory(pdf_bytes):
+    with ingest_stream(io.BytesIO(pdf_bytes), "resume.pdf") as upload:
+        assert upload.payload() == pdf_bytes
+
+
+def test_spooled_upload_is_still_checked(pdf_bytes):
+    with pytest.raises(UploadRejected):
+        ingest_stream(io.BytesIO(pdf_bytes), "resume.pdf", max_bytes=len(pdf_bytes) - 1, spool_threshold=0)
+
+
+def test_digest_is_only_computed_when_asked_for(pdf_bytes, tmp_path, monkeypatch):
+    hashed = []
+    sha256 = hashlib.sha256
+    monkeypatch.setattr(upload_ingest.hashlib, "sha256", lambda data: hashed.append(data) or sha256(data))
+    path = tmp_path / "resume.pdf"
+    path.write_bytes(pdf_bytes)
+    with ingest_path(str(path)) as upload:
+        assert upload.payload() == str(path)
+        assert hashed == []
+        assert upload.digest == upload.digest == sha256(pdf_bytes).hexdigest()
+        assert len(hashed) == 1
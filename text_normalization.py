@@ -0,0 +1,52 @@
+import re
+from typing import Dict, List, Optional
+
+# Bullet and list markers at the start of a resume line
+BULLET_CHARS = "-•●■◆○*"
+_BULLET_PREFIX = re.compile(r'^[-•●■◆○*]+\s*')
+
+# Any run of two or more whitespace characters, newlines included
+_WHITESPACE_RUN = re.compile(r'\s{2,}')
+
+
+def strip_bullet(line: str) -> str:
+    """Drop a leading bullet marker and the whitespace after it from a stripped line"""
+    # Most lines have no bullet; a character test is cheaper than the regex
+    if line and line[0] in BULLET_CHARS:
+        return _BULLET_PREFIX.sub('', line, count=1)
+    return line
+
+
+def normalize_response(text: str, prompt: str = "") -> str:
+    """Strip an echoed ``prompt`` and collapse whitespace runs to single spaces in one pass
+
+    Equivalent to the old three-step cleanup (strip, squeeze 3+ newlines to
+    two, then collapse 2+ whitespace to a space): the squeezed newlines were
+    always collapsed by the last step anyway.
+    """
+    if prompt and text.startswith(prompt):
+        text = text[len(prompt):]
+    return _WHITESPACE_RUN.sub(' ', text).strip()
+
+
+def split_sections(text: str) -> Dict[str, List[str]]:
+    """Non-empty lines of a markdown response grouped under their ``#`` headers
+
+    Lines before the first header, and under a header with no title, are dropped.
+    A repeated title keeps only its last section.
+    """
+    sections: Dict[str, List[str]] = {}
+    content: Optional[List[str]] = None
+    for line in text.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        if line[0] == '#':
+            title = line.lstrip('#').lstrip()
+            if title:
+                content = sections[title] = []
+            else:
+                content = None
+        elif content is not None:
+            content.append(line)
+    return sections
@@ -0,0 +1,160 @@
+import hashlib
+import mmap
+import os
+import tempfile
+from typing import BinaryIO, Optional, Union
+
+# PDF files start with this header (readers accept it within the first 1KB)
+PDF_MAGIC = b"%PDF-"
+MAGIC_SEARCH_BYTES = 1024
+
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+# Streams longer than this are spooled to a temporary file instead of memory
+SPOOL_THRESHOLD = 2 * 1024 * 1024
+_CHUNK = 256 * 1024
+
+
+class UploadRejected(ValueError):
+    """An upload that is empty, over the size cap or not a PDF"""
+
+
+class IngestedUpload:
+    """One uploaded PDF, held once and shared by the hasher, cache and parser
+
+    ``data`` is a read-only memoryview over the upload's own bytes (no copy)
+    or over an mmap of a file, and ``digest`` is its SHA-256, computed once
+    on first use, so callers without a cache (e.g. batch runs) never hash.
+    Parse workers get ``payload()``: the bytes for small in-memory uploads,
+    or the file's path so a worker reads it from disk instead of having
+    megabytes pickled to it. Call ``close`` (or use ``with``) to release a
+    mapping and delete a spooled temporary file.
+    """
+
+    def __init__(self, name: str, data: memoryview, source: Union[bytes, str],
+                 temporary: bool = False, mapping: Optional[mmap.mmap] = None):
+        self.name = name
+        self.data = data
+        self.size = len(data)
+        self._digest: Optional[str] = None
+        self._source = source
+        self._temporary = temporary
+        self._mapping = mapping
+
+    @property
+    def digest(self) -> str:
+        if self._digest is None:
+            self._digest = hashlib.sha256(self.data).hexdigest()
+        return self._digest
+
+    def payload(self) -> Union[bytes, str]:
+        """What to hand a parse worker: bytes, or the path of the file holding them"""
+        return self._source
+
+    def close(self):
+        self.data.release()
+        if self._mapping is not None:
+            self._mapping.close()
+            self._mapping = None
+        if self._temporary and os.path.exists(self._source):
+            os.remove(self._source)
+
+    def __enter__(self) -> "IngestedUpload":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _check(name: str, size: int, head: bytes, max_bytes: Optional[int]):
+    # Cheap checks first, before anything is hashed, copied or parsed
+    if size == 0:
+        raise UploadRejected(f"{name} is empty")
+    if max_bytes is not None and size > max_bytes:
+        raise UploadRejected(f"{name} is larger than the {max_bytes / (1024 * 1024):g} MB limit")
+    if PDF_MAGIC not in head:
+        raise UploadRejected(f"{name} is not a PDF file")
+
+
+def ingest_bytes(data: Union[bytes, memoryview], name: str = "upload",
+                 max_bytes: Optional[int] = DEFAULT_MAX_BYTES) -> IngestedUpload:
+    """Wrap bytes already in memory without copying them"""
+    view = memoryview(data).toreadonly()
+    _check(name, len(view), bytes(view[:MAGIC_SEARCH_BYTES]), max_bytes)
+    source = data if isinstance(data, bytes) else view.tobytes()
+    return IngestedUpload(name, view, source)
+
+
+def _map_file(path: str, name: str, max_bytes: Optional[int], temporary: bool) -> IngestedUpload:
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        _check(name, size, f.read(MAGIC_SEARCH_BYTES), max_bytes)
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return IngestedUpload(name, memoryview(mapping), path, temporary=temporary, mapping=mapping)
+
+
+def ingest_path(path: str, max_bytes: Optional[int] = DEFAULT_MAX_BYTES) -> IngestedUpload:
+    """Memory-map a PDF on disk; workers read the file itself"""
+    return _map_file(path, os.path.basename(path), max_bytes, temporary=False)
+
+
+def ingest_stream(stream: BinaryIO, name: str = "upload", max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+                  spool_threshold: int = SPOOL_THRESHOLD) -> IngestedUpload:
+    """Read a file-like upload once, stopping as soon as it passes ``max_bytes``
+
+    Small uploads stay in memory; larger ones are spooled to a temporary file
+    and memory-mapped, so concurrent large uploads do not each hold a copy in
+    the app's heap and parse workers read them from disk.
+    """
+    # An in-memory buffer (e.g. Streamlit's UploadedFile) shares its bytes without a copy
+    getvalue = getattr(stream, "getvalue", None)
+    if callable(getvalue):
+        data = getvalue()
+        if len(data) <= spool_threshold:
+            return ingest_bytes(data, name, max_bytes)
+        # Large ones are still written to a file, so workers get a path instead of the pickled bytes
+        _check(name, len(data), bytes(data[:MAGIC_SEARCH_BYTES]), max_bytes)
+        fd, path = tempfile.mkstemp(suffix=".pdf")
+        try:
+            with os.fdopen(fd, "wb") as spool:
+                spool.write(data)
+        except BaseException:
+            os.remove(path)
+            raise
+        return _map_file(path, name, max_bytes, temporary=True)
+
+    head = stream.read(MAGIC_SEARCH_BYTES)
+    _check(name, len(head), head, None)
+    limit = None if max_bytes is None else max_bytes + 1
+    buffer = bytearray(head)
+    spool = None
+    copied = len(head)
+    try:
+        while limit is None or copied < limit:
+            chunk = stream.read(_CHUNK if limit is None else min(_CHUNK, limit - copied))
+            if not chunk:
+                break
+            copied += len(chunk)
+            if spool is None and copied > spool_threshold:
+                fd, path = tempfile.mkstemp(suffix=".pdf")
+                spool = os.fdopen(fd, "wb")
+                spool.write(buffer)
+                buffer = None
+            if spool is not None:
+                spool.write(chunk)
+            else:
+                buffer += chunk
+        _check(name, copied, head, max_bytes)
+    except BaseException:
+        if spool is not None:
+            spool.close()
+            os.remove(path)
+        raise
+    if spool is None:
+        return ingest_bytes(bytes(buffer), name, max_bytes)
+    spool.close()
+    return _map_file(path, name, max_bytes, temporary=True)
+
+
+def max_upload_bytes() -> int:
+    """Upload size cap from $MAX_UPLOAD_MB (default 10)"""
+    return int(float(os.getenv("MAX_UPLOAD_MB", "10")) * 1024 * 1024)